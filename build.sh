@@ -2,3 +2,4 @@
 pip install -r requirements.txt
 python manage.py migrate
 python manage.py collectstatic --noinput
+python manage.py build_openapi_schema
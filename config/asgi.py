@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+В продакшене сайт обслуживается через этот модуль (gunicorn с воркером
+uvicorn, см. Procfile): долгоживущие потоки Server-Sent Events
+(/api/leads/stream/) не занимают воркер, а ждут в event loop.
 """
 
 import os
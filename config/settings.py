@@ -55,18 +55,24 @@ INSTALLED_APPS = [
     'drf_spectacular',  # Swagger/OpenAPI documentation
 ]
 
+# Сессии, CSRF, аутентификация, сообщения и X-Frame-Options - варианты Django,
+# которые пропускают публичные GET-эндпоинты (см. main/middleware.py)
 MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.middleware.LeanPipelineMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'main.middleware.LeanSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.middleware.LeanCsrfViewMiddleware',
+    'main.middleware.LeanAuthenticationMiddleware',
+    'main.middleware.LeanMessageMiddleware',
+    'main.middleware.LeanXFrameOptionsMiddleware',
 ]
 
+# Облегченный конвейер публичных эндпоинтов (LEAN_PUBLIC_PIPELINE=False - полный стек для всех)
+LEAN_PUBLIC_PIPELINE = os.environ.get('LEAN_PUBLIC_PIPELINE', 'True').lower() == 'true'
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -90,23 +96,80 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-# PostgreSQL configuration (commented for testing)
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': os.environ.get('DB_NAME', 'your_db_name'),
-#         'USER': os.environ.get('DB_USER', 'your_db_user'),
-#         'PASSWORD': os.environ.get('DB_PASSWORD', 'your_db_password'),
-#         'HOST': os.environ.get('DB_HOST', 'localhost'),
-#         'PORT': os.environ.get('DB_PORT', '5432'),
-#     }
-# }
-
-# Temporary SQLite for testing
-DATABASES = {
+# DB_ENGINE=postgresql включает PostgreSQL, по умолчанию - локальный SQLite.
+# Пул соединений psycopg (DB_POOL) и постоянные соединения (DB_CONN_MAX_AGE)
+# взаимоисключающие: с пулом соединение возвращается в пул после запроса.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+
+if DB_ENGINE in ('postgresql', 'postgres'):
+    DB_OPTIONS = {}
+    # Ограничение времени выполнения запроса, мс (0 - без ограничения)
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', '0'))
+    if DB_STATEMENT_TIMEOUT:
+        DB_OPTIONS['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT}'
+    if os.environ.get('DB_SSLMODE'):
+        DB_OPTIONS['sslmode'] = os.environ['DB_SSLMODE']
+
+    DB_POOL = os.environ.get('DB_POOL', 'False').lower() == 'true'
+    if DB_POOL:
+        # Пул на процесс: workers * DB_POOL_MAX_SIZE не должно превышать max_connections
+        DB_OPTIONS['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '4')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+
+    # Постоянные соединения: секунды жизни, 'none' - без ограничения (только без пула)
+    DB_CONN_MAX_AGE = os.environ.get('DB_CONN_MAX_AGE', '0').lower()
+    DB_CONN_MAX_AGE = 0 if DB_POOL else (None if DB_CONN_MAX_AGE == 'none' else int(DB_CONN_MAX_AGE))
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'navis_site'),
+            'USER': os.environ.get('DB_USER', 'navis_site_user'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Проверка соединения перед повторным использованием в новом запросе
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+            'OPTIONS': DB_OPTIONS,
+        }
+    }
+
+    # Реплики для чтения публичных GET-запросов: DB_REPLICA_HOSTS=host1,host2
+    for index, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+        DATABASES[f'replica_{index}'] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+DATABASE_ROUTERS = ['main.db_router.ReplicaRouter']
+REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith('replica_')]
+# Реплика с большим отставанием (секунды) не используется; проверка раз в интервал
+REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', '5'))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_LAG_CHECK_INTERVAL', '5'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Кеш должен быть общим для всех воркеров gunicorn: в нем хранятся версии
+# контента и готовые снимки ответов, которые сбрасываются сигналами.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, '.django_cache')),
     }
 }
 
@@ -151,6 +214,11 @@ STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 
+# Адаптивные изображения: версии WebP/AVIF этих ширин создаются при загрузке
+RESPONSIVE_IMAGE_WIDTHS = [320, 640, 960, 1280, 1920]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp']
+
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -165,6 +233,26 @@ CKEDITOR_CONFIGS = {
     },
 }
 
+# Telegram notifications (доставляются воркером send_telegram_notifications)
+TELEGRAM_TIMEOUT = float(os.environ.get('TELEGRAM_TIMEOUT', '10'))
+TELEGRAM_MAX_ATTEMPTS = int(os.environ.get('TELEGRAM_MAX_ATTEMPTS', '8'))
+TELEGRAM_RETRY_BASE_DELAY = int(os.environ.get('TELEGRAM_RETRY_BASE_DELAY', '30'))
+TELEGRAM_RETRY_MAX_DELAY = int(os.environ.get('TELEGRAM_RETRY_MAX_DELAY', '3600'))
+
+# Просмотры вакансий копятся в памяти процесса и пишутся в базу пакетно
+VACANCY_VIEWS_FLUSH_INTERVAL = float(os.environ.get('VACANCY_VIEWS_FLUSH_INTERVAL', '10'))
+VACANCY_VIEWS_MAX_PENDING = int(os.environ.get('VACANCY_VIEWS_MAX_PENDING', '500'))
+# Сброс в фоновом потоке процесса; без него - только явный flush() и atexit
+VACANCY_VIEWS_BACKGROUND_FLUSH = os.environ.get('VACANCY_VIEWS_BACKGROUND_FLUSH', 'True').lower() == 'true'
+
+# Границы зарплатных интервалов для фасетов вакансий, $ (последний интервал открытый)
+VACANCY_SALARY_BUCKETS = [0, 1000, 2000, 3000, 5000]
+
+# Загрузка резюме (см. main/upload_handlers.py)
+RESUME_MAX_UPLOAD_SIZE = int(os.environ.get('RESUME_MAX_UPLOAD_SIZE', str(10 * 1024 * 1024)))
+# Запас на остальные поля формы при проверке Content-Length
+RESUME_FORM_OVERHEAD = 64 * 1024
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -172,6 +260,9 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Keyset-пагинация для всех списков: ?cursor=...&page_size=...
+    'DEFAULT_PAGINATION_CLASS': 'main.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', '20')),
 }
 
 # DRF Spectacular settings
@@ -188,6 +279,12 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# OpenAPI схема собирается при деплое (build.sh: manage.py build_openapi_schema)
+# и отдается с диска; OPENAPI_RUNTIME_SCHEMA=True - генерация на каждый запрос
+OPENAPI_SCHEMA_FILE = os.path.join(BASE_DIR, 'openapi', 'schema.json')
+OPENAPI_RUNTIME_SCHEMA = os.environ.get('OPENAPI_RUNTIME_SCHEMA', 'False').lower() == 'true'
+OPENAPI_SCHEMA_MAX_AGE = int(os.environ.get('OPENAPI_SCHEMA_MAX_AGE', '300'))
+
 # Django Unfold settings
 UNFOLD = {
     "SITE_TITLE": "Navis Admin",
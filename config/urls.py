@@ -19,11 +19,13 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
+from main.schema import PrecomputedSchemaView
 
 urlpatterns = [
     # API Documentation URLs (должны быть выше main.urls)
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    # Схема собирается при деплое (manage.py build_openapi_schema)
+    path('api/schema/', PrecomputedSchemaView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     
@@ -1,12 +1,55 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db.models import Count
+from django.utils import timezone
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin
+from unfold.contrib.filters.admin import AutocompleteSelectFilter
 from .models import (
     Service, Technology, Testimonial, Project,
     ContactRequest, ConsultationRequest, CompanyInfo, SiteContent,
     ServiceDetail, ServiceFeature, ServiceProcess,
-    ServiceBenefit, ServiceFAQ, ServiceCase
+    ServiceBenefit, ServiceFAQ, ServiceCase, ApiKey
 )
+from .exports import LeadExport, ResumeArchive
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdminMixin:
+    """
+    Режим больших таблиц для списков заявок и откликов.
+
+    Счетчик - оценка или ограниченный COUNT, страница выбирается по индексу
+    (EstimatedCountPaginator); второй COUNT(*) всей таблицы и счетчики фасетов
+    отключены; дата-иерархия - по индексированному created_at.
+    Внешние ключи фильтруются через автодополнение, а не списком всех объектов.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    date_hierarchy = 'created_at'
+    list_filter_submit = True
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        paginator = super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        # Счетчик считается до текущей страницы плюс COUNT_LIMIT - глубокие страницы достижимы
+        page = request.GET.get(PAGE_VAR, '')
+        paginator.current_page = max(int(page), 1) if page.isdigit() else 1
+        return paginator
+
+
+class ExportAdminMixin:
+    """Действия потоковой выгрузки выбранных строк (см. main.exports.LeadExport)"""
+    export_kind = None
+    
+    def export_csv(self, request, queryset):
+        return LeadExport.response(self.export_kind, queryset, 'csv')
+    export_csv.short_description = "📥 Выгрузить в CSV"
+    
+    def export_xlsx(self, request, queryset):
+        return LeadExport.response(self.export_kind, queryset, 'xlsx')
+    export_xlsx.short_description = "📥 Выгрузить в Excel (XLSX)"
+
 
 class ServiceFeatureInline(admin.TabularInline):
     """Инлайн для особенностей услуги"""
@@ -77,7 +120,7 @@ class ServiceCaseInline(admin.TabularInline):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-height: 50px;" />', 
-                obj.image.url
+                obj.thumbnail_url('image')
             )
         return "—"
     image_preview.short_description = 'Превью'
@@ -91,6 +134,7 @@ class ServiceDetailAdmin(ModelAdmin):
         'features_count', 'cases_count', 'created_at'
     ]
     list_filter = ['is_active', 'created_at']
+    list_select_related = ['service']
     search_fields = ['title', 'description']
     prepopulated_fields = {'meta_title': ('title',)}
     readonly_fields = [
@@ -138,6 +182,13 @@ class ServiceDetailAdmin(ModelAdmin):
         ServiceCaseInline
     ]
     
+    def get_queryset(self, request):
+        # Счетчики считаются в том же запросе, что и список, а не запросом на строку
+        return super().get_queryset(request).annotate(
+            features_total=Count('features', distinct=True),
+            cases_total=Count('cases', distinct=True),
+        )
+    
     def service_link(self, obj):
         """Ссылка на связанную услугу"""
         if obj.service:
@@ -151,24 +202,26 @@ class ServiceDetailAdmin(ModelAdmin):
     
     def features_count(self, obj):
         """Количество особенностей"""
-        count = obj.features.count()
+        count = obj.features_total
         return format_html('<b style="color: {};">{}</b>', 
                           'green' if count > 0 else 'gray', count)
     features_count.short_description = "📊 Особенности"
+    features_count.admin_order_field = 'features_total'
     
     def cases_count(self, obj):
         """Количество кейсов"""
-        count = obj.cases.count()
+        count = obj.cases_total
         return format_html('<b style="color: {};">{}</b>', 
                           'green' if count > 0 else 'gray', count)
     cases_count.short_description = "📁 Кейсы"
+    cases_count.admin_order_field = 'cases_total'
     
     def main_image_preview(self, obj):
         """Превью главного изображения"""
         if obj.main_image:
             return format_html(
                 '<img src="{}" style="max-height: 100px; border-radius: 5px;" />',
-                obj.main_image.url
+                obj.thumbnail_url('main_image')
             )
         return "Нет изображения"
     main_image_preview.short_description = "Превью"
@@ -178,7 +231,7 @@ class ServiceDetailAdmin(ModelAdmin):
         if obj.banner_image:
             return format_html(
                 '<img src="{}" style="max-height: 60px; border-radius: 5px;" />',
-                obj.banner_image.url
+                obj.thumbnail_url('banner_image')
             )
         return "Нет изображения"
     banner_image_preview.short_description = "Превью баннера"
@@ -213,6 +266,7 @@ class ServiceFeatureAdmin(admin.ModelAdmin):
     ]
     list_editable = ['order', 'is_active']
     list_filter = ['is_active', 'service_detail']
+    list_select_related = ['service_detail']
     search_fields = ['title', 'description']
     readonly_fields = ['icon_preview']
     
@@ -252,6 +306,7 @@ class ServiceProcessAdmin(admin.ModelAdmin):
     """Админка для этапов работы"""
     list_display = ['step_number', 'title', 'service_detail', 'icon_preview']
     list_filter = ['service_detail']
+    list_select_related = ['service_detail']
     search_fields = ['title', 'description']
     readonly_fields = ['icon_preview']
     
@@ -280,6 +335,7 @@ class ServiceBenefitAdmin(admin.ModelAdmin):
     list_display = ['title', 'service_detail', 'order', 'icon_preview']
     list_editable = ['order']
     list_filter = ['service_detail']
+    list_select_related = ['service_detail']
     search_fields = ['title']
     readonly_fields = ['icon_preview']
     
@@ -299,6 +355,7 @@ class ServiceFAQAdmin(admin.ModelAdmin):
     list_display = ['question', 'service_detail', 'order', 'is_active']
     list_editable = ['order', 'is_active']
     list_filter = ['is_active', 'service_detail']
+    list_select_related = ['service_detail']
     search_fields = ['question', 'answer']
     
     fieldsets = (
@@ -320,6 +377,7 @@ class ServiceCaseAdmin(admin.ModelAdmin):
     ]
     list_editable = ['order', 'is_active']
     list_filter = ['is_active', 'service_detail']
+    list_select_related = ['service_detail']
     search_fields = ['title', 'client', 'description']
     readonly_fields = ['image_preview']
     
@@ -342,13 +400,14 @@ class ServiceCaseAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-height: 100px; border-radius: 5px;" />', 
-                obj.image.url
+                obj.thumbnail_url('image')
             )
         return "Нет изображения"
     image_preview.short_description = "Превью"
 
 from django.utils.html import format_html
-from .models import Vacancy, VacancyApplication
+from .models import Vacancy, VacancyApplication, TelegramNotification
+from .search import VacancySearch
 
 @admin.register(Vacancy)
 class VacancyAdmin(admin.ModelAdmin):
@@ -362,6 +421,12 @@ class VacancyAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'skills']
     readonly_fields = ['views_count', 'updated_at']
     
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по полнотекстовому индексу вместо icontains по всем полям"""
+        if not search_term.strip():
+            return queryset, False
+        return VacancySearch.search(queryset, search_term), False
+    
     fieldsets = (
         ('Основная информация', {
             'fields': (
@@ -386,7 +451,7 @@ class VacancyAdmin(admin.ModelAdmin):
         ('Настройки', {
             'fields': (
                 'order', 'is_active', 'is_featured',
-                'expires_at'
+                ('published_at', 'expires_at')
             )
         }),
         ('Статистика', {
@@ -419,14 +484,16 @@ class VacancyAdmin(admin.ModelAdmin):
 
 
 @admin.register(VacancyApplication)
-class VacancyApplicationAdmin(admin.ModelAdmin):
+class VacancyApplicationAdmin(ExportAdminMixin, LargeTableAdminMixin, ModelAdmin):
     list_display = ['name', 'email', 'phone', 'vacancy', 'status', 'created_at']
     list_editable = ['status']
-    list_filter = ['status', 'vacancy', 'created_at']
-    search_fields = ['name', 'email', 'phone']
+    list_filter = ['status', ('vacancy', AutocompleteSelectFilter)]
+    list_select_related = ['vacancy']
+    autocomplete_fields = ['vacancy']
+    search_fields = ['^name', '=email', '=phone']
     readonly_fields = ['created_at', 'updated_at', 'resume_link']
-    date_hierarchy = 'created_at'
-    actions = ['mark_as_viewed', 'mark_as_interview']
+    actions = ['mark_as_viewed', 'mark_as_interview', 'download_resumes', 'export_csv', 'export_xlsx']
+    export_kind = 'applications'
     
     fieldsets = (
         ('Информация о кандидате', {
@@ -462,4 +529,84 @@ class VacancyApplicationAdmin(admin.ModelAdmin):
     
     def mark_as_interview(self, request, queryset):
         queryset.update(status='interview')
-    mark_as_interview.short_description = "🤝 Назначить собеседование"
\ No newline at end of file
+    mark_as_interview.short_description = "🤝 Назначить собеседование"
+    
+    def download_resumes(self, request, queryset):
+        return ResumeArchive.response(queryset, f'resumes-{timezone.localdate():%Y-%m-%d}.zip')
+    download_resumes.short_description = "🗂️ Скачать резюме (ZIP)"
+
+
+@admin.register(TelegramNotification)
+class TelegramNotificationAdmin(admin.ModelAdmin):
+    """Очередь уведомлений Telegram"""
+    list_display = ['__str__', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+    readonly_fields = ['message', 'attempts', 'last_error', 'created_at', 'sent_at']
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"Поставлено в очередь повторно: {updated}")
+    retry_now.short_description = "🔁 Отправить повторно"
+
+
+@admin.register(ConsultationRequest)
+class ConsultationRequestAdmin(ExportAdminMixin, LargeTableAdminMixin, ModelAdmin):
+    """Заявки на консультацию"""
+    list_display = ['name', 'phone', 'interest', 'is_processed', 'created_at']
+    list_editable = ['is_processed']
+    list_filter = ['is_processed', 'interest']
+    search_fields = ['=phone']
+    readonly_fields = ['created_at', 'updated_at']
+    actions = ['mark_as_processed', 'export_csv', 'export_xlsx']
+    export_kind = 'consultations'
+    
+    def mark_as_processed(self, request, queryset):
+        updated = queryset.update(is_processed=True)
+        self.message_user(request, f"Отмечено как обработанные: {updated}")
+    mark_as_processed.short_description = "✅ Отметить как обработанные"
+
+
+@admin.register(ContactRequest)
+class ContactRequestAdmin(ExportAdminMixin, LargeTableAdminMixin, ModelAdmin):
+    """Контактные заявки"""
+    list_display = ['__str__', 'email', 'phone', 'is_processed', 'created_at']
+    list_editable = ['is_processed']
+    list_filter = ['is_processed']
+    search_fields = ['=email', '=phone']
+    readonly_fields = ['created_at', 'updated_at']
+    actions = ['mark_as_processed', 'export_csv', 'export_xlsx']
+    export_kind = 'contacts'
+    
+    def mark_as_processed(self, request, queryset):
+        updated = queryset.update(is_processed=True)
+        self.message_user(request, f"Отмечено как обработанные: {updated}")
+    mark_as_processed.short_description = "✅ Отметить как обработанные"
+
+
+@admin.register(ApiKey)
+class ApiKeyAdmin(ModelAdmin):
+    """Ключи административного API: ключ показывается один раз при создании"""
+    list_display = ['name', 'user', 'prefix', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    list_select_related = ['user']
+    search_fields = ['name', '=prefix']
+    autocomplete_fields = ['user']
+    readonly_fields = ['prefix', 'created_at']
+    actions = ['deactivate']
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            key = obj.set_secret()
+            self.message_user(request, f"Ключ {obj.name}: {key} - сохраните его, повторно он не показывается")
+        super().save_model(request, obj, form, change)
+    
+    def deactivate(self, request, queryset):
+        # По одному, чтобы сигналы сбросили кеш каждого ключа
+        for api_key in queryset.filter(is_active=True):
+            api_key.is_active = False
+            api_key.save(update_fields=['is_active'])
+        self.message_user(request, "Ключи отозваны")
+    deactivate.short_description = "⛔ Отозвать"
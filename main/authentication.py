@@ -0,0 +1,80 @@
+import hmac
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from rest_framework import authentication, exceptions
+
+from .models import ApiKey
+
+
+class ApiKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Аутентификация административного API по ключу:
+    заголовок Authorization: Api-Key <prefix>.<secret>.
+
+    Вместо BasicAuthentication (PBKDF2 на каждый запрос) - один SHA-256
+    и сравнение с хешем из кеша: запись ключа кешируется по prefix на
+    CACHE_TIMEOUT и сбрасывается при изменении или удалении ключа
+    (см. main.signals). Пользователь читается по pk, поэтому снятие
+    is_active / is_staff действует сразу.
+    """
+    keyword = 'Api-Key'
+    CACHE_KEY = 'api-key:{}'
+    CACHE_TIMEOUT = 5 * 60
+    # Отметка "ключа нет" в кеше: перебор префиксов не доходит до базы
+    MISSING = 'missing'
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+    def authenticate(self, request):
+        parts = authentication.get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(parts) != 2:
+            raise exceptions.AuthenticationFailed('Неверный заголовок Api-Key')
+        try:
+            prefix, secret = parts[1].decode('ascii').split('.', 1)
+        except (UnicodeDecodeError, ValueError):
+            raise exceptions.AuthenticationFailed('Неверный API-ключ')
+
+        record = self.lookup(prefix)
+        if record is None or not hmac.compare_digest(record['key_hash'], ApiKey.hash_secret(secret)):
+            raise exceptions.AuthenticationFailed('Неверный API-ключ')
+
+        user = get_user_model().objects.filter(pk=record['user_id'], is_active=True).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed('Пользователь неактивен')
+        return user, record['api_key_id']
+
+    @staticmethod
+    def lookup(prefix):
+        """Запись активного ключа по префиксу (из кеша) или None"""
+        cache_key = ApiKeyAuthentication.CACHE_KEY.format(prefix)
+        record = cache.get(cache_key)
+        if record is None:
+            api_key = ApiKey.objects.filter(prefix=prefix, is_active=True).values('id', 'key_hash', 'user_id').first()
+            record = ApiKeyAuthentication.MISSING
+            if api_key is not None:
+                record = {'api_key_id': api_key['id'], 'key_hash': api_key['key_hash'], 'user_id': api_key['user_id']}
+            cache.set(cache_key, record, ApiKeyAuthentication.CACHE_TIMEOUT)
+        return None if record == ApiKeyAuthentication.MISSING else record
+
+    @staticmethod
+    def invalidate(prefix):
+        cache.delete(ApiKeyAuthentication.CACHE_KEY.format(prefix))
+
+
+class ApiKeyAuthenticationScheme(OpenApiAuthenticationExtension):
+    """Схема Api-Key в OpenAPI (кнопка Authorize в Swagger UI)"""
+    target_class = 'main.authentication.ApiKeyAuthentication'
+    name = 'ApiKeyAuth'
+
+    def get_security_definition(self, auto_schema):
+        return {
+            'type': 'apiKey',
+            'in': 'header',
+            'name': 'Authorization',
+            'description': 'Api-Key <ключ> (ключи выдаются в админке: API-ключи)',
+        }
@@ -0,0 +1,134 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from rest_framework.renderers import JSONRenderer
+
+from .models import (
+    Service, Technology, Testimonial, Project,
+    CompanyInfo, SiteContent,
+    ServiceDetail, ServiceFeature, ServiceProcess,
+    ServiceBenefit, ServiceFAQ, ServiceCase,
+    Vacancy
+)
+
+
+class ContentCacheService:
+    """Сервис версий контента и готовых снимков публичных ответов"""
+
+    VERSION_KEY = 'content-version:{}'
+    HOMEPAGE_KEY = 'homepage-snapshot'
+
+    # Модели, из которых собирается /api/full-homepage/
+    HOMEPAGE_MODELS = (Service, Technology, Testimonial, Project, CompanyInfo, SiteContent)
+
+    # Модели, изменения которых отслеживаются сигналами
+    TRACKED_MODELS = HOMEPAGE_MODELS + (
+        ServiceDetail, ServiceFeature, ServiceProcess,
+        ServiceBenefit, ServiceFAQ, ServiceCase,
+        Vacancy,
+    )
+
+    @staticmethod
+    def _version_key(model):
+        return ContentCacheService.VERSION_KEY.format(model._meta.label_lower)
+
+    @staticmethod
+    def _new_version():
+        return {'token': format(time.time_ns(), 'x'), 'last_modified': time.time()}
+
+    @staticmethod
+    def _initial_version(model):
+        """Версия, восстановленная по данным таблицы (когда в кеше ее нет)"""
+        field_names = {field.name for field in model._meta.concrete_fields}
+        aggregates = {'count': Count('pk'), 'max_pk': Max('pk')}
+        if 'updated_at' in field_names:
+            aggregates['max_updated'] = Max('updated_at')
+        stats = model._default_manager.aggregate(**aggregates)
+
+        max_updated = stats.pop('max_updated', None)
+        raw = ':'.join(str(value) for value in (*stats.values(), max_updated))
+        return {
+            'token': hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16],
+            'last_modified': max_updated.timestamp() if max_updated else time.time(),
+        }
+
+    @staticmethod
+    def get_versions(models):
+        """Текущие версии моделей (в установившемся режиме - только кеш)"""
+        keys = [ContentCacheService._version_key(model) for model in models]
+        found = cache.get_many(keys)
+        versions = []
+        for model, key in zip(models, keys):
+            version = found.get(key)
+            if version is None:
+                # Версия потерялась (очистка кеша, первый запуск) -
+                # восстанавливаем ее одним агрегирующим запросом
+                cache.add(key, ContentCacheService._initial_version(model), None)
+                version = cache.get(key) or ContentCacheService._initial_version(model)
+            versions.append(version)
+        return versions
+
+    @staticmethod
+    def bump_version(model):
+        """Отметить, что данные модели изменились"""
+        cache.set(ContentCacheService._version_key(model), ContentCacheService._new_version(), None)
+
+    @staticmethod
+    def content_changed(model):
+        """Вызывается после коммита изменения модели"""
+        ContentCacheService.bump_version(model)
+        if model in ContentCacheService.HOMEPAGE_MODELS:
+            ContentCacheService.rebuild_homepage()
+
+    # ========== ГЛАВНАЯ СТРАНИЦА ==========
+
+    @staticmethod
+    def _homepage_digest():
+        versions = ContentCacheService.get_versions(ContentCacheService.HOMEPAGE_MODELS)
+        raw = ':'.join(version['token'] for version in versions)
+        return hashlib.sha1(raw.encode('ascii')).hexdigest()
+
+    @staticmethod
+    def render_homepage():
+        """Собирает JSON главной страницы (6 запросов к базе)"""
+        from .serializers import (
+            ServiceSerializer, TechnologySerializer, TestimonialSerializer,
+            ProjectSerializer, CompanyInfoSerializer, SiteContentSerializer,
+        )
+
+        services = Service.objects.filter(is_active=True).order_by('order')[:6]
+        technologies = Technology.objects.filter(is_active=True).order_by('order')
+        testimonials = Testimonial.objects.filter(is_active=True).order_by('order')
+        projects = Project.objects.filter(is_active=True).order_by('order')
+        company_info = CompanyInfo.objects.first()
+        site_content = SiteContent.objects.filter(is_active=True).first()
+
+        data = {
+            'services': ServiceSerializer(services, many=True).data,
+            'technologies': TechnologySerializer(technologies, many=True).data,
+            'testimonials': TestimonialSerializer(testimonials, many=True).data,
+            'projects': ProjectSerializer(projects, many=True).data,
+            'company_info': CompanyInfoSerializer(company_info).data if company_info else None,
+            'site_content': SiteContentSerializer(site_content).data if site_content else None,
+        }
+        return JSONRenderer().render({'success': True, 'data': data})
+
+    @staticmethod
+    def rebuild_homepage():
+        """Пересобирает снимок главной страницы и сохраняет его в кеш"""
+        # Версии читаем до сборки: если данные изменятся во время сборки,
+        # снимок окажется устаревшим по версии и будет пересобран
+        digest = ContentCacheService._homepage_digest()
+        content = ContentCacheService.render_homepage()
+        cache.set(ContentCacheService.HOMEPAGE_KEY, (digest, content), None)
+        return content
+
+    @staticmethod
+    def get_homepage():
+        """Готовые байты ответа /api/full-homepage/"""
+        snapshot = cache.get(ContentCacheService.HOMEPAGE_KEY)
+        if snapshot is not None and snapshot[0] == ContentCacheService._homepage_digest():
+            return snapshot[1]
+        return ContentCacheService.rebuild_homepage()
@@ -0,0 +1,123 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Состояние маршрутизации текущего запроса (None - вне публичного GET)
+_routing = ContextVar('db_routing', default=None)
+
+# alias -> (время проверки, отставание в секундах или None при ошибке)
+_lag_checks = {}
+
+# Отставание реплики: 0, если все полученные WAL уже применены
+PG_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@contextmanager
+def use_replica():
+    """Чтения внутри блока идут на реплику (до первой записи)"""
+    token = _routing.set({
+        'alias': None,
+        'pinned': False,
+        # Транзакции, открытые внутри блока, читают из основной базы
+        'atomic_depth': len(connections[DEFAULT_DB_ALIAS].atomic_blocks),
+    })
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def pin_primary():
+    """Дальнейшие чтения в этом запросе - только с основной базы"""
+    state = _routing.get()
+    if state is not None:
+        state['pinned'] = True
+
+
+def pin_primary_if_changed_since(last_modified):
+    """
+    Закрепляет запрос за основной базой, если данные менялись недавно.
+
+    Реплика, признанная здоровой, может отставать на REPLICA_MAX_LAG плюс время
+    с последней проверки (REPLICA_LAG_CHECK_INTERVAL). Пока новая версия моложе
+    этого окна, ответ с реплики мог бы закешироваться под новой версией
+    со старыми данными.
+    """
+    window = settings.REPLICA_MAX_LAG + settings.REPLICA_LAG_CHECK_INTERVAL
+    if time.time() - last_modified < window:
+        pin_primary()
+
+
+def replica_lag(alias):
+    """Отставание реплики в секундах (None, если реплика недоступна)"""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(PG_REPLICA_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Replica %s is unavailable', alias, exc_info=True)
+        return None
+
+
+def replica_is_healthy(alias):
+    """Проверка отставания с кешем в памяти процесса на REPLICA_LAG_CHECK_INTERVAL"""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked is None or now - checked[0] >= settings.REPLICA_LAG_CHECK_INTERVAL:
+        checked = (now, replica_lag(alias))
+        _lag_checks[alias] = checked
+    lag = checked[1]
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG
+
+
+class ReplicaRouter:
+    """
+    Маршрутизация чтений публичных GET-запросов на реплики.
+
+    Реплика используется только внутри use_replica() (см. ReplicaReadMixin).
+    Любая запись закрепляет запрос за основной базой, чтобы последующие
+    чтения видели записанное; в транзакции чтения тоже идут в основную базу.
+    Реплика с отставанием больше REPLICA_MAX_LAG пропускается.
+    """
+
+    def choose_replica(self, state):
+        if state['alias'] is None:
+            healthy = [alias for alias in settings.REPLICA_DATABASES if replica_is_healthy(alias)]
+            # Одна реплика на весь запрос, чтобы ответы были согласованы
+            state['alias'] = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+        return state['alias']
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state['pinned'] or not settings.REPLICA_DATABASES:
+            return None
+        if len(connections[DEFAULT_DB_ALIAS].atomic_blocks) > state['atomic_depth']:
+            return None
+        return self.choose_replica(state)
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,303 @@
+import csv
+import os
+import re
+from datetime import datetime, time, timedelta
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
+
+from .models import ContactRequest, ConsultationRequest, VacancyApplication
+from .streaming import ZipStream
+
+
+class EchoBuffer:
+    """Приемник для csv.writer: writerow() сразу возвращает строку, ничего не копя"""
+
+    def write(self, value):
+        return value
+
+
+class LeadExport:
+    """
+    Потоковая выгрузка заявок и откликов в CSV и XLSX.
+
+    Строки читаются из базы кусками по CHUNK_SIZE (на PostgreSQL - серверным
+    курсором) через values_list, название вакансии приходит JOIN-ом в том же
+    запросе. Файл отдается StreamingHttpResponse по мере чтения, поэтому память
+    не зависит от числа строк. XLSX собирается как ZIP на лету (ZipStream),
+    ячейки - inline-строки, без сторонних библиотек.
+    """
+    CHUNK_SIZE = 2000
+    BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+    # Колонки: (заголовок, поле для values_list)
+    EXPORTS = {
+        'contacts': {
+            'model': ContactRequest,
+            'filters': ('is_processed',),
+            'columns': [
+                ('ID', 'id'), ('Email', 'email'), ('Телефон', 'phone'),
+                ('Обработано', 'is_processed'), ('Заметки', 'notes'), ('Дата создания', 'created_at'),
+            ],
+        },
+        'consultations': {
+            'model': ConsultationRequest,
+            'filters': ('is_processed',),
+            'columns': [
+                ('ID', 'id'), ('Имя', 'name'), ('Телефон', 'phone'), ('Интерес', 'interest'),
+                ('Другое', 'interest_other'), ('Обработано', 'is_processed'), ('Заметки', 'notes'),
+                ('Дата создания', 'created_at'),
+            ],
+        },
+        'applications': {
+            'model': VacancyApplication,
+            'filters': ('status', 'vacancy'),
+            'columns': [
+                ('ID', 'id'), ('ID вакансии', 'vacancy_id'), ('Вакансия', 'vacancy__title'),
+                ('Имя', 'name'), ('Телефон', 'phone'), ('Email', 'email'), ('Соцсеть', 'social_link'),
+                ('Статус', 'status'), ('Сопроводительное письмо', 'cover_letter'), ('Дата отклика', 'created_at'),
+            ],
+        },
+    }
+    CONTENT_TYPES = {
+        'csv': 'text/csv; charset=utf-8',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    # ========== ФИЛЬТРЫ ==========
+
+    @staticmethod
+    def day_start(value):
+        day = parse_date(value or '') if value else None
+        if day is None:
+            return None
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def filter(kind, queryset, params):
+        """
+        Фильтры выгрузки: created_from / created_to (даты, включительно),
+        is_processed для заявок, status и vacancy для откликов.
+        Границы дат - диапазон по created_at, чтобы работал индекс.
+        """
+        allowed = LeadExport.EXPORTS[kind]['filters']
+        try:
+            created_from = LeadExport.day_start(params.get('created_from'))
+            created_to = LeadExport.day_start(params.get('created_to'))
+        except ValueError:
+            created_from = created_to = None
+        if created_from:
+            queryset = queryset.filter(created_at__gte=created_from)
+        if created_to:
+            queryset = queryset.filter(created_at__lt=created_to + timedelta(days=1))
+
+        if 'is_processed' in allowed:
+            is_processed = LeadExport.BOOLEAN_VALUES.get(params.get('is_processed', '').lower())
+            if is_processed is not None:
+                queryset = queryset.filter(is_processed=is_processed)
+        if 'status' in allowed and params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if 'vacancy' in allowed and params.get('vacancy', '').isdigit():
+            queryset = queryset.filter(vacancy_id=int(params['vacancy']))
+        return queryset
+
+    # ========== СТРОКИ ==========
+
+    @staticmethod
+    def formatter(model, field_name):
+        """Преобразование значения в текст ячейки (choices - подписью)"""
+        if '__' not in field_name:
+            field = model._meta.get_field(field_name)
+            if field.choices:
+                labels = {value: str(label) for value, label in field.flatchoices}
+                return lambda value: labels.get(value, value or '')
+
+        def format_value(value):
+            if value is None:
+                return ''
+            if isinstance(value, bool):
+                return 'Да' if value else 'Нет'
+            if isinstance(value, datetime):
+                return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+            return value
+        return format_value
+
+    @staticmethod
+    def header(kind):
+        return [title for title, _ in LeadExport.EXPORTS[kind]['columns']]
+
+    @staticmethod
+    def rows(kind, queryset):
+        """Строки выгрузки кусками из базы, без загрузки всего queryset"""
+        config = LeadExport.EXPORTS[kind]
+        fields = [field for _, field in config['columns']]
+        formatters = [LeadExport.formatter(config['model'], field) for field in fields]
+        queryset = queryset.order_by('-created_at', '-pk').values_list(*fields)
+        for row in queryset.iterator(chunk_size=LeadExport.CHUNK_SIZE):
+            yield [format_value(value) for format_value, value in zip(formatters, row)]
+
+    # ========== ФОРМАТЫ ==========
+
+    # Начало строки, которое Excel примет за формулу (данные приходят из публичных форм)
+    CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+    # Телефоны и числа (+996 555 123-456) формулой не являются - остаются как есть
+    CSV_PLAIN_NUMBER = re.compile(r'\+?[\d\s()-]+')
+
+    @staticmethod
+    def csv_value(value):
+        if (isinstance(value, str) and value.startswith(LeadExport.CSV_FORMULA_PREFIXES)
+                and not LeadExport.CSV_PLAIN_NUMBER.fullmatch(value)):
+            return "'" + value
+        return value
+
+    @staticmethod
+    def csv_stream(header, rows):
+        writer = csv.writer(EchoBuffer())
+        # BOM - чтобы Excel открыл UTF-8 без мастера импорта
+        yield '\ufeff' + writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([LeadExport.csv_value(value) for value in row])
+
+    # Символы, недопустимые в XML 1.0
+    XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+    @staticmethod
+    def xlsx_cell(value):
+        if isinstance(value, int):
+            return f'<c><v>{value}</v></c>'
+        text = escape(LeadExport.XML_INVALID.sub('', str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+    @staticmethod
+    def xlsx_row(row):
+        return ('<row>' + ''.join(LeadExport.xlsx_cell(value) for value in row) + '</row>').encode('utf-8')
+
+    @staticmethod
+    def xlsx_sheet(header, rows):
+        yield (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        ).encode('utf-8') + LeadExport.xlsx_row(header)
+        for row in rows:
+            yield LeadExport.xlsx_row(row)
+        yield b'</sheetData></worksheet>'
+
+    XLSX_PARTS = [
+        ('[Content_Types].xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         '<Override PartName="/xl/workbook.xml" '
+         'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+         '<Override PartName="/xl/worksheets/sheet1.xml" '
+         'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+         '</Types>'),
+        ('_rels/.rels',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" '
+         'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+         'Target="xl/workbook.xml"/>'
+         '</Relationships>'),
+        ('xl/workbook.xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+         '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+         'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+         '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+         '</workbook>'),
+        ('xl/_rels/workbook.xml.rels',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" '
+         'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+         'Target="worksheets/sheet1.xml"/>'
+         '</Relationships>'),
+    ]
+
+    @staticmethod
+    def xlsx_stream(header, rows):
+        entries = [(name, [content.encode('utf-8')]) for name, content in LeadExport.XLSX_PARTS]
+        entries.append(('xl/worksheets/sheet1.xml', LeadExport.xlsx_sheet(header, rows)))
+        return ZipStream(entries)
+
+    @staticmethod
+    def response(kind, queryset, extension):
+        """StreamingHttpResponse с файлом выгрузки (extension: csv или xlsx)"""
+        header = LeadExport.header(kind)
+        rows = LeadExport.rows(kind, queryset)
+        stream = LeadExport.csv_stream if extension == 'csv' else LeadExport.xlsx_stream
+        response = StreamingHttpResponse(stream(header, rows), content_type=LeadExport.CONTENT_TYPES[extension])
+        filename = f'{kind}-{timezone.localdate():%Y-%m-%d}.{extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ResumeArchive:
+    """
+    ZIP со всеми резюме выбранных откликов и CSV-манифестом.
+
+    Архив собирается на лету (ZipStream): манифест строится отдельным
+    проходом по базе, затем файлы по одному открываются из хранилища
+    и копируются кусками по FILE_CHUNK_SIZE. Ни временных файлов,
+    ни файлов целиком в памяти - расход памяти не зависит от размера архива.
+    """
+    FILE_CHUNK_SIZE = 64 * 1024
+    MANIFEST_NAME = 'manifest.csv'
+    MANIFEST_COLUMNS = [
+        ('ID', 'id'), ('Вакансия', 'vacancy__title'), ('Имя', 'name'), ('Email', 'email'),
+        ('Телефон', 'phone'), ('Статус', 'status'), ('Дата отклика', 'created_at'),
+    ]
+
+    @staticmethod
+    def entry_name(application_id, name, resume):
+        """Имя файла в архиве: id отклика, имя кандидата и исходное расширение"""
+        extension = os.path.splitext(resume)[1].lower()
+        return f'resumes/{application_id}_{slugify(name, allow_unicode=True) or "resume"}{extension}'
+
+    @staticmethod
+    def manifest(queryset):
+        header = [title for title, _ in ResumeArchive.MANIFEST_COLUMNS] + ['Файл']
+        fields = [field for _, field in ResumeArchive.MANIFEST_COLUMNS]
+        formatters = [LeadExport.formatter(VacancyApplication, field) for field in fields]
+
+        def rows():
+            values = queryset.order_by('pk').values_list(*fields, 'resume')
+            for *row, resume in values.iterator(chunk_size=LeadExport.CHUNK_SIZE):
+                application_id, name = row[0], row[2]
+                yield [format_value(value) for format_value, value in zip(formatters, row)] + [
+                    ResumeArchive.entry_name(application_id, name, resume) if resume else ''
+                ]
+
+        for chunk in LeadExport.csv_stream(header, rows()):
+            yield chunk.encode('utf-8')
+
+    @staticmethod
+    def file_chunks(file):
+        with file:
+            yield from file.chunks(ResumeArchive.FILE_CHUNK_SIZE)
+
+    @staticmethod
+    def entries(queryset):
+        yield ResumeArchive.MANIFEST_NAME, ResumeArchive.manifest(queryset)
+
+        storage = VacancyApplication._meta.get_field('resume').storage
+        values = queryset.exclude(resume='').order_by('pk').values_list('pk', 'name', 'resume')
+        for application_id, name, resume in values.iterator(chunk_size=LeadExport.CHUNK_SIZE):
+            entry_name = ResumeArchive.entry_name(application_id, name, resume)
+            try:
+                file = storage.open(resume, 'rb')
+            except OSError:
+                # Файл пропал из хранилища - архив все равно собирается
+                yield f'{entry_name}.missing.txt', [f'Файл не найден: {resume}'.encode('utf-8')]
+                continue
+            yield entry_name, ResumeArchive.file_chunks(file)
+
+    @staticmethod
+    def response(queryset, filename):
+        response = StreamingHttpResponse(ZipStream(ResumeArchive.entries(queryset)), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
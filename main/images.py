@@ -0,0 +1,218 @@
+import base64
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import router, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+
+class ResponsiveImageService:
+    """Генерация WebP/AVIF версий изображений разной ширины и превью-заглушки"""
+
+    # Формат -> (MIME, параметры сохранения Pillow)
+    FORMATS = {
+        'avif': ('image/avif', {'quality': 50}),
+        'webp': ('image/webp', {'quality': 80, 'method': 4}),
+    }
+    PLACEHOLDER_SIZE = 16
+
+    @staticmethod
+    def available_formats():
+        return [fmt for fmt in settings.RESPONSIVE_IMAGE_FORMATS if features.check(fmt)]
+
+    @staticmethod
+    def _prepare(image):
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+        return image
+
+    @staticmethod
+    def _encode(image, fmt):
+        buffer = BytesIO()
+        _, options = ResponsiveImageService.FORMATS[fmt]
+        image.save(buffer, format=fmt.upper(), **options)
+        return buffer.getvalue()
+
+    @staticmethod
+    def placeholder(image):
+        """Крошечное размытое превью в виде data URI (для blur-up на фронтенде)"""
+        thumb = image.copy()
+        thumb.thumbnail((ResponsiveImageService.PLACEHOLDER_SIZE, ResponsiveImageService.PLACEHOLDER_SIZE))
+        buffer = BytesIO()
+        thumb.save(buffer, format='WEBP', quality=30)
+        return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    @staticmethod
+    def generate(field_file):
+        """
+        Создает версии изображения и возвращает описание для JSONField:
+        {'source', 'width', 'height', 'placeholder', 'variants': {fmt: [{'width', 'height', 'name'}]}}.
+        Для файлов, которые Pillow не открывает (например SVG), и слишком больших
+        изображений (больше Image.MAX_IMAGE_PIXELS) версий нет.
+        """
+        try:
+            field_file.open('rb')
+            with Image.open(field_file) as original:
+                original.load()
+                image = ResponsiveImageService._prepare(original)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            return {'source': field_file.name, 'width': None, 'height': None, 'placeholder': None, 'variants': {}}
+        finally:
+            field_file.close()
+
+        width, height = image.size
+        widths = sorted({w for w in settings.RESPONSIVE_IMAGE_WIDTHS if w < width} | {width})
+        stem, _ = os.path.splitext(field_file.name)
+        directory, filename = os.path.split(stem)
+
+        variants = {}
+        for fmt in ResponsiveImageService.available_formats():
+            variants[fmt] = []
+            for target_width in widths:
+                target_height = max(1, round(height * target_width / width))
+                resized = image if target_width == width else image.resize(
+                    (target_width, target_height), Image.Resampling.LANCZOS
+                )
+                name = field_file.storage.save(
+                    os.path.join(directory, 'derivatives', f'{filename}-{target_width}w.{fmt}'),
+                    ContentFile(ResponsiveImageService._encode(resized, fmt)),
+                )
+                variants[fmt].append({'width': target_width, 'height': target_height, 'name': name})
+
+        return {
+            'source': field_file.name,
+            'width': width,
+            'height': height,
+            'placeholder': ResponsiveImageService.placeholder(image),
+            'variants': variants,
+        }
+
+    @staticmethod
+    def names(info):
+        """Имена файлов версий из описания изображения"""
+        return {item['name'] for items in (info or {}).get('variants', {}).values() for item in items}
+
+    @staticmethod
+    def delete(storage, info, keep=()):
+        """Удаляет файлы версий (при замене или удалении исходника), кроме keep"""
+        for name in ResponsiveImageService.names(info) - set(keep):
+            storage.delete(name)
+
+    @staticmethod
+    def represent(field_file, info):
+        """Структура для API: исходник, размеры, заглушка и srcset по форматам"""
+        if not field_file:
+            return None
+        data = {'src': field_file.url, 'width': None, 'height': None, 'placeholder': None, 'sources': []}
+        if not info or info.get('source') != field_file.name:
+            return data
+
+        data.update(width=info['width'], height=info['height'], placeholder=info['placeholder'])
+        storage = field_file.storage
+        # Порядок важен для <picture>: сначала более эффективные форматы
+        for fmt in ResponsiveImageService.FORMATS:
+            items = info['variants'].get(fmt)
+            if items:
+                data['sources'].append({
+                    'type': ResponsiveImageService.FORMATS[fmt][0],
+                    'srcset': ', '.join(f"{storage.url(item['name'])} {item['width']}w" for item in items),
+                })
+        return data
+
+    @staticmethod
+    def thumbnail_url(field_file, info):
+        """URL самой маленькой версии (для превью в админке)"""
+        if not field_file:
+            return None
+        if info and info.get('source') == field_file.name:
+            for fmt in ('webp', 'avif'):
+                items = info['variants'].get(fmt)
+                if items:
+                    return field_file.storage.url(items[0]['name'])
+        return field_file.url
+
+
+class ResponsiveImagesMixin:
+    """
+    Примесь для моделей с изображениями: при загрузке нового файла
+    создаются версии (см. ResponsiveImageService), описание хранится
+    в JSON-поле image_variants по имени поля изображения.
+    Старые версии удаляются только после коммита и только если на них
+    не ссылается другая строка (копия из админки до пересоздания версий).
+    """
+    responsive_image_fields = ()
+
+    def update_image_variants(self, force=False):
+        """
+        Пересоздает версии для изменившихся полей; True, если что-то изменилось.
+        Устаревшие версии удаляет delete_stale_image_variants().
+        """
+        variants = dict(self.image_variants or {})
+        self._stale_image_variants = []
+        changed = False
+        for field_name in self.responsive_image_fields:
+            field_file = getattr(self, field_name)
+            current = variants.get(field_name)
+            name = field_file.name if field_file else None
+            if not force and current and current.get('source') == name:
+                continue
+            if not force and not current and not name:
+                continue
+
+            if current:
+                self._stale_image_variants.append((field_file.storage, current))
+                variants.pop(field_name)
+            if name:
+                # Файл сохраняется в хранилище так же, как это делает FileField.pre_save
+                if not field_file._committed:
+                    field_file.save(field_file.name, field_file.file, save=False)
+                variants[field_name] = ResponsiveImageService.generate(field_file)
+            changed = True
+
+        self.image_variants = variants
+        return changed
+
+    def save(self, *args, **kwargs):
+        if self.pk is None and self.image_variants:
+            # Копия строки (pk = None, например "Создать копию" в админке):
+            # у нее свои версии, а не ссылки на файлы оригинала
+            self.image_variants = {}
+        # Версии создаются до сохранения строки, чтобы сигналы (сброс кеша)
+        # видели уже готовое описание изображений
+        changed = self.update_image_variants()
+        update_fields = kwargs.get('update_fields')
+        if changed and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'image_variants'}
+        super().save(*args, **kwargs)
+        self.delete_stale_image_variants()
+
+    def delete_stale_image_variants(self):
+        """После коммита удаляет файлы замененных версий, на которые больше никто не ссылается"""
+        stale = getattr(self, '_stale_image_variants', None)
+        if not stale:
+            return
+        self._stale_image_variants = []
+        model = type(self)
+
+        def delete():
+            referenced = set()
+            for variants in model._base_manager.values_list('image_variants', flat=True).iterator():
+                for info in (variants or {}).values():
+                    referenced |= ResponsiveImageService.names(info)
+            for storage, info in stale:
+                ResponsiveImageService.delete(storage, info, keep=referenced)
+
+        transaction.on_commit(delete, using=router.db_for_write(model))
+
+    def image_info(self, field_name):
+        return ResponsiveImageService.represent(
+            getattr(self, field_name), (self.image_variants or {}).get(field_name)
+        )
+
+    def thumbnail_url(self, field_name):
+        return ResponsiveImageService.thumbnail_url(
+            getattr(self, field_name), (self.image_variants or {}).get(field_name)
+        )
@@ -0,0 +1,283 @@
+import heapq
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.http import QueryDict
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from .exports import LeadExport
+from .models import CommitSequence, ContactRequest, ConsultationRequest, VacancyApplication
+
+
+class LeadInbox:
+    """
+    Единый список заявок для менеджеров и синхронизации с CRM:
+    консультации, контактные заявки и отклики на вакансии.
+
+    Каждая таблица читается своим запросом по индексу (WHERE по позиции
+    курсора + ORDER BY + LIMIT), результаты сливаются heapq.merge.
+    Порядок - (ключ, тип, id), курсор хранит эту тройку, поэтому любая
+    страница стоит столько же, сколько первая. Ключ списка - created_at.
+
+    При ordering=created_at (синхронизация с CRM) next возвращается всегда:
+    CRM сохраняет его и при следующем опросе получает только новые заявки.
+    created_at назначается до коммита, и заявка медленной транзакции стала бы
+    видна уже после курсора, поэтому в этом режиме ключ - commit_seq
+    (порядок коммита, см. models.CommitSequence), и отдаются только заявки
+    ниже границы завершенных транзакций. Порядок по created_at при этом
+    приблизительный, зато ни одна закоммиченная заявка не пропускается.
+
+    Статус приведен к общему виду: у консультаций и контактов new/processed
+    (по is_processed), у откликов - статус отклика; processed для отклика -
+    любой статус, кроме new.
+    """
+    TYPES = {
+        'consultation': ConsultationRequest,
+        'contact': ContactRequest,
+        'application': VacancyApplication,
+    }
+    FIELDS = {
+        'consultation': ['id', 'created_at', 'commit_seq', 'name', 'phone', 'interest', 'lead_status'],
+        'contact': ['id', 'created_at', 'commit_seq', 'email', 'phone', 'lead_status'],
+        'application': [
+            'id', 'created_at', 'commit_seq', 'name', 'email', 'phone', 'lead_status', 'vacancy_id', 'vacancy__title',
+        ],
+    }
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    invalid_cursor_message = 'Неверный курсор'
+
+    def __init__(self, params):
+        types = [name for name in params.getlist('type') if name in self.TYPES]
+        self.types = types or list(self.TYPES)
+        self.is_processed = LeadExport.BOOLEAN_VALUES.get(params.get('is_processed', '').lower())
+        self.status = params.get('status') or None
+
+        try:
+            self.created_from = LeadExport.day_start(params.get('created_from'))
+            self.created_to = LeadExport.day_start(params.get('created_to'))
+        except ValueError:
+            self.created_from = self.created_to = None
+
+        # Фильтр по вакансии оставляет только отклики
+        vacancy = params.get('vacancy', '')
+        self.vacancy = int(vacancy) if vacancy.isdigit() else None
+        if self.vacancy is not None:
+            self.types = [name for name in self.types if name == 'application']
+
+        self.ascending = params.get('ordering') == 'created_at'
+        self.key = 'commit_seq' if self.ascending else 'created_at'
+        try:
+            page_size = int(params.get('page_size', self.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            page_size = self.DEFAULT_PAGE_SIZE
+        self.page_size = min(max(page_size, 1), self.MAX_PAGE_SIZE)
+
+    # ========== ЗАПРОСЫ ==========
+
+    @staticmethod
+    def status_expression(lead_type):
+        if lead_type == 'application':
+            return F('status')
+        return Case(
+            When(is_processed=True, then=Value('processed')),
+            default=Value('new'),
+            output_field=CharField(),
+        )
+
+    def queryset(self, lead_type, with_status=True):
+        """Заявки одного типа с фильтрами и аннотацией lead_status"""
+        queryset = self.TYPES[lead_type].objects.annotate(lead_status=self.status_expression(lead_type))
+        if self.created_from:
+            queryset = queryset.filter(created_at__gte=self.created_from)
+        if self.created_to:
+            queryset = queryset.filter(created_at__lt=self.created_to + timedelta(days=1))
+        if self.vacancy is not None:
+            queryset = queryset.filter(vacancy_id=self.vacancy)
+
+        if with_status and self.is_processed is not None:
+            if lead_type == 'application':
+                condition = ~Q(status='new')
+                queryset = queryset.filter(condition if self.is_processed else ~condition)
+            else:
+                queryset = queryset.filter(is_processed=self.is_processed)
+        if with_status and self.status:
+            if lead_type == 'application':
+                queryset = queryset.filter(status=self.status)
+            elif self.status in ('new', 'processed'):
+                queryset = queryset.filter(is_processed=self.status == 'processed')
+            else:
+                queryset = queryset.none()
+        return queryset
+
+    def after(self, lead_type, position):
+        """Условие "строго после курсора" для таблицы типа lead_type"""
+        value, cursor_type, cursor_id = position
+        key = self.key
+        rank, cursor_rank = list(self.TYPES).index(lead_type), list(self.TYPES).index(cursor_type)
+        later = 'gt' if self.ascending else 'lt'
+        if rank == cursor_rank:
+            return Q(**{f'{key}__{later}': value}) | Q(**{key: value, f'id__{later}': cursor_id})
+        # Тип сортируется после типа курсора - строки с тем же ключом тоже подходят
+        if (rank > cursor_rank) == self.ascending:
+            return Q(**{f'{key}__{later}e': value})
+        return Q(**{f'{key}__{later}': value})
+
+    def horizon(self):
+        """Граница commit_seq: заявки ниже нее закоммичены, новые ниже нее не появятся"""
+        model = self.TYPES[self.types[0]]
+        return CommitSequence.horizon(connections[model.objects.db])
+
+    def page(self, position=None):
+        """(строки страницы, есть ли следующая)"""
+        direction = '' if self.ascending else '-'
+        # Граница читается до страниц: закоммиченное позже дождется следующего опроса
+        horizon = self.horizon() if self.ascending else None
+        streams = []
+        for lead_type in self.types:
+            rank = list(self.TYPES).index(lead_type)
+            queryset = self.queryset(lead_type)
+            if position is not None:
+                queryset = queryset.filter(self.after(lead_type, position))
+            if horizon is not None:
+                queryset = queryset.filter(commit_seq__lt=horizon)
+            queryset = queryset.order_by(f'{direction}{self.key}', f'{direction}id')
+            rows = queryset.values(*self.FIELDS[lead_type])[:self.page_size + 1]
+            streams.append([((row[self.key], rank, row['id']), lead_type, row) for row in rows])
+
+        merged = heapq.merge(*streams, key=lambda item: item[0], reverse=not self.ascending)
+        items = [(lead_type, row) for _, lead_type, row in merged][:self.page_size + 1]
+        return items[:self.page_size], len(items) > self.page_size
+
+    def counts(self):
+        """Число заявок по типам и статусам - один запрос (UNION ALL агрегатов)"""
+        querysets = [
+            self.queryset(lead_type, with_status=False)
+            .annotate(lead_type=Value(lead_type, output_field=CharField()))
+            .values('lead_type', 'lead_status')
+            .annotate(total=Count('pk'))
+            .order_by()
+            for lead_type in self.types
+        ]
+        counts = {lead_type: {} for lead_type in self.types}
+        for row in querysets[0].union(*querysets[1:], all=True):
+            counts[row['lead_type']][row['lead_status']] = row['total']
+        return counts
+
+    # ========== ОТВЕТ ==========
+
+    @staticmethod
+    def item(lead_type, row):
+        vacancy = None
+        if lead_type == 'application':
+            vacancy = {'id': row['vacancy_id'], 'title': row['vacancy__title']}
+        return {
+            'type': lead_type,
+            'id': row['id'],
+            'created_at': row['created_at'],
+            'status': row['lead_status'],
+            'is_processed': row['lead_status'] != 'new',
+            'name': row.get('name'),
+            'email': row.get('email'),
+            'phone': row.get('phone'),
+            'interest': row.get('interest'),
+            'vacancy': vacancy,
+        }
+
+    def position(self, lead_type, row):
+        return row[self.key], lead_type, row['id']
+
+    def encode_cursor(self, lead_type, row):
+        value = row[self.key]
+        if not self.ascending:
+            value = value.isoformat()
+        payload = json.dumps([value, lead_type, row['id']], separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            value, lead_type, lead_id = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            # По возрастанию курсор - commit_seq, иначе - created_at
+            value = int(value) if self.ascending else parse_datetime(value)
+            if value is None or lead_type not in self.TYPES:
+                raise ValueError
+            return value, lead_type, int(lead_id)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class LeadFeed:
+    """
+    Поток новых заявок для Server-Sent Events (см. LeadStreamView).
+
+    Создание заявки (после коммита) увеличивает счетчик в кеше; открытые
+    потоки раз в POLL_INTERVAL читают только этот счетчик и идут в базу,
+    лишь когда он изменился (и для надежности - раз в RESYNC_INTERVAL).
+    Новые строки выбираются LeadInbox в порядке коммита (commit_seq) от позиции
+    клиента, id события - курсор LeadInbox, поэтому переподключение
+    с Last-Event-ID продолжает поток без повтора таблицы и без пропусков.
+
+    Новый поток начинается с границы завершенных транзакций, поэтому заявка,
+    созданная до открытия потока и закоммиченная после, не теряется; уже
+    показанную в списке заявку клиент отбрасывает по (type, id). Заявка,
+    которую задерживает граница (PostgreSQL: еще идет более старая
+    транзакция), приходит при следующей синхронизации - не позже RESYNC_INTERVAL.
+    """
+    VERSION_KEY = 'lead-feed:version'
+    POLL_INTERVAL = 1
+    RESYNC_INTERVAL = 30
+    HEARTBEAT_INTERVAL = 15
+    # Соединение закрывается периодически - клиент переподключается с Last-Event-ID
+    MAX_DURATION = 300
+    RETRY_MS = 3000
+    BATCH_SIZE = LeadInbox.MAX_PAGE_SIZE
+
+    @staticmethod
+    def bump():
+        try:
+            cache.incr(LeadFeed.VERSION_KEY)
+        except ValueError:
+            cache.set(LeadFeed.VERSION_KEY, 1, None)
+
+    @staticmethod
+    def version():
+        return cache.get(LeadFeed.VERSION_KEY)
+
+    @staticmethod
+    def inbox():
+        return LeadInbox(QueryDict(f'ordering=created_at&page_size={LeadFeed.BATCH_SIZE}'))
+
+    @staticmethod
+    def start_position(last_event_id=None):
+        """Позиция клиента по Last-Event-ID, без него - граница завершенных транзакций"""
+        inbox = LeadFeed.inbox()
+        if last_event_id:
+            try:
+                return inbox.decode_cursor(last_event_id)
+            except NotFound:
+                pass
+        # Позиция перед первой заявкой первого типа с commit_seq = граница
+        return inbox.horizon(), list(LeadInbox.TYPES)[0], 0
+
+    @staticmethod
+    def events(position):
+        """(SSE-сообщения новых заявок после position, новая позиция)"""
+        inbox = LeadFeed.inbox()
+        messages = []
+        while True:
+            items, has_more = inbox.page(position)
+            for lead_type, row in items:
+                cursor = inbox.encode_cursor(lead_type, row)
+                data = json.dumps(LeadInbox.item(lead_type, row), cls=DjangoJSONEncoder, ensure_ascii=False)
+                messages.append(f'id: {cursor}\nevent: lead\ndata: {data}\n\n')
+                position = inbox.position(lead_type, row)
+            if not has_more:
+                return messages, position
@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.crypto import get_random_string
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность публичных GET-эндпоинтов в одном потоке '
+        '(запросов в секунду на ядро): облегченный конвейер middleware против полного. '
+        'Сценарии: anonymous - без cookies, session - посетитель с сессией сотрудника '
+        'и CSRF-cookie (именно для него полный стек читает сессию и пользователя)'
+    )
+
+    DEFAULT_PATHS = ['/api/services/', '/api/vacancies/', '/api/company-info/']
+    SCENARIOS = ('anonymous', 'session')
+    MODES = {'full': False, 'lean': True}
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help=f'Пути для замера (по умолчанию {" ".join(self.DEFAULT_PATHS)})'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Запросов на путь в каждом раунде (по умолчанию 2000)'
+        )
+        parser.add_argument(
+            '--rounds', type=int, default=3,
+            help='Раундов на режим, берется лучший (по умолчанию 3)'
+        )
+
+    def client(self, lean, user=None):
+        # Цепочка middleware строится при первом запросе клиента - с текущими настройками
+        host = next((host for host in settings.ALLOWED_HOSTS if host not in ('*', '')), 'localhost')
+        with override_settings(LEAN_PUBLIC_PIPELINE=lean):
+            client = Client(HTTP_HOST=host.lstrip('.'))
+            client.get('/api/')
+        if user is not None:
+            client.force_login(user)
+            client.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(32)
+        return client
+
+    def measure(self, client, path, count):
+        start = time.perf_counter()
+        for _ in range(count):
+            response = client.get(path)
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise CommandError(f'{path}: статус {response.status_code}')
+        return count / elapsed
+
+    @staticmethod
+    def queries(client, path):
+        with CaptureQueriesContext(connection) as captured:
+            client.get(path)
+        return len(captured)
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self.DEFAULT_PATHS
+        count = options['requests']
+        # {(путь, сценарий, режим): {'rps': ..., 'queries': ...}} - для тестов и отчета
+        self.results = {}
+
+        # Пользователь и сессии бенчмарка откатываются вместе с транзакцией
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(f'benchmark-{get_random_string(8)}', is_staff=True)
+            clients = {
+                (scenario, mode): self.client(lean, user if scenario == 'session' else None)
+                for scenario in self.SCENARIOS
+                for mode, lean in self.MODES.items()
+            }
+            for path in paths:
+                for scenario in self.SCENARIOS:
+                    self.benchmark(path, scenario, clients, count, options['rounds'])
+            transaction.set_rollback(True)
+
+    def benchmark(self, path, scenario, clients, count, rounds):
+        pair = {mode: clients[scenario, mode] for mode in self.MODES}
+        # Прогрев: кеши версий, подготовленные запросы, импорты
+        for client in pair.values():
+            self.measure(client, path, min(count, 100))
+
+        # Режимы чередуются по раундам, чтобы дрейф машины не попал в разницу
+        best = dict.fromkeys(pair, 0.0)
+        for _ in range(rounds):
+            for mode, client in pair.items():
+                best[mode] = max(best[mode], self.measure(client, path, count))
+        for mode, client in pair.items():
+            self.results[path, scenario, mode] = {'rps': best[mode], 'queries': self.queries(client, path)}
+
+        full, lean = self.results[path, scenario, 'full'], self.results[path, scenario, 'lean']
+        self.stdout.write(
+            f'{path} [{scenario}]: '
+            f'полный {full["rps"]:,.0f} req/s ({1e6 / full["rps"]:.0f} мкс, SQL {full["queries"]}), '
+            f'облегченный {lean["rps"]:,.0f} req/s ({1e6 / lean["rps"]:.0f} мкс, SQL {lean["queries"]}), '
+            f'разница {(lean["rps"] / full["rps"] - 1) * 100:+.1f}%'
+        )
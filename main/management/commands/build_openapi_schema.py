@@ -0,0 +1,19 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from main.schema import SchemaArtifact
+
+
+class Command(BaseCommand):
+    help = 'Собирает OpenAPI схему в файл (и ее gzip/brotli версии) для /api/schema/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            help='Куда записать схему (по умолчанию OPENAPI_SCHEMA_FILE)'
+        )
+
+    def handle(self, *args, **options):
+        for name in SchemaArtifact.build(options['file']):
+            self.stdout.write(f'{name}: {os.path.getsize(name)} байт')
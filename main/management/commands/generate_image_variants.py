@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from main.cache_service import ContentCacheService
+from main.models import (
+    Project, Service, ServiceCase, ServiceDetail, SiteContent, Technology, Testimonial,
+)
+
+MODELS = [Service, Technology, Testimonial, Project, SiteContent, ServiceDetail, ServiceCase]
+
+
+class Command(BaseCommand):
+    help = 'Создает WebP/AVIF версии для уже загруженных изображений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать версии, даже если они уже есть'
+        )
+
+    def handle(self, *args, **options):
+        for model in MODELS:
+            updated = 0
+            for obj in model.objects.all().iterator():
+                if obj.update_image_variants(force=options['force']):
+                    # Только JSON-поле: save() не должен снова трогать файлы
+                    model.objects.filter(pk=obj.pk).update(image_variants=obj.image_variants)
+                    obj.delete_stale_image_variants()
+                    updated += 1
+            if updated:
+                # update() не отправляет сигналы - сбрасываем кеш вручную
+                ContentCacheService.content_changed(model)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: обновлено {updated}')
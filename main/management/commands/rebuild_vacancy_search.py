@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from main.models import Vacancy
+from main.search import VacancySearch
+
+
+class Command(BaseCommand):
+    help = 'Переиндексирует полнотекстовый поиск вакансий (после массовых изменений через update())'
+
+    def handle(self, *args, **options):
+        count = VacancySearch.rebuild(Vacancy.objects.all())
+        self.stdout.write(f'Проиндексировано вакансий: {count}')
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.telegram_service import TelegramService
+
+
+class Command(BaseCommand):
+    help = 'Доставляет уведомления Telegram из очереди (outbox) с повторными попытками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь один раз и выйти'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди, секунд (по умолчанию 5)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Сколько уведомлений брать за один проход'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = TelegramService.process_pending(batch_size=options['batch_size'])
+            if processed:
+                self.stdout.write(f'Обработано уведомлений: {processed}')
+            if options['once']:
+                return
+            # Если очередь забита, сразу берем следующую пачку
+            if processed < options['batch_size']:
+                time.sleep(options['interval'])
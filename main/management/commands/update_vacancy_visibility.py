@@ -0,0 +1,68 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.cache_service import ContentCacheService
+from main.models import Vacancy
+from main.vacancy_schedule import VacancySchedule
+
+
+class Command(BaseCommand):
+    help = 'Снимает истекшие вакансии и сбрасывает кеши в моменты публикации/истечения вакансий'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Применить переходы один раз и выйти'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Максимальная пауза между проверками, секунд (по умолчанию 60)'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=1,
+            help='Как часто во время сна проверять версию вакансий в кеше, секунд (по умолчанию 1): '
+                 'вакансия, сохраненная во время сна, публикуется или истекает с опозданием не больше poll '
+                 '(не больше interval, если кеш недоступен или очищен)'
+        )
+
+    def handle(self, *args, **options):
+        # При старте версия сбрасывается безусловно: переходы за время простоя неизвестны
+        since = None
+        while True:
+            now = timezone.now()
+            expired, published = VacancySchedule.apply_transitions(since=since, now=now)
+            if since is None:
+                ContentCacheService.content_changed(Vacancy)
+            if expired or published:
+                self.stdout.write(f'Снято с публикации: {expired}, опубликованы новые: {"да" if published else "нет"}')
+            if options['once']:
+                return
+            since = now
+            self.sleep(options['interval'], options['poll'])
+
+    @staticmethod
+    def version():
+        return ContentCacheService.get_versions([Vacancy])[0]['token']
+
+    def sleep(self, interval, poll):
+        """
+        Спит ровно до ближайшего перехода, но не дольше interval. Сохранение или
+        удаление вакансии (новая версия Vacancy после коммита) будит раньше:
+        у нее мог появиться переход ближе запланированного.
+        """
+        # Версия читается до расписания: изменение между ними тоже разбудит
+        version = self.version()
+        wake_at = timezone.now() + timedelta(seconds=interval)
+        moment = VacancySchedule.next_transition()
+        if moment is not None:
+            wake_at = min(wake_at, moment)
+        while True:
+            remaining = (wake_at - timezone.now()).total_seconds()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, poll))
+            if self.version() != version:
+                return
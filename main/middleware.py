@@ -0,0 +1,73 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.urls import Resolver404, get_urlconf, resolve
+
+
+class LeanPipelineMiddleware:
+    """
+    Облегченный конвейер для публичных GET-эндпоинтов.
+
+    Стоит сразу после WhiteNoise (статика отдается раньше и не платит
+    за разбор URL): для GET/HEAD к view с lean_pipeline = True
+    (см. main.mixins.LeanPipelineMixin) помечает запрос, и middleware
+    сессий, CSRF, аутентификации, сообщений и X-Frame-Options ниже по стеку
+    пропускают его целиком - ни объекта сессии, ни ленивого пользователя,
+    ни Vary: Cookie в ответе. Решение по пути кешируется, так что повторные
+    запросы к тому же адресу не разбирают URL дважды.
+    """
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'LEAN_PUBLIC_PIPELINE', True)
+
+    def __call__(self, request):
+        if self.enabled and request.method in self.SAFE_METHODS:
+            request.lean_pipeline = self.is_lean(request.path_info, get_urlconf())
+        return self.get_response(request)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def is_lean(path, urlconf=None):
+        try:
+            match = resolve(path, urlconf)
+        except Resolver404:
+            return False
+        view = getattr(match.func, 'view_class', match.func)
+        return getattr(view, 'lean_pipeline', False)
+
+
+class LeanSkipMixin:
+    """Пропускает middleware для запросов, помеченных LeanPipelineMiddleware"""
+
+    def __call__(self, request):
+        if getattr(request, 'lean_pipeline', False):
+            # В async-режиме get_response возвращает корутину - ее ждет вызывающий
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class LeanSessionMiddleware(LeanSkipMixin, SessionMiddleware):
+    pass
+
+
+class LeanCsrfViewMiddleware(LeanSkipMixin, CsrfViewMiddleware):
+    pass
+
+
+class LeanAuthenticationMiddleware(LeanSkipMixin, AuthenticationMiddleware):
+    pass
+
+
+class LeanMessageMiddleware(LeanSkipMixin, MessageMiddleware):
+    pass
+
+
+class LeanXFrameOptionsMiddleware(LeanSkipMixin, XFrameOptionsMiddleware):
+    pass
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_remove_vacancy_additional_info_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата обновления'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='technology',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата обновления'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_project_updated_at_technology_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(verbose_name='Сообщение')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает отправки'), ('sent', 'Отправлено'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Раньше этого времени уведомление не отправляется', verbose_name='Следующая попытка')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')),
+            ],
+            options={
+                'verbose_name': 'Уведомление Telegram',
+                'verbose_name_plural': 'Уведомления Telegram',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='main_telegr_status_7fb97b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_telegramnotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancyapplication',
+            name='resume_sha256',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Хеш содержимого, считается при загрузке', max_length=64, null=True, verbose_name='SHA-256 резюме'),
+        ),
+    ]
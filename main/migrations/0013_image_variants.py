@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-17 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_vacancyapplication_resume_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+        migrations.AddField(
+            model_name='servicecase',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+        migrations.AddField(
+            model_name='servicedetail',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+        migrations.AddField(
+            model_name='sitecontent',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+        migrations.AddField(
+            model_name='technology',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Версии изображений'),
+        ),
+    ]
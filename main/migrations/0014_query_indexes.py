@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-17 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['-created_at', '-is_processed', '-id'], name='consultation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactrequest',
+            index=models.Index(fields=['-created_at', '-is_processed', '-id'], name='contact_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='project_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='service_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicebenefit',
+            index=models.Index(fields=['service_detail', 'order', 'id'], name='benefit_detail_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicecase',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['service_detail', 'order', 'id'], name='case_detail_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicedetail',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='detail_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicefaq',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['service_detail', 'order', 'id'], name='faq_detail_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicefeature',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['service_detail', 'order', 'id'], name='feature_detail_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sitecontent',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='sitecontent_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='technology',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='technology_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'id'], name='testimonial_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-is_featured', '-published_at', 'id'], name='vacancy_active_order_idx'),
+        ),
+    ]
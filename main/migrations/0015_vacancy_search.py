@@ -0,0 +1,72 @@
+# Generated by Django 6.0.2 on 2026-10-17 13:45
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# Схема поиска на момент миграции (не main.search: ее изменения не должны
+# менять то, что делает эта миграция)
+FTS_TABLE = 'main_vacancy_fts'
+FIELDS = ['title', 'short_description', 'description', 'skills']
+PG_DOCUMENT_SQL = (
+    "UPDATE main_vacancy SET search_document = "
+    "setweight(to_tsvector('russian', %s), 'A') || "
+    "setweight(to_tsvector('russian', %s), 'B') || "
+    "setweight(to_tsvector('russian', %s), 'C') || "
+    "setweight(to_tsvector('russian', %s), 'B') "
+    "WHERE id = %s"
+)
+FTS_INSERT_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s, %s, %s, %s, %s)"
+)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE main_vacancy ADD COLUMN search_document tsvector')
+        schema_editor.execute(
+            'CREATE INDEX vacancy_search_document_idx ON main_vacancy USING GIN (search_document)'
+        )
+        sql = PG_DOCUMENT_SQL
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"{', '.join(FIELDS)}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        sql = FTS_INSERT_SQL
+    else:
+        return
+
+    Vacancy = apps.get_model('main', 'Vacancy')
+    with connection.cursor() as cursor:
+        for vacancy in Vacancy.objects.using(connection.alias).only(*FIELDS).iterator():
+            document = [
+                vacancy.title or '',
+                vacancy.short_description or '',
+                strip_tags(vacancy.description or ''),
+                vacancy.skills or '',
+            ]
+            if connection.vendor == 'postgresql':
+                cursor.execute(sql, [*document, vacancy.pk])
+            else:
+                cursor.execute(sql, [vacancy.pk, *document])
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS vacancy_search_document_idx')
+        schema_editor.execute('ALTER TABLE main_vacancy DROP COLUMN IF EXISTS search_document')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0.2 on 2026-10-17 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Разбор и нормализация навыков на момент миграции (копия Skill.parse/normalize,
+# чтобы изменения модели не меняли перенос данных)
+def normalize(name):
+    return ' '.join(name.split()).casefold()
+
+
+def parse(text):
+    """Уникальные навыки из строки через запятую, в исходном порядке"""
+    names = {}
+    for name in (text or '').split(','):
+        name = ' '.join(name.split())[:100]
+        if name:
+            names.setdefault(normalize(name), name)
+    return list(names.values())
+
+
+def populate_skills(apps, schema_editor):
+    """Переносит навыки из строки skills существующих вакансий"""
+    Vacancy = apps.get_model('main', 'Vacancy')
+    Skill = apps.get_model('main', 'Skill')
+    VacancySkill = apps.get_model('main', 'VacancySkill')
+
+    skills = {}
+    links = []
+    for vacancy in Vacancy.objects.exclude(skills__isnull=True).exclude(skills='').only('skills'):
+        for position, name in enumerate(parse(vacancy.skills)):
+            key = normalize(name)
+            if key not in skills:
+                skills[key] = Skill.objects.create(name=name, normalized=key)
+            links.append(VacancySkill(vacancy=vacancy, skill=skills[key], position=position))
+    VacancySkill.objects.bulk_create(links)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_vacancy_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('normalized', models.CharField(editable=False, max_length=100, unique=True, verbose_name='Ключ')),
+            ],
+            options={
+                'verbose_name': 'Навык',
+                'verbose_name_plural': 'Навыки',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VacancySkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0, verbose_name='Порядок')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vacancy_links', to='main.skill')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='main.vacancy')),
+            ],
+            options={
+                'verbose_name': 'Навык вакансии',
+                'verbose_name_plural': 'Навыки вакансий',
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['skill', 'vacancy'], name='vacancy_skill_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vacancy', 'skill'), name='vacancy_skill_unique')],
+            },
+        ),
+        migrations.RunPython(populate_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-17 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_vacancy_skills'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_min', 'salary_max'], name='vacancy_salary_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_max', 'salary_min'], name='vacancy_salary_max_idx'),
+        ),
+    ]
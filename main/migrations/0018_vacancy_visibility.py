@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-17 15:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_vacancy_salary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vacancy',
+            name='published_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Вакансия появится на сайте в это время (можно указать будущую дату)', verbose_name='Дата публикации'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expires_at'], name='vacancy_active_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_vacancy_visibility'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancyapplication',
+            index=models.Index(fields=['-created_at', '-id'], name='application_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancyapplication',
+            index=models.Index(fields=['vacancy', '-created_at', '-id'], name='application_vacancy_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancyapplication',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='application_status_idx'),
+        ),
+    ]
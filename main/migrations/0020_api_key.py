@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-17 17:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_application_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Для чего выдан ключ', max_length=100, verbose_name='Название')),
+                ('prefix', models.CharField(editable=False, max_length=16, unique=True, verbose_name='Префикс')),
+                ('key_hash', models.CharField(editable=False, max_length=64, verbose_name='SHA-256 секрета')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активен')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('user', models.ForeignKey(help_text='Запросы с ключом выполняются от имени этого пользователя', on_delete=django.db.models.deletion.CASCADE, related_name='api_keys', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'API-ключ',
+                'verbose_name_plural': 'API-ключи',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:10
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class PostgresAddIndex(migrations.AddIndex):
+    """AddIndex, создающий индекс только в PostgreSQL (в состоянии моделей - всегда)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_api_key'),
+    ]
+
+    operations = [
+        PostgresAddIndex(
+            model_name='vacancyapplication',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='text_pattern_ops'), name='application_name_prefix_idx'),
+        ),
+    ]
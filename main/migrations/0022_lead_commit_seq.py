@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+def backfill_commit_seq(apps, schema_editor):
+    # Существующие заявки закоммичены раньше любой новой - общий ключ 0
+    for model_name in ('ConsultationRequest', 'ContactRequest', 'VacancyApplication'):
+        model = apps.get_model('main', model_name)
+        model.objects.using(schema_editor.connection.alias).filter(commit_seq__isnull=True).update(commit_seq=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_application_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultationrequest',
+            name='commit_seq',
+            field=models.BigIntegerField(editable=False, null=True, verbose_name='Порядок коммита'),
+        ),
+        migrations.AddField(
+            model_name='contactrequest',
+            name='commit_seq',
+            field=models.BigIntegerField(editable=False, null=True, verbose_name='Порядок коммита'),
+        ),
+        migrations.AddField(
+            model_name='vacancyapplication',
+            name='commit_seq',
+            field=models.BigIntegerField(editable=False, null=True, verbose_name='Порядок коммита'),
+        ),
+        migrations.RunPython(backfill_commit_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['commit_seq', 'id'], name='consultation_commit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactrequest',
+            index=models.Index(fields=['commit_seq', 'id'], name='contact_commit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancyapplication',
+            index=models.Index(fields=['commit_seq', 'id'], name='application_commit_idx'),
+        ),
+    ]
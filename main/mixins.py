@@ -0,0 +1,96 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.views.decorators.http import condition
+
+from .cache_service import ContentCacheService
+from .db_router import pin_primary_if_changed_since, use_replica
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы для публичных эндпоинтов.
+
+    ETag и Last-Modified строятся по версиям моделей из conditional_models,
+    поэтому ответ 304 на If-None-Match / If-Modified-Since отдается
+    без запросов к базе данных и без сериализации. Сразу после изменения
+    данные читаются с основной базы (см. db_router.pin_primary_if_changed_since).
+    """
+    conditional_models = ()
+
+    def get_conditional_models(self):
+        return self.conditional_models
+
+    def get_etag(self, request, versions):
+        # Ответ зависит от эндпоинта, параметров запроса и формата (Accept)
+        raw = '|'.join([
+            type(self).__name__,
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            *(version['token'] for version in versions),
+        ])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+        models = self.get_conditional_models()
+        if request.method not in ('GET', 'HEAD') or not models:
+            return super().dispatch(request, *args, **kwargs)
+
+        versions = ContentCacheService.get_versions(models)
+        etag = self.get_etag(request, versions)
+        changed_at = max(version['last_modified'] for version in versions)
+        last_modified = datetime.fromtimestamp(changed_at, tz=timezone.utc)
+        # Ответ (а с ним снимки и фасеты) собирается под новой версией -
+        # пока реплики могут ее не догнать, читаем основную базу
+        pin_primary_if_changed_since(changed_at)
+
+        conditional_dispatch = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )(super().dispatch)
+        return conditional_dispatch(request, *args, **kwargs)
+
+
+class LeanPipelineMixin:
+    """
+    Публичный эндпоинт без пользователя (см. main.middleware.LeanPipelineMiddleware).
+
+    GET/HEAD идут мимо middleware сессий, CSRF, аутентификации и сообщений,
+    а DRF не аутентифицирует запрос: request.user - AnonymousUser без
+    обращения к сессии. Только для ответов, не зависящих от пользователя.
+    Запросы, не помеченные middleware (LEAN_PUBLIC_PIPELINE=False), проходят
+    обычную аутентификацию DRF.
+    """
+    lean_pipeline = True
+
+    def get_authenticators(self):
+        if getattr(self.request, 'lean_pipeline', False):
+            return []
+        return super().get_authenticators()
+
+
+class ReplicaReadMixin:
+    """
+    Чтение публичных GET-эндпоинтов с реплик (см. main.db_router.ReplicaRouter).
+
+    Стоит первым в списке базовых классов, чтобы на реплику шли и запросы
+    ConditionalGetMixin. Запись в ходе запроса возвращает чтения на основную базу.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class FileDownloadMixin:
+    """
+    Эндпоинты, отдающие файл (StreamingHttpResponse), а не JSON.
+
+    Content negotiation DRF не должен отвечать 406 на Accept: text/csv
+    или application/zip - рендерер для файла не используется.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
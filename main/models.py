@@ -1,11 +1,18 @@
+import hashlib
+import secrets
 from email.policy import default
 from unicodedata import category
+from django.conf import settings
 from django.db import models
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Cast, Coalesce, Concat, Upper
+from django.utils import timezone
 from django.core.validators import EmailValidator, RegexValidator
 from ckeditor.fields import RichTextField
 from django.core.validators import FileExtensionValidator
+from .images import ResponsiveImagesMixin
 
-class Service(models.Model):
+class Service(ResponsiveImagesMixin, models.Model):
     """Модель услуг"""
     title = models.CharField('Название', max_length=200)
     name = models.CharField('Имя', max_length=200, blank=True, null=True)
@@ -15,12 +22,22 @@ class Service(models.Model):
     order = models.PositiveSmallIntegerField("Порядок", default=0, help_text="Чем меньше число, тем выше позиция")
     is_active = models.BooleanField('Активно', default=True, help_text="Отображать на сайте?")
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
-    updated_at = models.DateTimeField("Дата обновления", auto_now=True) 
+    updated_at = models.DateTimeField("Дата обновления", auto_now=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('image',)
     
     class Meta:
         ordering = ['order', 'title']  
         verbose_name = "Услуга/Проект"
         verbose_name_plural = "Услуги/Проекты"  
+        indexes = [
+            # Публичный список: WHERE is_active ORDER BY order, id
+            models.Index(
+                fields=['order', 'id'],
+                name='service_active_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -32,24 +49,34 @@ class Service(models.Model):
     short_description.short_description = "Описание (кратко)"
 
 
-class Technology(models.Model):
+class Technology(ResponsiveImagesMixin, models.Model):
     """Модель для технологий (секция 'Мы используем')"""
     name = models.CharField('Название', max_length=200)
     logo = models.ImageField("Логотип", upload_to='technologies/', blank=True, null=True, help_text="SVG или PNG логотип")
     url = models.URLField('Ссылка на сайт', max_length=200, blank=True, null=True, help_text='Например: https://www.python.org/')
     order = models.PositiveSmallIntegerField("Порядок", default=0)
     is_active = models.BooleanField("Активно", default=True)
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('logo',)
 
     class Meta:
         ordering = ['order', 'name']
         verbose_name = "Технология" 
         verbose_name_plural = "Технологии"  
+        indexes = [
+            models.Index(
+                fields=['order', 'id'],
+                name='technology_active_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Testimonial(models.Model):
+class Testimonial(ResponsiveImagesMixin, models.Model):
     """Модель для отзывов клиентов (секция 'Благодарности наших клиентов')"""
     client_name = models.CharField(
         'Имя клиента', 
@@ -104,11 +131,20 @@ class Testimonial(models.Model):
     )
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('client_photo',)
     
     class Meta:
         ordering = ['order', '-created_at']
         verbose_name = "Отзыв клиента"
         verbose_name_plural = "Отзывы клиентов"
+        indexes = [
+            models.Index(
+                fields=['order', 'id'],
+                name='testimonial_active_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.client_name} - {self.client_position}"
@@ -119,7 +155,7 @@ class Testimonial(models.Model):
         return f"{self.client_name}, {self.client_position}"
 
 
-class Project(models.Model):
+class Project(ResponsiveImagesMixin, models.Model):
     """Модель для проектов в оглавлении"""
     title = models.CharField(
         'Название проекта',
@@ -157,17 +193,85 @@ class Project(models.Model):
     order = models.PositiveSmallIntegerField("Порядок", default=0)
     is_active = models.BooleanField("Активно", default=True)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('image',)
     
     class Meta:
         ordering = ['order', 'title']
         verbose_name = "Проект"
         verbose_name_plural = "Проекты"
+        indexes = [
+            models.Index(
+                fields=['order', 'id'],
+                name='project_active_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.title
 
 
-class ConsultationRequest(models.Model):
+class CommitSequence(models.Expression):
+    """
+    Ключ порядка коммита заявки (commit_seq), вычисляется в самом INSERT.
+
+    PostgreSQL - id транзакции (pg_current_xact_id): транзакции с id меньше
+    xmin снимка уже завершены, поэтому заявки с commit_seq ниже этой границы
+    больше не появятся (см. horizon). SQLite - MAX(commit_seq) + 1 по всем
+    таблицам заявок: запись в SQLite сериализована, и ключ растет в порядке
+    коммитов. Заявки одной транзакции получают одинаковый ключ.
+    """
+    output_field = models.BigIntegerField()
+
+    @staticmethod
+    def next_value_sql(connection):
+        tables = [connection.ops.quote_name(model._meta.db_table) for model in LEAD_MODELS]
+        union = ' UNION ALL '.join(f'SELECT MAX(commit_seq) AS seq FROM {table}' for table in tables)
+        return f'(SELECT COALESCE(MAX(seq), 0) + 1 FROM ({union}) AS lead_sequences)'
+
+    def as_sql(self, compiler, connection):
+        return self.next_value_sql(connection), []
+
+    def as_postgresql(self, compiler, connection):
+        return 'pg_current_xact_id()::text::bigint', []
+
+    @staticmethod
+    def horizon(connection):
+        """Граница: заявки с commit_seq ниже нее закоммичены, новые получат не меньше"""
+        if connection.vendor == 'postgresql':
+            sql = 'SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+        else:
+            sql = f'SELECT {CommitSequence.next_value_sql(connection)}'
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()[0]
+
+
+class CommitOrderedQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.commit_seq = CommitSequence()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class CommitOrderedMixin:
+    """Заявка с ключом порядка коммита commit_seq (см. CommitSequence и main.leads.LeadInbox)"""
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding:
+            self.commit_seq = CommitSequence()
+        super().save(*args, **kwargs)
+        if adding:
+            # Значение есть только в базе: поле становится отложенным,
+            # и повторный save() экземпляра его не перезаписывает
+            self.__dict__.pop('commit_seq', None)
+
+
+class ConsultationRequest(CommitOrderedMixin, models.Model):
     """Модель для заявок на консультацию"""
     INTEREST_CHOICES = [
         ('website', 'Разработка сайта'),
@@ -209,11 +313,18 @@ class ConsultationRequest(models.Model):
     notes = models.TextField('Заметки', blank=True, null=True)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    commit_seq = models.BigIntegerField('Порядок коммита', null=True, editable=False)
+    
+    objects = CommitOrderedQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at', '-is_processed']
         verbose_name = "Заявка на консультацию"
         verbose_name_plural = "Заявки на консультацию"
+        indexes = [
+            models.Index(fields=['-created_at', '-is_processed', '-id'], name='consultation_created_idx'),
+            models.Index(fields=['commit_seq', 'id'], name='consultation_commit_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.phone}"
@@ -304,7 +415,7 @@ class CompanyInfo(models.Model):
         return "Контакты компании"
 
 
-class SiteContent(models.Model):
+class SiteContent(ResponsiveImagesMixin, models.Model):
     """Модель для контента страницы"""
     # Заголовки секций
     hero_title = models.CharField(
@@ -392,10 +503,16 @@ class SiteContent(models.Model):
     is_active = models.BooleanField('Активно', default=True)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('hero_image',)
     
     class Meta:
         verbose_name = 'Контент страницы'
         verbose_name_plural = 'Контент страницы'
+        indexes = [
+            # Активная запись одна: WHERE is_active ORDER BY id LIMIT 1
+            models.Index(fields=['id'], name='sitecontent_active_idx', condition=models.Q(is_active=True)),
+        ]
     
     def save(self, *args, **kwargs):
         if self.is_active:
@@ -407,7 +524,7 @@ class SiteContent(models.Model):
 
 
 # Добавьте в конец файла main/models.py
-class ContactRequest(models.Model):
+class ContactRequest(CommitOrderedMixin, models.Model):
     """Модель для контактных заявок"""
     email = models.EmailField('Email')
     phone = models.CharField('Телефон', max_length=20, blank=True, null=True)
@@ -415,17 +532,24 @@ class ContactRequest(models.Model):
     notes = models.TextField('Заметки', blank=True, null=True)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    commit_seq = models.BigIntegerField('Порядок коммита', null=True, editable=False)
+    
+    objects = CommitOrderedQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at', '-is_processed']
         verbose_name = "Контактная заявка"
         verbose_name_plural = "Контактные заявки"
+        indexes = [
+            models.Index(fields=['-created_at', '-is_processed', '-id'], name='contact_created_idx'),
+            models.Index(fields=['commit_seq', 'id'], name='contact_commit_idx'),
+        ]
     
     def __str__(self):
         return self.email or self.phone or f"Заявка #{self.id}"
 
 
-class ServiceDetail(models.Model):
+class ServiceDetail(ResponsiveImagesMixin, models.Model):
     """Модель для детальной страницы услуги"""
     # Связь с существующей моделью Service
     service = models.OneToOneField(
@@ -500,10 +624,20 @@ class ServiceDetail(models.Model):
     is_active = models.BooleanField('Активно', default=True)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('main_image', 'banner_image')
     
     class Meta:
         verbose_name = 'Детальная страница услуги'
         verbose_name_plural = 'Детальные страницы услуг'
+        indexes = [
+            # Список детальных страниц: WHERE is_active ORDER BY created_at DESC, id DESC
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='detail_active_created_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -569,6 +703,14 @@ class ServiceFeature(models.Model):
         ordering = ['order']
         verbose_name = 'Особенность услуги'
         verbose_name_plural = 'Особенности услуги'
+        indexes = [
+            # Дочерние списки: WHERE service_detail_id = ? AND is_active ORDER BY order, id
+            models.Index(
+                fields=['service_detail', 'order', 'id'],
+                name='feature_detail_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.service_detail.title}"
@@ -648,6 +790,9 @@ class ServiceBenefit(models.Model):
         ordering = ['order']
         verbose_name = 'Преимущество'
         verbose_name_plural = 'Преимущества'
+        indexes = [
+            models.Index(fields=['service_detail', 'order', 'id'], name='benefit_detail_order_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -678,12 +823,19 @@ class ServiceFAQ(models.Model):
         ordering = ['order']
         verbose_name = 'Часто задаваемый вопрос'
         verbose_name_plural = 'Часто задаваемые вопросы'
+        indexes = [
+            models.Index(
+                fields=['service_detail', 'order', 'id'],
+                name='faq_detail_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.question
 
 
-class ServiceCase(models.Model):
+class ServiceCase(ResponsiveImagesMixin, models.Model):
     """Модель для кейсов/примеров работ"""
     service_detail = models.ForeignKey(
         ServiceDetail,
@@ -731,15 +883,74 @@ class ServiceCase(models.Model):
     
     order = models.PositiveSmallIntegerField('Порядок', default=0)
     is_active = models.BooleanField('Активно', default=True)
+    image_variants = models.JSONField('Версии изображений', default=dict, blank=True, editable=False)
+    responsive_image_fields = ('image',)
     
     class Meta:
         ordering = ['order']
         verbose_name = 'Кейс'
         verbose_name_plural = 'Кейсы'
+        indexes = [
+            models.Index(
+                fields=['service_detail', 'order', 'id'],
+                name='case_detail_order_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.title
 
+class VacancyQuerySet(models.QuerySet):
+    """Выборки вакансий с вычислениями на стороне базы"""
+    
+    # Значения для вакансий без зарплаты: при сортировке они оказываются в конце
+    SALARY_SORT_MISSING = 2 ** 31 - 1
+    
+    def visible(self, now=None):
+        """
+        Вакансии, видимые на сайте: активные, уже опубликованные и не истекшие.
+        Истекшие строки планировщик (manage.py update_vacancy_visibility)
+        еще и выключает, чтобы они выпали из частичных индексов по is_active.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now),
+            is_active=True,
+            published_at__lte=now,
+        )
+    
+    def with_salary_range(self):
+        """Строка зарплатной вилки (как Vacancy.salary_range) вычисляется в SQL"""
+        salary_min = Cast('salary_min', models.CharField())
+        salary_max = Cast('salary_max', models.CharField())
+        return self.annotate(salary_label=models.Case(
+            models.When(
+                salary_min__gt=0, salary_max__gt=0,
+                then=Concat(salary_min, models.Value(' - '), salary_max, models.Value('$')),
+            ),
+            models.When(salary_min__gt=0, then=Concat(models.Value('от '), salary_min, models.Value('$'))),
+            models.When(salary_max__gt=0, then=Concat(models.Value('до '), salary_max, models.Value('$'))),
+            models.When(~models.Q(salary_text='') & models.Q(salary_text__isnull=False), then='salary_text'),
+            default=models.Value('з/п не указана'),
+            output_field=models.CharField(),
+        ))
+    
+    def with_salary_sort(self, descending=False):
+        """
+        Ключ сортировки по зарплате salary_sort: по возрастанию - нижняя граница
+        вилки, по убыванию - верхняя; вакансии без зарплаты в конце
+        """
+        if descending:
+            key = Coalesce('salary_max', 'salary_min', models.Value(-1), output_field=models.IntegerField())
+        else:
+            key = Coalesce(
+                'salary_min', 'salary_max', models.Value(self.SALARY_SORT_MISSING),
+                output_field=models.IntegerField(),
+            )
+        return self.annotate(salary_sort=key)
+
+
 class Vacancy(models.Model):
     """Модель для вакансий"""
     EMPLOYMENT_TYPE_CHOICES = (
@@ -863,7 +1074,8 @@ class Vacancy(models.Model):
     # Даты
     published_at = models.DateTimeField(
         'Дата публикации',
-        auto_now_add=True
+        default=timezone.now,
+        help_text='Вакансия появится на сайте в это время (можно указать будущую дату)'
     )
     updated_at = models.DateTimeField(
         'Дата обновления',
@@ -898,6 +1110,8 @@ class Vacancy(models.Model):
         editable=False
     )
     
+    objects = VacancyQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', '-is_featured', '-published_at']
         verbose_name = 'Вакансия'
@@ -905,19 +1119,48 @@ class Vacancy(models.Model):
         indexes = [
             models.Index(fields=['category', 'level', 'employment_type']),
             models.Index(fields=['is_active', 'published_at']),
+            # Планировщик видимости: ближайшие истечения активных вакансий
+            models.Index(
+                fields=['expires_at'],
+                name='vacancy_active_expires_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Фильтр по пересечению зарплатных вилок (?salary_from=, ?salary_to=)
+            models.Index(
+                fields=['salary_min', 'salary_max'],
+                name='vacancy_salary_min_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['salary_max', 'salary_min'],
+                name='vacancy_salary_max_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Публичный список: WHERE is_active ORDER BY order, is_featured DESC, published_at DESC, id
+            models.Index(
+                fields=['order', '-is_featured', '-published_at', 'id'],
+                name='vacancy_active_order_idx',
+                condition=models.Q(is_active=True),
+            ),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.get_level_display()})"
     
-    def increment_views(self):
-        """Увеличить счетчик просмотров"""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+    def increment_views(self, count=1):
+        """Увеличить счетчик просмотров (атомарно, без чтения строки)
+
+        Публичная страница вакансии использует буфер main.view_counter,
+        этот метод - для разовых начислений.
+        """
+        Vacancy.objects.filter(pk=self.pk).update(views_count=models.F('views_count') + count)
+        self.views_count += count
     
     @property
     def salary_range(self):
-        """Форматирование зарплатной вилки"""
+        """Форматирование зарплатной вилки (в API приходит из SQL, см. with_salary_range)"""
+        if 'salary_label' in self.__dict__:
+            return self.salary_label
         if self.salary_min and self.salary_max:
             return f"{self.salary_min} - {self.salary_max}$"
         elif self.salary_min:
@@ -927,9 +1170,96 @@ class Vacancy(models.Model):
         elif self.salary_text:
             return self.salary_text
         return "з/п не указана"
+    
+    def sync_skills(self):
+        """Синхронизирует нормализованные навыки со строкой skills (из админки)"""
+        names = Skill.parse(self.skills)
+        current = list(
+            self.skill_links.order_by('position').values_list('skill__normalized', flat=True)
+        )
+        if current == [Skill.normalize(name) for name in names]:
+            return
+        
+        skills = Skill.get_or_create_many(names)
+        self.skill_links.all().delete()
+        VacancySkill.objects.bulk_create([
+            VacancySkill(vacancy=self, skill=skill, position=position)
+            for position, skill in enumerate(skills)
+        ])
 
 
-class VacancyApplication(models.Model):
+class Skill(models.Model):
+    """Нормализованный навык (без учета регистра и повторов)"""
+    name = models.CharField('Название', max_length=100)
+    normalized = models.CharField('Ключ', max_length=100, unique=True, editable=False)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Навык'
+        verbose_name_plural = 'Навыки'
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def normalize(name):
+        return ' '.join(name.split()).casefold()
+    
+    @staticmethod
+    def parse(text):
+        """Навыки из строки через запятую: без пустых и повторов, в исходном порядке"""
+        names = {}
+        for name in (text or '').split(','):
+            name = ' '.join(name.split())[:100]
+            if name:
+                names.setdefault(Skill.normalize(name), name)
+        return list(names.values())
+    
+    @staticmethod
+    def get_or_create_many(names):
+        """Навыки по названиям (недостающие создаются), в порядке names"""
+        keys = [Skill.normalize(name) for name in names]
+        existing = {skill.normalized: skill for skill in Skill.objects.filter(normalized__in=keys)}
+        missing = [
+            Skill(name=name, normalized=key)
+            for name, key in zip(names, keys) if key not in existing
+        ]
+        if missing:
+            Skill.objects.bulk_create(missing, ignore_conflicts=True)
+            existing.update(
+                (skill.normalized, skill)
+                for skill in Skill.objects.filter(normalized__in=[skill.normalized for skill in missing])
+            )
+        return [existing[key] for key in keys]
+
+
+class VacancySkill(models.Model):
+    """Связь вакансии с навыком (position - порядок из строки skills)"""
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='vacancy_links')
+    position = models.PositiveSmallIntegerField('Порядок', default=0)
+    
+    class Meta:
+        ordering = ['position']
+        verbose_name = 'Навык вакансии'
+        verbose_name_plural = 'Навыки вакансий'
+        constraints = [
+            models.UniqueConstraint(fields=['vacancy', 'skill'], name='vacancy_skill_unique'),
+        ]
+        indexes = [
+            # Фильтр ?skill=: по навыку сразу к вакансиям
+            models.Index(fields=['skill', 'vacancy'], name='vacancy_skill_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.vacancy_id}: {self.skill_id}"
+
+
+# Допустимые форматы резюме (проверяются и при потоковой загрузке)
+RESUME_EXTENSIONS = ['pdf', 'doc', 'docx', 'txt']
+
+
+class VacancyApplication(CommitOrderedMixin, models.Model):
     """Модель для откликов на вакансию (форма внизу)"""
     
     vacancy = models.ForeignKey(
@@ -965,11 +1295,20 @@ class VacancyApplication(models.Model):
         upload_to='vacancies/resumes/',
         validators=[
             FileExtensionValidator(
-                allowed_extensions=['pdf', 'doc', 'docx', 'txt']
+                allowed_extensions=RESUME_EXTENSIONS
             )
         ],
         help_text='PDF, DOC, DOCX или TXT'
     )
+    resume_sha256 = models.CharField(
+        'SHA-256 резюме',
+        max_length=64,
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+        help_text='Хеш содержимого, считается при загрузке'
+    )
     
     # Сопроводительное письмо (опционально)
     cover_letter = models.TextField(
@@ -1003,14 +1342,121 @@ class VacancyApplication(models.Model):
     # Даты
     created_at = models.DateTimeField('Дата отклика', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+    commit_seq = models.BigIntegerField('Порядок коммита', null=True, editable=False)
+    
+    objects = CommitOrderedQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Отклик на вакансию'
         verbose_name_plural = 'Отклики на вакансии'
+        indexes = [
+            # Список в админке (сортировка -created_at, -pk и дата-иерархия),
+            # в том числе с фильтром по вакансии или статусу
+            models.Index(fields=['-created_at', '-id'], name='application_created_idx'),
+            models.Index(fields=['vacancy', '-created_at', '-id'], name='application_vacancy_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='application_status_idx'),
+            # Поиск '^name' в админке - UPPER(name) LIKE 'X%'; text_pattern_ops нужен
+            # для LIKE при любой локали базы. Только PostgreSQL (см. миграцию 0021)
+            models.Index(OpClass(Upper('name'), name='text_pattern_ops'), name='application_name_prefix_idx'),
+            models.Index(fields=['commit_seq', 'id'], name='application_commit_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.vacancy.title}"
 
 
+# Таблицы заявок с общим ключом порядка коммита (см. CommitSequence)
+LEAD_MODELS = [ConsultationRequest, ContactRequest, VacancyApplication]
 
+
+class TelegramNotification(models.Model):
+    """Исходящее уведомление в Telegram (outbox).
+
+    Создается в одной транзакции с заявкой и доставляется отдельным
+    процессом: python manage.py send_telegram_notifications
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Ожидает отправки'),
+        ('sent', 'Отправлено'),
+        ('failed', 'Ошибка'),
+    ]
+    
+    message = models.TextField('Сообщение')
+    status = models.CharField(
+        'Статус',
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+        help_text='Раньше этого времени уведомление не отправляется'
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True, null=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    sent_at = models.DateTimeField('Дата отправки', blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Уведомление Telegram'
+        verbose_name_plural = 'Уведомления Telegram'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"Уведомление #{self.pk} ({self.get_status_display()})"
+
+
+class ApiKey(models.Model):
+    """Ключ доступа к административному API для скриптов и интеграций.
+
+    Ключ вида <prefix>.<secret> показывается один раз при создании;
+    в базе хранится только SHA-256 секрета. Секрет - 32 случайных байта,
+    поэтому медленный хеш паролей (PBKDF2) не нужен: проверка ключа -
+    один хеш SHA-256 и поиск по prefix (из кеша, см. main.authentication).
+    """
+    PREFIX_LENGTH = 8
+    
+    name = models.CharField('Название', max_length=100, help_text='Для чего выдан ключ')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='api_keys',
+        verbose_name='Пользователь',
+        help_text='Запросы с ключом выполняются от имени этого пользователя'
+    )
+    prefix = models.CharField('Префикс', max_length=16, unique=True, editable=False)
+    key_hash = models.CharField('SHA-256 секрета', max_length=64, editable=False)
+    is_active = models.BooleanField('Активен', default=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'API-ключ'
+        verbose_name_plural = 'API-ключи'
+    
+    def __str__(self):
+        return f"{self.name} ({self.prefix})"
+    
+    @staticmethod
+    def hash_secret(secret):
+        return hashlib.sha256(secret.encode('utf-8')).hexdigest()
+    
+    def set_secret(self):
+        """Назначает новый prefix и секрет; возвращает ключ целиком - он больше нигде не сохраняется"""
+        self.prefix = secrets.token_hex(ApiKey.PREFIX_LENGTH // 2)
+        secret = secrets.token_urlsafe(32)
+        self.key_hash = ApiKey.hash_secret(secret)
+        return f'{self.prefix}.{secret}'
+    
+    @staticmethod
+    def generate(user, name):
+        """Создает ключ; возвращает (ApiKey, ключ целиком)"""
+        api_key = ApiKey(name=name, user=user)
+        key = api_key.set_secret()
+        api_key.save()
+        return api_key, key
@@ -0,0 +1,352 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) пагинация по текущей сортировке queryset.
+
+    Позиция в курсоре - значения всех полей сортировки последней записи
+    (плюс pk для уникальности), поэтому любая страница выбирается
+    условием WHERE по индексу и стоит столько же, сколько первая.
+    NULL в полях сортировки идут в конце списка (NULLS LAST).
+    Курсор непрозрачный: base64 от JSON.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """Поля сортировки queryset, дополненные pk для однозначности"""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        for field in ordering:
+            if not isinstance(field, str) or '__' in field or field.lstrip('-') == '?':
+                raise ValidationError({'ordering': f'Сортировка {field!r} не поддерживается'})
+        names = [field.lstrip('-') for field in ordering]
+        if 'pk' not in names and 'id' not in names:
+            direction = '-' if ordering and ordering[0].startswith('-') else ''
+            ordering.append(f'{direction}pk')
+        return ordering
+
+    def bind(self, queryset):
+        """Модель, аннотации и сортировка queryset для построения условий по позиции"""
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.bind(queryset)
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        if reverse:
+            ordering = [self._invert(field) for field in ordering]
+
+        # NULL в конце прямого прохода, значит в начале обратного
+        queryset = queryset.order_by(*self._order_by(ordering, nulls_first=reverse))
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position, nulls_after=not reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # В обратном направлении "есть еще" означает наличие предыдущей страницы
+        self.has_next = (not reverse and has_more) or (reverse and position is not None)
+        self.has_previous = (reverse and has_more) or (not reverse and position is not None)
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы (из полей next/previous)',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Размер страницы (не больше {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    # ========== КУРСОР ==========
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            position = payload['p']
+            if len(position) != len(self.ordering):
+                raise ValueError
+            fields = [self._field(name) for name in self.ordering]
+            position = [
+                None if value is None else field.to_python(value)
+                for field, value in zip(fields, position)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _field(self, name):
+        name = name.lstrip('-')
+        if name == 'pk':
+            return self.model._meta.pk
+        # Сортировка по аннотации (например, search_rank) - по ее output_field
+        if name in self.annotations:
+            return self.annotations[name].output_field
+        return self.model._meta.get_field(name)
+
+    def _attname(self, name):
+        name = name.lstrip('-')
+        if name in self.annotations:
+            return name
+        return self._field(name).attname
+
+    def _position(self, obj):
+        position = []
+        for name in self.ordering:
+            value = getattr(obj, self._attname(name))
+            if isinstance(value, (datetime, date, time)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            position.append(value)
+        return position
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _nullable(self, field):
+        return getattr(self._field(field), 'null', False)
+
+    def _order_by(self, ordering, nulls_first):
+        expressions = []
+        for field in ordering:
+            if not self._nullable(field):
+                expressions.append(field)
+                continue
+            expression = F(field.lstrip('-'))
+            nulls = {'nulls_first': True} if nulls_first else {'nulls_last': True}
+            expressions.append(expression.desc(**nulls) if field.startswith('-') else expression.asc(**nulls))
+        return expressions
+
+    def _step(self, field, value, nulls_after, inclusive=False):
+        """Условие "после значения" (inclusive - "не раньше") для одного поля сортировки"""
+        name = field.lstrip('-')
+        if value is None:
+            # После NULL идут только значения, если NULL в начале прохода
+            after = Q(pk__in=[]) if nulls_after else Q(**{f'{name}__isnull': False})
+            return after | Q(**{f'{name}__isnull': True}) if inclusive else after
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        after = Q(**{f'{name}__{lookup}{"e" if inclusive else ""}': value})
+        if nulls_after and self._nullable(field):
+            after |= Q(**{f'{name}__isnull': True})
+        return after
+
+    def _after(self, ordering, position, nulls_after=True):
+        """
+        Лексикографическое условие "строго после позиции" для полей сортировки.
+
+        Цепочка OR дополнена отдельной границей по первому полю
+        (field >= value), по которой PostgreSQL начинает чтение индекса
+        сортировки с позиции курсора, а не с начала таблицы.
+        """
+        conditions = []
+        for index, field in enumerate(ordering):
+            equal = Q()
+            for prev, value in zip(ordering[:index], position[:index]):
+                name = prev.lstrip('-')
+                equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+            conditions.append(equal & self._step(field, position[index], nulls_after))
+        bound = self._step(ordering[0], position[0], nulls_after, inclusive=True)
+        return bound & reduce(or_, conditions)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки для таблиц в сотни тысяч строк.
+
+    count без фильтров - оценка планировщика PostgreSQL (pg_class.reltuples),
+    с фильтрами (или если оценки нет, она устарела и меньше уже пройденных
+    строк) - COUNT, ограниченный COUNT_LIMIT строками после текущей страницы
+    (current_page задает админка), так что полный подсчет таблицы
+    не выполняется никогда, а следующие страницы всегда достижимы. Упершийся
+    в предел счетчик помечается capped и показывается как "10000+".
+
+    Страница выбирается в два шага: сначала pk по индексу сортировки
+    (index-only scan), затем сами строки по этим pk. Конец каждой страницы
+    запоминается в кеше, и следующие страницы (до ANCHOR_WINDOW вперед)
+    выбираются условием по индексу от этой позиции, как в KeysetPagination,
+    а не OFFSET от начала. OFFSET от начала остается только для прямого
+    перехода на далекую страницу и сортировок не по полям модели.
+    """
+    COUNT_LIMIT = 10000
+    ANCHOR_WINDOW = 10
+    ANCHOR_TIMEOUT = 600
+    template_name = 'admin/main/estimated_count_pagination.html'
+    current_page = 1
+    capped = False
+
+    def estimated_count(self):
+        """Оценка числа строк таблицы или None (не PostgreSQL, нет статистики)"""
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] >= 0 else None
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self.estimated_count()
+            # Сразу после массовой загрузки оценка бывает устаревшей: меньше
+            # строк, чем уже пройдено страницами, - тогда считаем
+            seen = self.current_page * self.per_page
+            if estimate is not None and estimate >= max(self.COUNT_LIMIT, seen):
+                return estimate
+        limit = (self.current_page - 1) * self.per_page + self.COUNT_LIMIT
+        count = queryset.values('pk')[:limit].count()
+        self.capped = count >= limit
+        return count
+
+    # ========== ПОЗИЦИИ СТРАНИЦ ==========
+
+    @cached_property
+    def keyset(self):
+        """Условия по позиции для сортировки списка; None, если сортировка не по полям модели"""
+        keyset = KeysetPagination()
+        try:
+            keyset.bind(self.object_list)
+            if any(keyset._nullable(field) for field in keyset.ordering):
+                return None
+        except (ValidationError, FieldDoesNotExist):
+            return None
+        return keyset
+
+    @cached_property
+    def anchor_prefix(self):
+        queryset = self.object_list
+        try:
+            query = str(queryset.query)
+        except EmptyResultSet:
+            return None
+        digest = hashlib.sha1(f'{queryset.db}|{query}|{self.per_page}'.encode('utf-8')).hexdigest()
+        return f'admin-page-anchor:{digest}'
+
+    def nearest_anchor(self, number):
+        """(номер страницы, позиция ее последней строки) - ближайшая запомненная до number"""
+        if self.keyset is None or self.anchor_prefix is None:
+            return None
+        pages = range(number - 1, max(number - 1 - self.ANCHOR_WINDOW, 0), -1)
+        found = cache.get_many([f'{self.anchor_prefix}:{page}' for page in pages])
+        for page in pages:
+            position = found.get(f'{self.anchor_prefix}:{page}')
+            if position is not None:
+                return page, position
+        return None
+
+    def page(self, number):
+        number = self.validate_number(number)
+        queryset = self.object_list
+        if number == 1:
+            # Первой странице пропускать нечего - обычный LIMIT
+            return self._get_page(queryset[:self.per_page], number, self)
+
+        skip = (number - 1) * self.per_page
+        anchor = self.nearest_anchor(number)
+        if anchor is not None:
+            page, position = anchor
+            queryset = queryset.filter(self.keyset._after(self.keyset.ordering, position))
+            skip = (number - 1 - page) * self.per_page
+
+        if self.keyset is None:
+            ids = list(queryset.values_list('pk', flat=True)[skip:skip + self.per_page])
+        else:
+            attnames = [self.keyset._attname(field) for field in self.keyset.ordering]
+            rows = list(queryset.values_list(*attnames, 'pk')[skip:skip + self.per_page])
+            ids = [row[-1] for row in rows]
+            if rows and self.anchor_prefix is not None:
+                cache.set(f'{self.anchor_prefix}:{number}', list(rows[-1][:-1]), self.ANCHOR_TIMEOUT)
+        return self._get_page(self.object_list.filter(pk__in=ids), number, self)
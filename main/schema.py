@@ -0,0 +1,148 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.http import condition
+from drf_spectacular.views import SpectacularAPIView
+
+try:
+    import brotli
+except ImportError:  # Brotli из requirements.txt; в окружении без него отдаем gzip
+    brotli = None
+
+
+class SchemaArtifact:
+    """
+    OpenAPI схема, заранее собранная в файл (manage.py build_openapi_schema).
+
+    Рядом с schema.json лежат сжатые версии schema.json.gz и schema.json.br,
+    поэтому при запросе не нужны ни интроспекция view/сериализаторов,
+    ни сжатие на лету.
+    """
+    MEDIA_TYPE = 'application/vnd.oai.openapi+json'
+    # Кодировка -> расширение файла, в порядке предпочтения
+    ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+    _lock = threading.Lock()
+    _loaded = {}
+
+    @staticmethod
+    def path():
+        return settings.OPENAPI_SCHEMA_FILE
+
+    @staticmethod
+    def generate():
+        """Генерация схемы drf-spectacular (медленно, только при сборке)"""
+        from drf_spectacular.generators import SchemaGenerator
+        from drf_spectacular.renderers import OpenApiJsonRenderer
+
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+    @staticmethod
+    def build(path=None):
+        """Пишет схему и ее сжатые версии на диск; возвращает список файлов"""
+        path = path or SchemaArtifact.path()
+        content = SchemaArtifact.generate()
+        variants = {path: content, path + '.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[path + '.br'] = brotli.compress(content, quality=11)
+        else:
+            # Устаревший .br от прошлой сборки не должен расходиться со схемой
+            variants[path + '.br'] = None
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        written = []
+        for name, data in variants.items():
+            if data is None:
+                if os.path.exists(name):
+                    os.remove(name)
+                continue
+            # Запись через временный файл: работающие процессы не увидят полфайла
+            tmp_name = name + '.tmp'
+            with open(tmp_name, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp_name, name)
+            written.append(name)
+        return written
+
+    @staticmethod
+    def load():
+        """
+        Содержимое файла схемы и его версий, кешируется в памяти процесса
+        до изменения файла: {'etag', 'identity', 'gzip', 'br'}.
+        """
+        path = SchemaArtifact.path()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = SchemaArtifact._loaded.get(path)
+        if cached and cached['mtime'] == mtime:
+            return cached
+
+        with SchemaArtifact._lock:
+            with open(path, 'rb') as fh:
+                content = fh.read()
+            artifact = {
+                'mtime': mtime,
+                'etag': hashlib.sha256(content).hexdigest()[:32],
+                'identity': content,
+            }
+            for encoding, suffix in SchemaArtifact.ENCODINGS.items():
+                try:
+                    with open(path + suffix, 'rb') as fh:
+                        artifact[encoding] = fh.read()
+                except FileNotFoundError:
+                    artifact[encoding] = None
+            SchemaArtifact._loaded[path] = artifact
+        return artifact
+
+    @staticmethod
+    def choose_encoding(request, artifact):
+        accepted = {
+            part.split(';')[0].strip().lower()
+            for part in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        for encoding in SchemaArtifact.ENCODINGS:
+            if encoding in accepted and artifact.get(encoding):
+                return encoding
+        return None
+
+
+class PrecomputedSchemaView(View):
+    """
+    /api/schema/ из заранее собранного файла: ETag, Cache-Control
+    и сжатая версия по Accept-Encoding. При OPENAPI_RUNTIME_SCHEMA=True
+    схема, как раньше, генерируется на каждый запрос (для разработки).
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def dispatch(self, request, *args, **kwargs):
+        if settings.OPENAPI_RUNTIME_SCHEMA:
+            return SpectacularAPIView.as_view()(request, *args, **kwargs)
+
+        artifact = SchemaArtifact.load()
+        if artifact is None:
+            raise Http404('OpenAPI схема не собрана: выполните manage.py build_openapi_schema')
+
+        # Строгий ETag у каждой кодировки свой: байты identity, gzip и br разные
+        encoding = SchemaArtifact.choose_encoding(request, artifact)
+        etag = f"{artifact['etag']}-{encoding}" if encoding else artifact['etag']
+        view = condition(etag_func=lambda request, *args, **kwargs: etag)(self.serve)
+        response = view(request, artifact, encoding)
+        response['Cache-Control'] = f'public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    def serve(self, request, artifact, encoding):
+        response = HttpResponse(artifact[encoding or 'identity'], content_type=SchemaArtifact.MEDIA_TYPE)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return response
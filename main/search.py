@@ -0,0 +1,145 @@
+import re
+
+from django.db import connections, router
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+
+class VacancySearch:
+    """
+    Полнотекстовый поиск вакансий с ранжированием.
+
+    PostgreSQL: колонка search_document (tsvector) с GIN-индексом.
+    SQLite: виртуальная таблица FTS5 main_vacancy_fts (rowid = id вакансии).
+    Обе структуры создаются миграцией 0015 и обновляются при сохранении
+    вакансии (см. main.signals). Для других СУБД - icontains без ранга.
+    """
+    PG_CONFIG = 'russian'
+    FTS_TABLE = 'main_vacancy_fts'
+    # Поля документа и их веса (PostgreSQL: A-D, SQLite: коэффициенты bm25)
+    FIELDS = ['title', 'short_description', 'description', 'skills']
+    PG_WEIGHTS = ['A', 'B', 'C', 'B']
+    FTS_WEIGHTS = [10.0, 4.0, 1.0, 4.0]
+    MAX_TERMS = 10
+
+    # Поля, при изменении которых документ нужно переиндексировать
+    INDEXED_FIELDS = set(FIELDS)
+
+    # ========== ИНДЕКСАЦИЯ ==========
+
+    @staticmethod
+    def document(vacancy):
+        """Тексты полей для индекса (описание из CKEditor - без HTML)"""
+        return [
+            vacancy.title or '',
+            vacancy.short_description or '',
+            strip_tags(vacancy.description or ''),
+            vacancy.skills or '',
+        ]
+
+    @staticmethod
+    def pg_document_sql(table):
+        parts = [
+            f"setweight(to_tsvector('{VacancySearch.PG_CONFIG}', %s), '{weight}')"
+            for weight in VacancySearch.PG_WEIGHTS
+        ]
+        return f'UPDATE {table} SET search_document = {" || ".join(parts)} WHERE id = %s'
+
+    @staticmethod
+    def index(vacancy, using=None):
+        """Обновляет документ одной вакансии"""
+        using = using or router.db_for_write(type(vacancy), instance=vacancy)
+        connection = connections[using]
+        table = connection.ops.quote_name(vacancy._meta.db_table)
+        document = VacancySearch.document(vacancy)
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(VacancySearch.pg_document_sql(table), [*document, vacancy.pk])
+            elif connection.vendor == 'sqlite':
+                fts = VacancySearch.FTS_TABLE
+                cursor.execute(f'DELETE FROM {fts} WHERE rowid = %s', [vacancy.pk])
+                cursor.execute(
+                    f'INSERT INTO {fts} (rowid, {", ".join(VacancySearch.FIELDS)}) VALUES (%s, %s, %s, %s, %s)',
+                    [vacancy.pk, *document],
+                )
+
+    @staticmethod
+    def remove(vacancy_id, using):
+        """Удаляет документ (в PostgreSQL он удаляется вместе со строкой)"""
+        connection = connections[using]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {VacancySearch.FTS_TABLE} WHERE rowid = %s', [vacancy_id])
+
+    @staticmethod
+    def rebuild(queryset):
+        """Полная переиндексация (миграция, массовые изменения через update())"""
+        count = 0
+        for vacancy in queryset.only(*VacancySearch.FIELDS).iterator():
+            VacancySearch.index(vacancy, using=queryset.db)
+            count += 1
+        return count
+
+    # ========== ПОИСК ==========
+
+    @staticmethod
+    def terms(query):
+        """Слова запроса: только буквы/цифры, чтобы не передавать синтаксис FTS"""
+        return re.findall(r'\w+', query.lower())[:VacancySearch.MAX_TERMS]
+
+    @staticmethod
+    def _expressions(queryset, terms):
+        """(условие совпадения, выражение ранга) для СУБД queryset"""
+        connection = connections[queryset.db]
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+
+        if connection.vendor == 'postgresql':
+            tsquery = ' & '.join(f'{term}:*' for term in terms)
+            tsquery_sql = f"to_tsquery('{VacancySearch.PG_CONFIG}', %s)"
+            match = RawSQL(f'{table}.search_document @@ {tsquery_sql}', (tsquery,), output_field=BooleanField())
+            rank = RawSQL(f'ts_rank_cd({table}.search_document, {tsquery_sql})', (tsquery,), output_field=FloatField())
+            return match, rank
+
+        if connection.vendor == 'sqlite':
+            fts = VacancySearch.FTS_TABLE
+            match_query = ' '.join(f'"{term}"*' for term in terms)
+            weights = ', '.join(str(weight) for weight in VacancySearch.FTS_WEIGHTS)
+            match = Q(pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', (match_query,)))
+            # bm25: меньше - лучше, поэтому знак меняется
+            rank = RawSQL(
+                f'SELECT -bm25({fts}, {weights}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {table}.id',
+                (match_query,),
+                output_field=FloatField(),
+            )
+            return match, rank
+
+        match = Q()
+        for term in terms:
+            match &= (
+                Q(title__icontains=term) | Q(short_description__icontains=term)
+                | Q(description__icontains=term) | Q(skills__icontains=term)
+            )
+        return match, Value(0.0, output_field=FloatField())
+
+    @staticmethod
+    def match(queryset, query):
+        """Только фильтр по запросу (все слова, по префиксу), без ранга"""
+        terms = VacancySearch.terms(query)
+        if not terms:
+            return queryset.none()
+        match, _ = VacancySearch._expressions(queryset, terms)
+        return queryset.filter(match)
+
+    @staticmethod
+    def search(queryset, query):
+        """
+        Фильтрует queryset по запросу и добавляет аннотацию search_rank
+        (чем больше, тем релевантнее).
+        """
+        terms = VacancySearch.terms(query)
+        if not terms:
+            return queryset.none()
+        match, rank = VacancySearch._expressions(queryset, terms)
+        return queryset.filter(match).annotate(search_rank=rank)
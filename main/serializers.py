@@ -1,3 +1,5 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from .models import (
     Service, Technology, Testimonial, Project,
@@ -7,15 +9,30 @@ from .models import (
     Vacancy, VacancyApplication
 )
 
+@extend_schema_field(OpenApiTypes.OBJECT)
+class ResponsiveImageField(serializers.Field):
+    """Адаптивное изображение: src, размеры, blur-заглушка и srcset для WebP/AVIF"""
+    
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, instance):
+        return instance.image_info(self.image_field)
+
+
 # ========== СУЩЕСТВУЮЩИЕ СЕРИАЛИЗАТОРЫ ==========
 
 class ServiceSerializer(serializers.ModelSerializer):
     """Сериализатор для услуг"""
+    image_responsive = ResponsiveImageField('image')
     image_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Service
-        fields = ['id', 'title', 'description', 'name', 'image', 'image_url', 'url', 'order']
+        fields = ['id', 'title', 'description', 'name', 'image', 'image_url', 'image_responsive', 'url', 'order']
         read_only_fields = ['id']
     
     def get_image_url(self, obj):
@@ -42,11 +59,12 @@ class ContactRequestSerializer(serializers.ModelSerializer):
 
 class TechnologySerializer(serializers.ModelSerializer):
     """Сериализатор для технологий"""
+    logo_responsive = ResponsiveImageField('logo')
     logo_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Technology
-        fields = ['id', 'name', 'logo', 'logo_url', 'url', 'order']
+        fields = ['id', 'name', 'logo', 'logo_url', 'logo_responsive', 'url', 'order']
         read_only_fields = ['id']
     
     def get_logo_url(self, obj):
@@ -57,13 +75,14 @@ class TechnologySerializer(serializers.ModelSerializer):
 
 class TestimonialSerializer(serializers.ModelSerializer):
     """Сериализатор для отзывов клиентов"""
+    client_photo_responsive = ResponsiveImageField('client_photo')
     client_photo_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Testimonial
         fields = [
             'id', 'client_name', 'client_position', 'client_company',
-            'client_photo', 'client_photo_url', 'text', 'rating', 
+            'client_photo', 'client_photo_url', 'client_photo_responsive', 'text', 'rating', 
             'project_link', 'order'
         ]
         read_only_fields = ['id']
@@ -76,6 +95,7 @@ class TestimonialSerializer(serializers.ModelSerializer):
 
 class ProjectSerializer(serializers.ModelSerializer):
     """Сериализатор для проектов (оглавление)"""
+    image_responsive = ResponsiveImageField('image')
     image_url = serializers.SerializerMethodField()
     project_type_display = serializers.CharField(
         source='get_project_type_display', 
@@ -86,7 +106,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         model = Project
         fields = [
             'id', 'title', 'project_type', 'project_type_display',
-            'description', 'image', 'image_url', 'url', 'order'
+            'description', 'image', 'image_url', 'image_responsive', 'url', 'order'
         ]
         read_only_fields = ['id']
     
@@ -142,6 +162,7 @@ class CompanyInfoSerializer(serializers.ModelSerializer):
 
 class SiteContentSerializer(serializers.ModelSerializer):
     """Сериализатор для контента страницы"""
+    hero_image_responsive = ResponsiveImageField('hero_image')
     logo_url = serializers.SerializerMethodField()
     favicon_url = serializers.SerializerMethodField()
     hero_image_url = serializers.SerializerMethodField()
@@ -158,7 +179,7 @@ class SiteContentSerializer(serializers.ModelSerializer):
             'send_button_text',
             
             # Изображения
-            'logo_url', 'favicon_url', 'hero_image_url',
+            'logo_url', 'favicon_url', 'hero_image_url', 'hero_image_responsive',
             
             # Мета данные
             'meta_title', 'meta_description'
@@ -240,7 +261,8 @@ class ConsultationRequestDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ConsultationRequest
-        fields = '__all__'
+        # commit_seq - служебный ключ синхронизации (см. main.leads.LeadInbox)
+        exclude = ['commit_seq']
         read_only_fields = ['created_at', 'updated_at']
     
     def get_interest_display(self, obj):
@@ -251,6 +273,8 @@ class ConsultationRequestDetailSerializer(serializers.ModelSerializer):
 
 class ServiceDetailSerializer(serializers.ModelSerializer):
     """Сериализатор для детальных страниц услуг"""
+    main_image_responsive = ResponsiveImageField('main_image')
+    banner_image_responsive = ResponsiveImageField('banner_image')
     main_image_url = serializers.SerializerMethodField()
     banner_image_url = serializers.SerializerMethodField()
     service_title = serializers.CharField(source='service.title', read_only=True)
@@ -259,7 +283,8 @@ class ServiceDetailSerializer(serializers.ModelSerializer):
         model = ServiceDetail
         fields = [
             'id', 'title', 'subtitle', 'short_description', 'description',
-            'main_image', 'main_image_url', 'banner_image', 'banner_image_url',
+            'main_image', 'main_image_url', 'main_image_responsive',
+            'banner_image', 'banner_image_url', 'banner_image_responsive',
             'meta_title', 'meta_description', 'is_active', 'created_at', 'updated_at',
             'service', 'service_title'
         ]
@@ -328,12 +353,13 @@ class ServiceFAQSerializer(serializers.ModelSerializer):
 
 class ServiceCaseSerializer(serializers.ModelSerializer):
     """Сериализатор для кейсов"""
+    image_responsive = ResponsiveImageField('image')
     image_url = serializers.SerializerMethodField()
     
     class Meta:
         model = ServiceCase
         fields = [
-            'id', 'title', 'client', 'description', 'image', 'image_url',
+            'id', 'title', 'client', 'description', 'image', 'image_url', 'image_responsive',
             'result', 'link', 'order', 'is_active'
         ]
     
@@ -341,6 +367,20 @@ class ServiceCaseSerializer(serializers.ModelSerializer):
         return obj.image.url if obj.image else None
 
 
+class ServiceDetailFullSerializer(ServiceDetailSerializer):
+    """Детальная страница услуги со всеми блоками (один запрос с фронтенда)"""
+    features = ServiceFeatureSerializer(many=True, read_only=True)
+    processes = ServiceProcessSerializer(many=True, read_only=True)
+    benefits = ServiceBenefitSerializer(many=True, read_only=True)
+    faqs = ServiceFAQSerializer(many=True, read_only=True)
+    cases = ServiceCaseSerializer(many=True, read_only=True)
+    
+    class Meta(ServiceDetailSerializer.Meta):
+        fields = ServiceDetailSerializer.Meta.fields + [
+            'features', 'processes', 'benefits', 'faqs', 'cases'
+        ]
+
+
 # ========== СЕРИАЛИЗАТОРЫ ДЛЯ ВАКАНСИЙ ==========
 
 class VacancyListSerializer(serializers.ModelSerializer):
@@ -371,11 +411,9 @@ class VacancyDetailSerializer(serializers.ModelSerializer):
         model = Vacancy
         fields = '__all__'
     
-    def get_skills_list(self, obj):
-        """Преобразует строку навыков в список"""
-        if obj.skills:
-            return [skill.strip() for skill in obj.skills.split(',')]
-        return []
+    def get_skills_list(self, obj) -> list[str]:
+        """Навыки из нормализованной таблицы (в порядке из админки)"""
+        return [link.skill.name for link in obj.skill_links.all()]
 
 
 class VacancyApplicationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,53 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache_service import ContentCacheService
+from .leads import LeadFeed, LeadInbox
+from .models import ApiKey, Vacancy
+from .search import VacancySearch
+
+
+def content_changed(sender, **kwargs):
+    """Сбрасывает версию и снимки после коммита транзакции"""
+    transaction.on_commit(partial(ContentCacheService.content_changed, sender))
+
+
+def vacancy_saved(sender, instance, using, update_fields=None, **kwargs):
+    """Обновляет навыки и поисковый документ, если изменились их поля"""
+    if update_fields is None or 'skills' in update_fields:
+        instance.sync_skills()
+    if update_fields is None or VacancySearch.INDEXED_FIELDS.intersection(update_fields):
+        VacancySearch.index(instance, using=using)
+
+
+def vacancy_deleted(sender, instance, using, **kwargs):
+    VacancySearch.remove(instance.pk, using=using)
+
+
+def lead_created(sender, instance, created, **kwargs):
+    """Будит открытые SSE-потоки новых заявок после коммита"""
+    if created:
+        transaction.on_commit(LeadFeed.bump)
+
+
+def api_key_changed(sender, instance, **kwargs):
+    """Сбрасывает кешированную запись ключа (отзыв действует сразу после коммита)"""
+    from .authentication import ApiKeyAuthentication
+    transaction.on_commit(partial(ApiKeyAuthentication.invalidate, instance.prefix))
+
+
+def connect_signals():
+    for model in ContentCacheService.TRACKED_MODELS:
+        post_save.connect(content_changed, sender=model, dispatch_uid=f'content-save-{model._meta.label_lower}')
+        post_delete.connect(content_changed, sender=model, dispatch_uid=f'content-delete-{model._meta.label_lower}')
+
+    post_save.connect(vacancy_saved, sender=Vacancy, dispatch_uid='vacancy-search-save')
+    post_delete.connect(vacancy_deleted, sender=Vacancy, dispatch_uid='vacancy-search-delete')
+
+    for model in LeadInbox.TYPES.values():
+        post_save.connect(lead_created, sender=model, dispatch_uid=f'lead-feed-{model._meta.label_lower}')
+
+    post_save.connect(api_key_changed, sender=ApiKey, dispatch_uid='api-key-save')
+    post_delete.connect(api_key_changed, sender=ApiKey, dispatch_uid='api-key-delete')
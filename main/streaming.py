@@ -0,0 +1,52 @@
+import zipfile
+
+
+class StreamBuffer:
+    """
+    Файлоподобный приемник для потоковой записи: write() копит байты,
+    drain() забирает накопленное. Без tell()/seek(), поэтому zipfile
+    пишет размеры записей в data descriptor после данных.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    ZIP-архив, собираемый на лету: без временных файлов и без чтения
+    файлов целиком. Записи - пары (имя или ZipInfo, итератор кусков bytes),
+    наружу отдаются готовые куски архива, поэтому в памяти одновременно
+    находится не больше одного куска (плюс буфер компрессора).
+    """
+
+    def __init__(self, entries, compression=zipfile.ZIP_DEFLATED):
+        self.entries = entries
+        self.compression = compression
+
+    def __iter__(self):
+        buffer = StreamBuffer()
+        with zipfile.ZipFile(buffer, 'w', compression=self.compression) as archive:
+            for name, chunks in self.entries:
+                # Размер заранее неизвестен - сразу zip64, чтобы не упереться в 4 ГБ
+                with archive.open(name, 'w', force_zip64=True) as entry:
+                    for chunk in chunks:
+                        entry.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+                yield buffer.drain()
+        # Центральный каталог пишется при закрытии архива
+        yield buffer.drain()
@@ -1,56 +1,170 @@
 import os
 import json
+import logging
 import urllib.request
 import urllib.parse
+from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramError(Exception):
+    """Ошибка доставки сообщения в Telegram"""
 
 
 class TelegramService:
     """Сервис для отправки уведомлений в Telegram"""
-    
+
     @staticmethod
-    def send_notification(message):
-        """Отправка сообщения в Telegram группу"""
+    def deliver(message, timeout=None):
+        """Отправка сообщения в Telegram группу (исключение при ошибке)"""
+        bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
+        chat_id = os.environ.get('TELEGRAM_CHAT_ID')
+
+        if not bot_token or not chat_id:
+            raise TelegramError("Telegram credentials not configured")
+
+        # Формируем URL для API Telegram
+        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+
+        # Подготавливаем данные
+        data = {
+            'chat_id': chat_id,
+            'text': message
+        }
+
+        # Кодируем данные и отправляем запрос
+        encoded_data = urllib.parse.urlencode(data).encode('utf-8')
+        req = urllib.request.Request(
+            url,
+            data=encoded_data,
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+
+        # Отправляем запрос (всегда с таймаутом, чтобы не зависнуть на сети)
+        if timeout is None:
+            timeout = settings.TELEGRAM_TIMEOUT
         try:
-            bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
-            chat_id = os.environ.get('TELEGRAM_CHAT_ID')
-            
-            if not bot_token or not chat_id:
-                print("Telegram credentials not configured")
-                return False
-            
-            # Формируем URL для API Telegram
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            
-            # Подготавливаем данные
-            data = {
-                'chat_id': chat_id,
-                'text': message
-            }
-            
-            # Кодируем данные и отправляем запрос
-            encoded_data = urllib.parse.urlencode(data).encode('utf-8')
-            req = urllib.request.Request(
-                url,
-                data=encoded_data,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            )
-            
-            # Отправляем запрос
-            with urllib.request.urlopen(req) as response:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
                 result = json.loads(response.read().decode('utf-8'))
-                
-            if result.get('ok'):
-                print("Telegram notification sent successfully")
-                return True
-            else:
-                print(f"Telegram error: {result}")
-                return False
-                
         except Exception as e:
+            raise TelegramError(str(e)) from e
+
+        if not result.get('ok'):
+            raise TelegramError(f"Telegram error: {result}")
+
+    @staticmethod
+    def send_notification(message, timeout=None):
+        """Синхронная отправка сообщения в Telegram группу"""
+        try:
+            TelegramService.deliver(message, timeout=timeout)
+        except TelegramError as e:
             print(f"Error sending Telegram notification: {e}")
             return False
-    
+        print("Telegram notification sent successfully")
+        return True
+
+    # ========== OUTBOX ==========
+
+    @staticmethod
+    def enqueue(message):
+        """Ставит уведомление в очередь (вызывать в транзакции создания заявки)"""
+        from .models import TelegramNotification
+        return TelegramNotification.objects.create(message=message)
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Экспоненциальная задержка перед следующей попыткой"""
+        delay = settings.TELEGRAM_RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, settings.TELEGRAM_RETRY_MAX_DELAY))
+
+    # Запас аренды сверх худшего времени отправки, секунд
+    LEASE_MARGIN = 30
+
+    @staticmethod
+    def lease_duration():
+        """Аренда строго дольше худшего времени одной отправки.
+
+        Таймаут urllib действует на каждую фазу отдельно: соединение,
+        отправка запроса, чтение ответа - отсюда три таймаута и запас.
+        """
+        return timedelta(seconds=settings.TELEGRAM_TIMEOUT * 3 + TelegramService.LEASE_MARGIN)
+
+    @staticmethod
+    def claim(notification):
+        """Захват уведомления воркером (аренда на время отправки).
+
+        Условный UPDATE по старому next_attempt_at: если уведомление уже
+        забрал другой воркер, обновится 0 строк. При успехе next_attempt_at
+        экземпляра - срок аренды, по нему process() проверяет владение.
+        """
+        from .models import TelegramNotification
+        lease_until = timezone.now() + TelegramService.lease_duration()
+        claimed = TelegramNotification.objects.filter(
+            pk=notification.pk,
+            status='pending',
+            next_attempt_at=notification.next_attempt_at,
+        ).update(next_attempt_at=lease_until)
+        if claimed == 1:
+            notification.next_attempt_at = lease_until
+        return claimed == 1
+
+    @staticmethod
+    def process(notification):
+        """Одна попытка доставки уведомления из очереди (после claim)"""
+        from .models import TelegramNotification
+        # Результат пишется, только пока аренда наша: если она истекла и
+        # уведомление забрал другой воркер, итог запишет он
+        owned = TelegramNotification.objects.filter(
+            pk=notification.pk,
+            status='pending',
+            next_attempt_at=notification.next_attempt_at,
+        )
+        try:
+            TelegramService.deliver(notification.message)
+        except TelegramError as e:
+            attempts = notification.attempts + 1
+            update = {'attempts': attempts, 'last_error': str(e)}
+            if attempts >= settings.TELEGRAM_MAX_ATTEMPTS:
+                update['status'] = 'failed'
+            else:
+                update['next_attempt_at'] = timezone.now() + TelegramService.retry_delay(attempts)
+            owned.update(**update)
+            return False
+
+        if not owned.update(
+            status='sent',
+            attempts=notification.attempts + 1,
+            sent_at=timezone.now(),
+            last_error=None,
+        ):
+            logger.warning(
+                'Telegram notification %s: lease expired during delivery, result left to the new owner',
+                notification.pk,
+            )
+        return True
+
+    @staticmethod
+    def process_pending(batch_size=50):
+        """Отправляет уведомления, у которых подошло время; возвращает число попыток"""
+        from .models import TelegramNotification
+        due = TelegramNotification.objects.filter(
+            status='pending',
+            next_attempt_at__lte=timezone.now(),
+        ).order_by('next_attempt_at')[:batch_size]
+
+        processed = 0
+        for notification in due:
+            if TelegramService.claim(notification):
+                TelegramService.process(notification)
+                processed += 1
+        return processed
+
+    # ========== ФОРМАТИРОВАНИЕ ==========
+
     @staticmethod
     def format_contact_request(contact_request):
         """Форматирует данные заявки для отправки в Telegram"""
@@ -63,5 +177,21 @@ class TelegramService:
 
 <i>Заявка создана через сайт</i>
         """.strip()
-        
+
+        return message
+
+    @staticmethod
+    def format_consultation(consultation):
+        """Форматирует заявку на консультацию для отправки в Telegram"""
+        message = f"""
+💬 <b>Новая заявка на консультацию!</b>
+
+👤 <b>Имя:</b> {consultation.name}
+📞 <b>Телефон:</b> {consultation.phone}
+🎯 <b>Интерес:</b> {consultation.interest_display}
+🕐 <b>Дата:</b> {consultation.created_at.strftime('%d.%m.%Y %H:%M')}
+
+<i>Заявка создана через сайт</i>
+        """.strip()
+
         return message
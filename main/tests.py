@@ -1,3 +1,1582 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.exceptions import ValidationError as ApiValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .models import (
+    Service, Project, CompanyInfo,
+    ServiceDetail, ServiceFeature, ServiceProcess, ServiceBenefit, ServiceFAQ, ServiceCase,
+    Vacancy, VacancyApplication, ConsultationRequest, ContactRequest, TelegramNotification, Skill,
+    ApiKey, CommitSequence,
+)
+from . import db_router
+from .authentication import ApiKeyAuthentication
+from .cache_service import ContentCacheService
+from .images import ResponsiveImageService
+from .exports import LeadExport
+from .leads import LeadFeed, LeadInbox
+from .management.commands.benchmark_public_api import Command as BenchmarkCommand
+from .management.commands.update_vacancy_visibility import Command as VisibilityCommand
+from .middleware import LeanPipelineMiddleware
+from .pagination import EstimatedCountPaginator, KeysetPagination
+from .schema import SchemaArtifact, brotli
+from .telegram_service import TelegramService, TelegramError
+from .upload_handlers import ResumeUploadHandler
+from .view_counter import VacancyViewCounter, vacancy_views
+from .vacancy_schedule import VacancySchedule
+
+
+# Тесты очищают кеш - не кеш разработчика (FileBasedCache в BASE_DIR/.django_cache).
+# Просмотры вакансий сбрасываются явно: фоновый поток писал бы мимо транзакции теста
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    VACANCY_VIEWS_BACKGROUND_FLUSH=False,
+)
+class IsolatedCacheTestCase(TestCase):
+    pass
+
+
+class FullHomePageSnapshotTests(IsolatedCacheTestCase):
+    """Снимок /api/full-homepage/ собирается заранее и сбрасывается при изменениях"""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyInfo.objects.create(phone='0502 800 202', address='Бишкек', work_hours='10-19')
+            Service.objects.create(title='Сайты', order=1)
+            for i in range(20):
+                Project.objects.create(title=f'Проект {i}', order=i)
+
+    def test_steady_state_does_no_queries(self):
+        url = reverse('full-homepage')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(len(data['projects']), 20)
+        self.assertEqual(data['services'][0]['title'], 'Сайты')
+
+    def test_snapshot_rebuilt_on_save_and_delete(self):
+        url = reverse('full-homepage')
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service = Service.objects.create(title='Боты', order=2)
+        with self.assertNumQueries(0):
+            titles = [s['title'] for s in self.client.get(url).json()['data']['services']]
+        self.assertEqual(titles, ['Сайты', 'Боты'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service.is_active = False
+            service.save()
+        titles = [s['title'] for s in self.client.get(url).json()['data']['services']]
+        self.assertEqual(titles, ['Сайты'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(order__gte=10).first().delete()
+        self.assertEqual(len(self.client.get(url).json()['data']['projects']), 19)
+
+
+class ConditionalGetTests(IsolatedCacheTestCase):
+    """ETag / Last-Modified и ответы 304 на публичных эндпоинтах"""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(title='Проект', order=1)
+
+    def test_not_modified_without_queries(self):
+        url = reverse('project-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_on_write(self):
+        url = reverse('project-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = 'Новый проект'
+            self.project.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query_string(self):
+        first = self.client.get(reverse('vacancy-list'))['ETag']
+        second = self.client.get(reverse('vacancy-list'), {'level': 'senior'})['ETag']
+        self.assertNotEqual(first, second)
+
+
+class ServiceDetailFullViewTests(IsolatedCacheTestCase):
+    """Страница услуги со всеми блоками за фиксированное число запросов"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(title='Дизайн')
+        self.detail = ServiceDetail.objects.create(service=self.service, title='UX/UI', description='<p>Текст</p>')
+
+    def add_children(self, start, count):
+        for i in range(start, start + count):
+            ServiceFeature.objects.create(service_detail=self.detail, title=f'Особенность {i}', order=i)
+            ServiceProcess.objects.create(service_detail=self.detail, step_number=i + 1, title=f'Этап {i}')
+            ServiceFAQ.objects.create(service_detail=self.detail, question=f'Вопрос {i}', answer='Ответ')
+            ServiceCase.objects.create(service_detail=self.detail, title=f'Кейс {i}', description='Описание')
+        ServiceFeature.objects.create(service_detail=self.detail, title='Скрытая', is_active=False)
+
+    def test_query_count_does_not_depend_on_children(self):
+        url = reverse('service-detail-full', kwargs={'pk': self.detail.pk})
+        self.add_children(0, 2)
+        self.client.get(url)
+        with self.assertNumQueries(6):
+            self.client.get(url)
+        self.add_children(2, 10)
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+
+        data = response.json()
+        self.assertEqual(data['service_title'], 'Дизайн')
+        self.assertEqual(len(data['features']), 12)
+        self.assertEqual(len(data['processes']), 12)
+        self.assertEqual(data['benefits'], [])
+
+    def test_lookup_by_service_id(self):
+        url = reverse('service-detail-full-by-service', kwargs={'service_id': self.service.pk})
+        self.assertEqual(self.client.get(url).json()['id'], self.detail.pk)
+
+        url = reverse('service-detail-full-by-service', kwargs={'service_id': self.service.pk + 100})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class KeysetPaginationTests(IsolatedCacheTestCase):
+    """Keyset-пагинация списков по их сортировке"""
+
+    def setUp(self):
+        cache.clear()
+        # Много одинаковых значений order - курсор должен учитывать все поля сортировки
+        for i in range(25):
+            Vacancy.objects.create(
+                title=f'Вакансия {i}', description='...',
+                order=i % 3, is_featured=(i % 4 == 0),
+            )
+
+    def collect(self, url, params=None):
+        ids, pages = [], []
+        response = self.client.get(url, params)
+        while True:
+            payload = response.json()
+            pages.append(payload)
+            ids.extend(item['id'] for item in payload['results'])
+            if not payload['next']:
+                return ids, pages
+            response = self.client.get(payload['next'])
+
+    def test_walks_all_pages_in_ordering(self):
+        expected = list(Vacancy.objects.filter(is_active=True).values_list('id', flat=True))
+        ids, pages = self.collect(reverse('vacancy-list'), {'page_size': 4})
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 7)
+        self.assertIsNone(pages[0]['previous'])
+
+        # Обратный проход по ссылкам previous
+        back = []
+        response = self.client.get(pages[-1]['previous'])
+        while True:
+            payload = response.json()
+            back = [item['id'] for item in payload['results']] + back
+            if not payload['previous']:
+                break
+            response = self.client.get(payload['previous'])
+        self.assertEqual(back, expected[:24])
+
+    def test_page_cost_is_constant(self):
+        url = reverse('vacancy-list')
+        _, pages = self.collect(url, {'page_size': 5})
+        with self.assertNumQueries(1):
+            self.client.get(pages[-2]['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('vacancy-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def paginate(self, queryset, url='/api/vacancies/', **params):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get(url, params))
+        return paginator, paginator.paginate_queryset(queryset, request)
+
+    def walk(self, queryset, url, link):
+        ids, paginators = [], []
+        while url:
+            paginator, page = self.paginate(queryset, url)
+            ids.append([vacancy.pk for vacancy in page])
+            paginators.append(paginator)
+            url = getattr(paginator, link)()
+        return ids, paginators
+
+    def test_nullable_ordering_field(self):
+        # Часть вакансий без даты окончания: NULL в конце в обоих направлениях
+        for vacancy in Vacancy.objects.all()[:10]:
+            vacancy.expires_at = timezone.now() + timedelta(days=vacancy.pk % 4)
+            vacancy.save(update_fields=['expires_at'])
+        vacancies = list(Vacancy.objects.all())
+
+        for descending in (False, True):
+            queryset = Vacancy.objects.order_by('-expires_at' if descending else 'expires_at')
+            dated = sorted(
+                (v for v in vacancies if v.expires_at), key=lambda v: (v.expires_at, v.pk), reverse=descending
+            )
+            undated = sorted((v.pk for v in vacancies if not v.expires_at), reverse=descending)
+            expected = [v.pk for v in dated] + undated
+
+            pages, paginators = self.walk(queryset, '/api/vacancies/?page_size=4', 'get_next_link')
+            self.assertEqual(sum(pages, []), expected)
+
+            # Обратно по previous от последней страницы (целиком из NULL)
+            back, _ = self.walk(queryset, paginators[-1].get_previous_link(), 'get_previous_link')
+            self.assertEqual(sum(reversed(back), []), expected[:-len(pages[-1])])
+
+    def test_leading_column_bounds_the_seek(self):
+        paginator, _ = self.paginate(Vacancy.objects.order_by('order'), '/api/vacancies/?page_size=4')
+        paginator, _ = self.paginate(Vacancy.objects.order_by('order'), paginator.get_next_link())
+        with CaptureQueriesContext(connection) as captured:
+            self.paginate(Vacancy.objects.order_by('order'), paginator.get_next_link())
+        where = captured[0]['sql'].split('WHERE', 1)[1]
+        # Граница order >= ... стоит отдельно от цепочки OR
+        self.assertRegex(where, r'^ \("main_vacancy"."order" >= \d+ AND \(')
+
+    def test_related_ordering_is_bad_request(self):
+        with self.assertRaises(ApiValidationError):
+            self.paginate(Vacancy.objects.order_by('category__name'))
+
+    def test_consultation_admin_list_is_paginated(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        self.client.force_login(admin)
+        for i in range(30):
+            ConsultationRequest.objects.create(name=f'Клиент {i}', phone='+996555000000')
+        payload = self.client.get('/api/consultations/admin/').json()
+        self.assertEqual(len(payload['results']), 20)
+        self.assertIsNotNone(payload['next'])
+
+
+class TelegramOutboxTests(IsolatedCacheTestCase):
+    """Уведомления о заявках пишутся в outbox и доставляются воркером"""
+
+    def test_lead_enqueues_notification_without_network(self):
+        with mock.patch('main.telegram_service.urllib.request.urlopen') as urlopen:
+            response = self.client.post(
+                reverse('consultation-create'),
+                {'name': 'Иван', 'phone': '+996555123456', 'interest': 'website'},
+            )
+        self.assertEqual(response.status_code, 201)
+        urlopen.assert_not_called()
+        notification = TelegramNotification.objects.get()
+        self.assertEqual(notification.status, 'pending')
+        self.assertIn('Иван', notification.message)
+
+    def test_retries_with_backoff_then_delivers(self):
+        notification = TelegramService.enqueue('Тест')
+        with mock.patch.object(TelegramService, 'deliver', side_effect=TelegramError('down')):
+            self.assertEqual(TelegramService.process_pending(), 1)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
+        # Пока не подошло время повтора, уведомление не берется
+        with mock.patch.object(TelegramService, 'deliver') as deliver:
+            self.assertEqual(TelegramService.process_pending(), 0)
+            deliver.assert_not_called()
+
+        TelegramNotification.objects.update(next_attempt_at=timezone.now())
+        with mock.patch.object(TelegramService, 'deliver'):
+            TelegramService.process_pending()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'sent')
+        self.assertEqual(notification.attempts, 2)
+
+    @override_settings(TELEGRAM_TIMEOUT=10)
+    def test_lease_outlasts_slowest_send(self):
+        notification = TelegramService.enqueue('Тест')
+        self.assertTrue(TelegramService.claim(notification))
+        # Соединение, отправка и чтение ответа - каждая фаза до TELEGRAM_TIMEOUT
+        self.assertGreater(notification.next_attempt_at - timezone.now(), timedelta(seconds=30))
+
+        def lease_lost(message):
+            # Аренда истекла, уведомление забрал другой воркер
+            TelegramNotification.objects.update(next_attempt_at=timezone.now() + timedelta(hours=1))
+
+        with mock.patch.object(TelegramService, 'deliver', side_effect=lease_lost), \
+                self.assertLogs('main.telegram_service', 'WARNING'):
+            TelegramService.process(notification)
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 0))
+
+    @override_settings(TELEGRAM_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        notification = TelegramService.enqueue('Тест')
+        with mock.patch.object(TelegramService, 'deliver', side_effect=TelegramError('down')):
+            for _ in range(2):
+                TelegramNotification.objects.update(next_attempt_at=timezone.now())
+                TelegramService.process_pending()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'failed')
+        self.assertEqual(notification.last_error, 'down')
+
+
+class VacancyViewCounterTests(IsolatedCacheTestCase):
+    """Просмотры вакансий копятся в буфере и пишутся пакетно"""
+
+    def setUp(self):
+        cache.clear()
+        vacancy_views.flush()
+        self.first = Vacancy.objects.create(title='Python', description='...')
+        self.second = Vacancy.objects.create(title='React', description='...')
+
+    @override_settings(VACANCY_VIEWS_FLUSH_INTERVAL=3600, VACANCY_VIEWS_MAX_PENDING=1000)
+    def test_detail_get_is_read_only(self):
+        url = reverse('vacancy-detail', kwargs={'pk': self.first.pk})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertTrue(all(q['sql'].lstrip().upper().startswith('SELECT') for q in queries.captured_queries))
+        self.assertEqual(vacancy_views.pending(self.first.pk), 2)
+
+    @override_settings(VACANCY_VIEWS_FLUSH_INTERVAL=3600, VACANCY_VIEWS_MAX_PENDING=1000)
+    def test_flush_uses_one_update_per_increment(self):
+        for _ in range(3):
+            vacancy_views.hit(self.first.pk)
+        for _ in range(3):
+            vacancy_views.hit(self.second.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(vacancy_views.flush(), 6)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.views_count, self.second.views_count), (3, 3))
+
+    @override_settings(VACANCY_VIEWS_MAX_PENDING=1)
+    def test_full_buffer_does_not_write_in_request(self):
+        url = reverse('vacancy-detail', kwargs={'pk': self.first.pk})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertTrue(all(q['sql'].lstrip().upper().startswith('SELECT') for q in queries.captured_queries))
+        self.assertEqual(vacancy_views.pending(self.first.pk), 1)
+
+    @override_settings(VACANCY_VIEWS_BACKGROUND_FLUSH=True)
+    def test_background_thread_flushes_full_buffer(self):
+        counter = VacancyViewCounter(flush_interval=3600, max_pending=1)
+        flushed = threading.Event()
+        with mock.patch.object(counter, 'flush', side_effect=flushed.set):
+            counter.hit(self.first.pk)
+            self.assertTrue(flushed.wait(5))
+
+    def test_missing_or_hidden_vacancy_is_not_counted(self):
+        hidden = Vacancy.objects.create(title='Скрытая', description='...', is_active=False)
+        for pk in (hidden.pk, 999999):
+            response = self.client.get(reverse('vacancy-detail', kwargs={'pk': pk}))
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(vacancy_views.pending(pk), 0)
+
+    def test_not_modified_still_counts_view(self):
+        url = reverse('vacancy-detail', kwargs={'pk': self.first.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        vacancy_views.flush()
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views_count, 2)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), RESUME_MAX_UPLOAD_SIZE=200 * 1024)
+class ResumeUploadTests(IsolatedCacheTestCase):
+    """Потоковая загрузка резюме с лимитом размера и хешем"""
+
+    def setUp(self):
+        self.vacancy = Vacancy.objects.create(title='Python', description='...')
+        self.url = reverse('vacancy-apply', kwargs={'vacancy_id': self.vacancy.pk})
+
+    def post(self, name, content):
+        return self.client.post(self.url, {
+            'name': 'Иван', 'email': 'ivan@example.com', 'phone': '+996555123456',
+            'vacancy': self.vacancy.pk, 'resume': SimpleUploadedFile(name, content),
+        })
+
+    def test_upload_stores_hash(self):
+        content = b'%PDF-1.4 ' + b'x' * 150 * 1024
+        response = self.post('cv.pdf', content)
+        self.assertEqual(response.status_code, 201, response.content)
+        application = VacancyApplication.objects.get()
+        self.assertEqual(application.resume_sha256, hashlib.sha256(content).hexdigest())
+
+    def test_rejects_oversized_file(self):
+        # Отсечка по Content-Length до чтения тела
+        response = self.post('cv.pdf', b'x' * 300 * 1024)
+        self.assertEqual(response.status_code, 413)
+        # Отсечка по фактическому числу байт при потоковом чтении
+        response = self.post('cv.pdf', b'x' * 210 * 1024)
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(VacancyApplication.objects.exists())
+
+    def test_rejects_unsupported_extension_before_reading(self):
+        handler = ResumeUploadHandler(max_size=1024)
+        with self.assertRaises(StopUpload):
+            handler.new_file('resume', 'virus.exe', 'application/octet-stream', 10)
+        self.assertEqual(handler.error_status, 400)
+
+        response = self.post('virus.exe', b'MZ' * 10)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('resume', response.json()['errors'])
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    RESPONSIVE_IMAGE_WIDTHS=[320, 640],
+    RESPONSIVE_IMAGE_FORMATS=['avif', 'webp'],
+)
+class ResponsiveImageTests(IsolatedCacheTestCase):
+    """WebP/AVIF версии изображений и srcset в API"""
+
+    def setUp(self):
+        cache.clear()
+
+    def png(self, name='photo.png', size=(800, 400)):
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_variants_generated_on_upload(self):
+        service = Service.objects.create(title='Web', image=self.png())
+        info = service.image_variants['image']
+        self.assertEqual((info['width'], info['height']), (800, 400))
+        self.assertTrue(info['placeholder'].startswith('data:image/webp;base64,'))
+
+        webp = info['variants']['webp']
+        self.assertEqual([item['width'] for item in webp], [320, 640, 800])
+        self.assertEqual(webp[0]['height'], 160)
+        storage = service.image.storage
+        for item in webp:
+            self.assertTrue(storage.exists(item['name']))
+        formats = set(ResponsiveImageService.available_formats())
+        self.assertEqual(set(info['variants']), formats)
+
+    def test_replacing_image_removes_old_variants(self):
+        service = Service.objects.create(title='Web', image=self.png())
+        old = service.image_variants['image']['variants']['webp'][0]['name']
+        service.image = self.png('other.png', size=(500, 500))
+        with self.captureOnCommitCallbacks(execute=True):
+            service.save()
+
+        self.assertFalse(service.image.storage.exists(old))
+        widths = [item['width'] for item in service.image_variants['image']['variants']['webp']]
+        self.assertEqual(widths, [320, 500])
+
+    def test_rolled_back_save_keeps_old_variants(self):
+        service = Service.objects.create(title='Web', image=self.png())
+        old = service.image_variants['image']['variants']['webp'][0]['name']
+        service.image = self.png('other.png', size=(500, 500))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    service.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertTrue(service.image.storage.exists(old))
+
+    def test_copy_has_own_variants(self):
+        original = Service.objects.create(title='Web', image=self.png())
+        names = ResponsiveImageService.names(original.image_variants['image'])
+        # Как "Создать копию" в админке
+        copy = Service.objects.get(pk=original.pk)
+        copy.pk = None
+        copy.save()
+        self.assertFalse(names & ResponsiveImageService.names(copy.image_variants['image']))
+
+        copy.image = self.png('other.png', size=(500, 500))
+        with self.captureOnCommitCallbacks(execute=True):
+            copy.save()
+        storage = original.image.storage
+        self.assertTrue(all(storage.exists(name) for name in names))
+
+    def test_shared_variants_are_not_deleted(self):
+        original = Service.objects.create(title='Web', image=self.png())
+        names = ResponsiveImageService.names(original.image_variants['image'])
+        # Копия, сделанная раньше и ссылающаяся на те же файлы
+        copy = Service.objects.create(title='Web (копия)')
+        Service.objects.filter(pk=copy.pk).update(image=original.image.name, image_variants=original.image_variants)
+        copy.refresh_from_db()
+        copy.image = self.png('other.png', size=(500, 500))
+        with self.captureOnCommitCallbacks(execute=True):
+            copy.save()
+        storage = original.image.storage
+        self.assertTrue(all(storage.exists(name) for name in names))
+
+    def test_non_raster_file_has_no_variants(self):
+        svg = SimpleUploadedFile('logo.svg', b'<svg xmlns="http://www.w3.org/2000/svg"/>')
+        service = Service.objects.create(title='Web', image=svg)
+        self.assertEqual(service.image_variants['image']['variants'], {})
+        self.assertEqual(service.thumbnail_url('image'), service.image.url)
+
+    def test_decompression_bomb_has_no_variants(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            service = Service.objects.create(title='Web', image=self.png())
+        self.assertEqual(service.image_variants['image']['variants'], {})
+        self.assertIsNone(service.image_variants['image']['width'])
+
+
+@override_settings(OPENAPI_RUNTIME_SCHEMA=False, OPENAPI_SCHEMA_MAX_AGE=300)
+class PrecomputedSchemaTests(IsolatedCacheTestCase):
+    """OpenAPI схема из файла, собранного build_openapi_schema"""
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'openapi', 'schema.json')
+        self.settings_override = override_settings(OPENAPI_SCHEMA_FILE=self.path)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.url = reverse('schema')
+
+    def test_missing_artifact_is_404(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_serves_artifact_without_generation(self):
+        call_command('build_openapi_schema', stdout=StringIO())
+        self.assertTrue(os.path.exists(self.path + '.gz'))
+
+        with mock.patch.object(SchemaArtifact, 'generate') as generate:
+            response = self.client.get(self.url)
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        schema = json.loads(response.content)
+        self.assertIn('/api/services/', schema['paths'])
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_precompressed_variant(self):
+        call_command('build_openapi_schema', stdout=StringIO())
+        plain = self.client.get(self.url).content
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain)
+
+        # У каждой кодировки свой строгий ETag
+        etags = {self.client.get(self.url)['ETag'], response['ETag']}
+        if brotli is not None:
+            compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(compressed['Content-Encoding'], 'br')
+            self.assertEqual(brotli.decompress(compressed.content), plain)
+            etags.add(compressed['ETag'])
+        self.assertEqual(len(etags), 3 if brotli is not None else 2)
+        # ETag одной кодировки не подтверждает другую
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code, 304)
+
+    @override_settings(OPENAPI_RUNTIME_SCHEMA=True)
+    def test_runtime_generation_opt_in(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/services/', json.loads(response.content)['paths'])
+
+
+@override_settings(REPLICA_DATABASES=['replica_1', 'replica_2'], REPLICA_MAX_LAG=5, REPLICA_LAG_CHECK_INTERVAL=60)
+class ReplicaRouterTests(IsolatedCacheTestCase):
+    """Чтения публичных GET с реплик, записи и чтения после записи - с основной базы"""
+
+    def setUp(self):
+        cache.clear()
+        db_router._lag_checks.clear()
+        self.router = db_router.ReplicaRouter()
+
+    def test_reads_go_to_replica_only_inside_public_get(self):
+        with mock.patch.object(db_router, 'replica_lag', return_value=0):
+            self.assertIsNone(self.router.db_for_read(Service))
+            with db_router.use_replica():
+                alias = self.router.db_for_read(Service)
+                self.assertIn(alias, ['replica_1', 'replica_2'])
+                # Одна реплика на весь запрос
+                self.assertEqual(self.router.db_for_read(Vacancy), alias)
+
+    def test_write_pins_request_to_primary(self):
+        with mock.patch.object(db_router, 'replica_lag', return_value=0):
+            with db_router.use_replica():
+                self.assertEqual(self.router.db_for_write(Vacancy), 'default')
+                self.assertIsNone(self.router.db_for_read(Vacancy))
+
+    def test_lagging_replica_is_skipped(self):
+        lags = {'replica_1': 30, 'replica_2': None}
+        with mock.patch.object(db_router, 'replica_lag', side_effect=lags.get) as lag:
+            with db_router.use_replica():
+                self.assertEqual(self.router.db_for_read(Service), 'default')
+            with db_router.use_replica():
+                self.router.db_for_read(Service)
+        # Отставание проверяется не чаще REPLICA_LAG_CHECK_INTERVAL
+        self.assertEqual(lag.call_count, 2)
+
+    def settle_versions(self, *models):
+        """Версии моделей, измененных давно - реплики их уже догнали"""
+        for model in models:
+            cache.set(ContentCacheService._version_key(model), {'token': 'old', 'last_modified': time.time() - 3600}, None)
+
+    def test_public_views_read_from_replica_and_writes_do_not(self):
+        self.settle_versions(Service)
+        with mock.patch.object(db_router.ReplicaRouter, 'choose_replica', return_value=None) as choose:
+            self.client.get(reverse('service-list'))
+            self.assertTrue(choose.called)
+
+            choose.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('consultation-create'), {
+                    'name': 'Иван', 'phone': '+996555123456', 'interest': 'website',
+                })
+            self.assertTrue(ConsultationRequest.objects.exists())
+            choose.assert_not_called()
+
+    def test_recent_change_reads_primary(self):
+        # Версия только что сменилась: реплика может ее не догнать, а ответ
+        # закешируется под новым ETag - читаем основную базу
+        self.settle_versions(*ContentCacheService.HOMEPAGE_MODELS)
+        ContentCacheService.bump_version(Service)
+        with mock.patch.object(db_router.ReplicaRouter, 'choose_replica', return_value=None) as choose:
+            self.assertEqual(self.client.get(reverse('service-list')).status_code, 200)
+            self.assertEqual(self.client.get(reverse('full-homepage')).status_code, 200)
+            choose.assert_not_called()
+
+            self.settle_versions(Service)
+            self.client.get(reverse('service-list'))
+            self.assertTrue(choose.called)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Разбор плана EXPLAIN QUERY PLAN в формате SQLite')
+class QueryIndexTests(IsolatedCacheTestCase):
+    """Запросы публичных эндпоинтов идут по индексам, без сортировки полного скана"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        for i in range(3):
+            service = Service.objects.create(title=f'Услуга {i}', order=i)
+            Project.objects.create(title=f'Проект {i}', order=i)
+            Vacancy.objects.create(title=f'Вакансия {i}', description='...', order=i)
+            ConsultationRequest.objects.create(name=f'Клиент {i}', phone='+996555000000')
+            detail = ServiceDetail.objects.create(service=service, title=f'Страница {i}')
+            ServiceFeature.objects.create(service_detail=detail, title='Особенность', order=i)
+            ServiceFAQ.objects.create(service_detail=detail, question='Вопрос?', answer='Ответ', order=i)
+            ServiceCase.objects.create(service_detail=detail, title='Кейс', order=i)
+        cls.detail = detail
+
+    def setUp(self):
+        cache.clear()
+        # Версии контента считаются агрегатом только при пустом кеше - прогреваем заранее
+        ContentCacheService.get_versions(ContentCacheService.TRACKED_MODELS)
+
+    def query_plans(self, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200, url)
+
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'FROM "main_' not in sql:
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[3] for row in cursor.fetchall()]))
+        return plans
+
+    def assert_indexed(self, url, **kwargs):
+        plans = self.query_plans(url, **kwargs)
+        self.assertTrue(plans, url)
+        for sql, details in plans:
+            for detail in details:
+                self.assertNotIn('TEMP B-TREE', detail, f'{url}: {sql}')
+                # Полный скан допустим только без условия (например, CompanyInfo.first())
+                if detail.startswith('SCAN main_') and ' WHERE ' in sql:
+                    self.assertIn('INDEX', detail, f'{url}: {sql}')
+
+    def test_public_lists(self):
+        for name in ['service-list', 'technology-list', 'testimonial-list', 'project-list',
+                     'service-detail-list', 'vacancy-list', 'full-homepage']:
+            with self.subTest(name=name):
+                self.assert_indexed(reverse(name))
+
+    def test_service_detail_children(self):
+        for name in ['service-features', 'service-processes', 'service-benefits',
+                     'service-faqs', 'service-cases']:
+            with self.subTest(name=name):
+                self.assert_indexed(reverse(name, kwargs={'service_detail_id': self.detail.pk}))
+        self.assert_indexed(reverse('service-detail-full', kwargs={'pk': self.detail.pk}))
+
+    def test_lead_lists(self):
+        self.client.force_login(self.admin)
+        self.assert_indexed(reverse('consultation-admin-list'))
+
+
+class VacancySearchTests(IsolatedCacheTestCase):
+    """Полнотекстовый поиск вакансий с ранжированием"""
+
+    def setUp(self):
+        cache.clear()
+        self.python = Vacancy.objects.create(
+            title='Python разработчик', description='<p>Пишем <b>API</b> на Django</p>', skills='Python, Django',
+        )
+        self.frontend = Vacancy.objects.create(
+            title='Frontend разработчик', description='<p>React и немного Python-скриптов</p>', skills='React',
+        )
+        self.designer = Vacancy.objects.create(title='Дизайнер', description='<p>Figma</p>', skills='Figma')
+        self.url = reverse('vacancy-list')
+
+    def search(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+
+    def test_ranked_results(self):
+        # Совпадение в названии и навыках важнее упоминания в описании
+        self.assertEqual(self.search('python'), [self.python.pk, self.frontend.pk])
+        self.assertEqual(self.search('разработ django'), [self.python.pk])
+        self.assertEqual(self.search('"); DROP TABLE'), [])
+
+    def test_html_is_not_indexed(self):
+        self.assertEqual(self.search('api'), [self.python.pk])
+        self.assertEqual(self.search('b'), [])
+
+    def test_index_follows_save_and_delete(self):
+        self.designer.skills = 'Figma, Python'
+        self.designer.save()
+        self.assertIn(self.designer.pk, self.search('python'))
+
+        self.python.delete()
+        self.assertNotIn(self.python.pk, self.search('python'))
+
+    def test_search_results_paginate_by_rank(self):
+        first = self.client.get(self.url, {'q': 'разработчик', 'page_size': 1}).json()
+        second = self.client.get(first['next']).json()
+        ids = [item['id'] for item in first['results'] + second['results']]
+        self.assertCountEqual(ids, [self.python.pk, self.frontend.pk])
+
+
+@override_settings(VACANCY_SALARY_BUCKETS=[0, 1000, 2000])
+class VacancyFacetsTests(IsolatedCacheTestCase):
+    """Счетчики фасетов вакансий одним запросом с drill-down по фильтрам"""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('vacancy-facets')
+        self.create(category='Backend', level='senior', is_remote=True, salary_min=1500, salary_max=2500)
+        self.create(category='Backend', level='junior', salary_min=500, salary_max=900)
+        self.create(category='Frontend', level='junior', is_remote=True)
+        self.create(category='Frontend', level='middle', is_active=False, salary_min=100)
+
+    def create(self, **kwargs):
+        return Vacancy.objects.create(title='Вакансия', description='...', **kwargs)
+
+    def counts(self, data, facet):
+        return {str(item['value']): item['count'] for item in data['facets'][facet]}
+
+    def test_counts_respect_other_filters(self):
+        data = self.client.get(self.url, {'category': 'Backend'}).json()
+        self.assertEqual(data['total'], 2)
+        # Собственный фильтр фасета не применяется: видны альтернативы
+        self.assertEqual(self.counts(data, 'category')['Backend'], 2)
+        self.assertEqual(self.counts(data, 'category')['Frontend'], 1)
+        self.assertEqual(self.counts(data, 'level'), {'junior': 1, 'middle': 0, 'senior': 1})
+        self.assertEqual(self.counts(data, 'is_remote'), {'True': 1, 'False': 1})
+
+        salary = [item['count'] for item in data['facets']['salary']]
+        # 500-900 -> [0, 1000); 1500-2500 -> [1000, 2000) и [2000, ...)
+        self.assertEqual(salary, [1, 1, 1])
+
+    def test_single_query_and_cache_until_vacancy_changes(self):
+        ContentCacheService.get_versions((Vacancy,))
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(self.url, {'is_remote': 'true'}).json()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(first['total'], 2)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'is_remote': 'true'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create(category='Fullstack', is_remote=True)
+        data = self.client.get(self.url, {'is_remote': 'true'}).json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(self.counts(data, 'category')['Fullstack'], 1)
+
+    def test_list_uses_same_filters(self):
+        response = self.client.get(reverse('vacancy-list'), {'category': 'Backend', 'is_remote': 'false'})
+        self.assertEqual(len(response.json()['results']), 1)
+
+
+class VacancySkillTests(IsolatedCacheTestCase):
+    """Нормализованные навыки вакансий и фильтр ?skill="""
+
+    def setUp(self):
+        cache.clear()
+        self.backend = Vacancy.objects.create(title='Backend', description='...', skills='Python, Django, python ,Docker')
+        self.data = Vacancy.objects.create(title='Data', description='...', skills='PYTHON, Pandas')
+        self.url = reverse('vacancy-list')
+
+    def ids(self, params):
+        return sorted(item['id'] for item in self.client.get(self.url, params).json()['results'])
+
+    def test_skills_are_normalized_and_synced(self):
+        self.assertEqual(Skill.objects.filter(normalized='python').count(), 1)
+        self.assertEqual(
+            [link.skill.name for link in self.backend.skill_links.select_related('skill')],
+            ['Python', 'Django', 'Docker'],
+        )
+
+        self.backend.skills = 'Go, Docker'
+        self.backend.save()
+        response = self.client.get(reverse('vacancy-detail', kwargs={'pk': self.backend.pk}))
+        self.assertEqual(response.json()['skills_list'], ['Go', 'Docker'])
+
+    def test_skill_filter_all_and_any(self):
+        self.assertEqual(self.ids({'skill': 'python'}), [self.backend.pk, self.data.pk])
+        self.assertEqual(self.ids({'skill': ['Python', 'django']}), [self.backend.pk])
+        self.assertEqual(self.ids({'skill': ['django', 'pandas'], 'skill_mode': 'any'}), [self.backend.pk, self.data.pk])
+        self.assertEqual(self.ids({'skill': ['django', 'pandas']}), [])
+
+    def test_views_count_save_does_not_resync(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.backend.save(update_fields=['views_count'])
+        self.assertFalse([q for q in queries.captured_queries if 'main_vacancyskill' in q['sql']])
+
+
+class VacancySalaryTests(IsolatedCacheTestCase):
+    """Фильтр и сортировка по зарплате в SQL"""
+
+    def setUp(self):
+        cache.clear()
+        self.low = self.create(salary_min=500, salary_max=900)
+        self.mid = self.create(salary_min=1500)
+        self.high = self.create(salary_min=2000, salary_max=4000)
+        self.capped = self.create(salary_max=1200)
+        self.text = self.create(salary_text='по договоренности')
+        self.url = reverse('vacancy-list')
+
+    def create(self, **kwargs):
+        return Vacancy.objects.create(title='Вакансия', description='...', **kwargs)
+
+    def get(self, params):
+        return self.client.get(self.url, params).json()['results']
+
+    def ids(self, params):
+        return [item['id'] for item in self.get(params)]
+
+    def test_overlap_filter(self):
+        self.assertCountEqual(self.ids({'salary_from': 1000}), [self.mid.pk, self.high.pk, self.capped.pk])
+        self.assertCountEqual(self.ids({'salary_to': 900}), [self.low.pk, self.capped.pk])
+        self.assertCountEqual(
+            self.ids({'salary_from': 1300, 'salary_to': 2000}), [self.mid.pk, self.high.pk]
+        )
+        # Некорректное значение игнорируется
+        self.assertEqual(len(self.ids({'salary_from': 'abc'})), 5)
+
+    def test_ordering_and_keyset_pages(self):
+        self.assertEqual(
+            self.ids({'ordering': 'salary'}),
+            [self.low.pk, self.capped.pk, self.mid.pk, self.high.pk, self.text.pk],
+        )
+        expected = [self.high.pk, self.mid.pk, self.capped.pk, self.low.pk, self.text.pk]
+        self.assertEqual(self.ids({'ordering': '-salary'}), expected)
+
+        ids = []
+        page = self.client.get(self.url, {'ordering': '-salary', 'page_size': 2}).json()
+        while True:
+            ids += [item['id'] for item in page['results']]
+            if not page['next']:
+                break
+            page = self.client.get(page['next']).json()
+        self.assertEqual(ids, expected)
+
+    def test_salary_range_computed_in_query(self):
+        labels = {item['id']: item['salary_range'] for item in self.get({})}
+        self.assertEqual(labels[self.low.pk], '500 - 900$')
+        self.assertEqual(labels[self.mid.pk], 'от 1500$')
+        self.assertEqual(labels[self.capped.pk], 'до 1200$')
+        self.assertEqual(labels[self.text.pk], 'по договоренности')
+        for vacancy in Vacancy.objects.with_salary_range():
+            self.assertEqual(vacancy.salary_range, Vacancy.objects.get(pk=vacancy.pk).salary_range)
+
+
+class VacancyVisibilityTests(IsolatedCacheTestCase):
+    """Видимость вакансий по published_at / expires_at"""
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.current = self.create(title='Текущая')
+        self.scheduled = self.create(title='Запланированная', published_at=now + timedelta(hours=1))
+        self.expired = self.create(title='Истекшая', expires_at=now - timedelta(minutes=1))
+        self.expiring = self.create(title='Истекает', expires_at=now + timedelta(minutes=30))
+
+    def create(self, **kwargs):
+        return Vacancy.objects.create(description='...', **kwargs)
+
+    def test_only_visible_vacancies_are_public(self):
+        ids = [item['id'] for item in self.client.get(reverse('vacancy-list')).json()['results']]
+        self.assertCountEqual(ids, [self.current.pk, self.expiring.pk])
+        self.assertEqual(self.client.get(reverse('vacancy-facets')).json()['total'], 2)
+        for vacancy in (self.scheduled, self.expired):
+            response = self.client.get(reverse('vacancy-detail', args=[vacancy.pk]))
+            self.assertEqual(response.status_code, 404)
+        vacancy_views.flush()
+
+    def test_next_transition(self):
+        self.assertEqual(VacancySchedule.next_transition(), self.expiring.expires_at)
+        later = self.expiring.expires_at + timedelta(seconds=1)
+        self.assertEqual(VacancySchedule.next_transition(later), self.scheduled.published_at)
+
+    def test_transitions_deactivate_and_change_etag(self):
+        url = reverse('vacancy-list')
+        etag = self.client.get(url)['ETag']
+
+        since = timezone.now()
+        later = since + timedelta(hours=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            expired, published = VacancySchedule.apply_transitions(since=since, now=later)
+            self.assertEqual(expired, 2)
+            self.assertTrue(published)
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            ids = [item['id'] for item in response.json()['results']]
+            self.assertCountEqual(ids, [self.current.pk, self.scheduled.pk])
+
+        self.expired.refresh_from_db()
+        self.assertFalse(self.expired.is_active)
+
+    def test_command_runs_once(self):
+        out = StringIO()
+        call_command('update_vacancy_visibility', '--once', stdout=out)
+        self.assertIn('Снято с публикации: 1', out.getvalue())
+        self.assertFalse(Vacancy.objects.get(pk=self.expired.pk).is_active)
+
+    def test_vacancy_saved_during_sleep_wakes_scheduler(self):
+        soon = timezone.now() + timedelta(seconds=5)
+
+        def save_vacancy(seconds):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create(title='Срочная', expires_at=soon)
+
+        # Ближайший известный переход через 30 минут - без пробуждения спали бы весь interval
+        with mock.patch('time.sleep', side_effect=save_vacancy) as sleep:
+            VisibilityCommand().sleep(interval=60, poll=1)
+        sleep.assert_called_once_with(1)
+        self.assertEqual(VacancySchedule.next_transition(), soon)
+
+
+class AdminChangelistQueryTests(IsolatedCacheTestCase):
+    """Список в админке строится за постоянное число запросов, без запросов на строку"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.seeded = 0
+
+    def seed(self, count):
+        start, self.seeded = self.seeded, self.seeded + count
+        numbers = range(start, self.seeded)
+        services = Service.objects.bulk_create([Service(title=f'Услуга {i}') for i in numbers])
+        details = ServiceDetail.objects.bulk_create([
+            ServiceDetail(service=service, title=f'Детально {service.title}', description='...')
+            for service in services
+        ])
+        for detail in details:
+            ServiceFeature.objects.bulk_create([
+                ServiceFeature(service_detail=detail, title=f'Особенность {i}', order=i) for i in range(2)
+            ])
+            ServiceCase.objects.create(service_detail=detail, title='Кейс', description='...')
+            ServiceProcess.objects.create(service_detail=detail, step_number=1, title='Этап', description='...')
+            ServiceBenefit.objects.create(service_detail=detail, title='Плюс', description='...')
+            ServiceFAQ.objects.create(service_detail=detail, question='Вопрос?', answer='Ответ')
+        vacancies = Vacancy.objects.bulk_create([Vacancy(title=f'Вакансия {i}', description='...') for i in numbers])
+        VacancyApplication.objects.bulk_create([
+            VacancyApplication(
+                vacancy=vacancy, name='Кандидат', phone='+996555000000',
+                email='cv@example.com', resume='vacancies/resumes/cv.pdf',
+            )
+            for vacancy in vacancies
+        ])
+        TelegramNotification.objects.bulk_create([TelegramNotification(message='Заявка') for _ in numbers])
+
+    def changelist_queries(self):
+        counts = {}
+        for model in admin.site._registry:
+            if model._meta.app_label != 'main':
+                continue
+            url = reverse(f'admin:main_{model._meta.model_name}_changelist')
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[model._meta.model_name] = len(queries)
+        return counts
+
+    def test_query_count_does_not_depend_on_rows(self):
+        self.seed(2)
+        few = self.changelist_queries()
+        self.seed(110)
+        self.assertEqual(self.changelist_queries(), few)
+
+
+class LargeTableAdminTests(IsolatedCacheTestCase):
+    """Режим больших таблиц для заявок и откликов в админке"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.vacancies = Vacancy.objects.bulk_create([Vacancy(title=f'Вакансия {i}', description='...') for i in range(2)])
+        VacancyApplication.objects.bulk_create([
+            VacancyApplication(
+                vacancy=self.vacancies[i % 2], name=f'Кандидат {i}', phone='+996555000000',
+                email=f'cv{i}@example.com', resume='vacancies/resumes/cv.pdf',
+            )
+            for i in range(25)
+        ])
+        ConsultationRequest.objects.bulk_create([
+            ConsultationRequest(name=f'Клиент {i}', phone='+996555000000') for i in range(25)
+        ])
+        ContactRequest.objects.bulk_create([ContactRequest(email=f'lead{i}@example.com') for i in range(25)])
+        self.url = reverse('admin:main_vacancyapplication_changelist')
+
+    def test_no_full_count_and_no_fk_choices(self):
+        for name in ('vacancyapplication', 'consultationrequest', 'contactrequest'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(f'admin:main_{name}_changelist'))
+            self.assertEqual(response.status_code, 200)
+            for query in queries:
+                sql = query['sql']
+                if 'COUNT(' in sql:
+                    self.assertIn('LIMIT', sql)
+                # Вакансии не перечисляются в фильтре - только join к строкам списка
+                self.assertNotIn('FROM "main_vacancy"', sql)
+
+    def test_pages_follow_ordering_and_count_is_bounded(self):
+        expected = list(VacancyApplication.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        with mock.patch('main.admin.VacancyApplicationAdmin.list_per_page', 10), \
+                mock.patch.object(EstimatedCountPaginator, 'COUNT_LIMIT', 20):
+            ids = []
+            for page, count, capped in ((1, 20, True), (2, 25, False), (3, 25, False)):
+                response = self.client.get(self.url, {'p': page})
+                changelist = response.context['cl']
+                self.assertEqual((changelist.result_count, changelist.paginator.capped), (count, capped))
+                ids += [application.pk for application in changelist.result_list]
+                if capped:
+                    self.assertContains(response, '20+')
+        # Страницы за пределом COUNT_LIMIT достижимы
+        self.assertEqual(ids, expected)
+
+    def test_next_page_seeks_from_previous_page_end(self):
+        expected = list(VacancyApplication.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        with mock.patch('main.admin.VacancyApplicationAdmin.list_per_page', 5):
+            ids = []
+            for page in range(1, 6):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(self.url, {'p': page})
+                ids += [application.pk for application in response.context['cl'].result_list]
+                if page > 2:
+                    # Условие по позиции конца прошлой страницы вместо OFFSET от начала
+                    self.assertFalse([query for query in queries if 'OFFSET' in query['sql']])
+            self.assertEqual(ids, expected)
+
+            # Прямой переход на далекую страницу - OFFSET от ближайшей запомненной
+            cache.clear()
+            response = self.client.get(self.url, {'p': 4})
+            self.assertEqual([application.pk for application in response.context['cl'].result_list], expected[15:20])
+
+    def test_stale_estimate_falls_back_to_count(self):
+        # Оценка после массовой загрузки: 20 строк вместо 25
+        with mock.patch('main.admin.VacancyApplicationAdmin.list_per_page', 10), \
+                mock.patch.object(EstimatedCountPaginator, 'COUNT_LIMIT', 10), \
+                mock.patch.object(EstimatedCountPaginator, 'estimated_count', return_value=20):
+            self.assertEqual(self.client.get(self.url).context['cl'].result_count, 20)
+            changelist = self.client.get(self.url, {'p': 3}).context['cl']
+            self.assertEqual(changelist.result_count, 25)
+            self.assertEqual(len(changelist.result_list), 5)
+
+    def test_search_by_name_prefix(self):
+        VacancyApplication.objects.create(
+            vacancy=self.vacancies[0], name='Aigerim Sadykova', phone='+996555000001',
+            email='aigerim@example.com', resume='vacancies/resumes/cv.pdf',
+        )
+        changelist = self.client.get(self.url, {'q': 'aiger'}).context['cl']
+        self.assertEqual([application.name for application in changelist.result_list], ['Aigerim Sadykova'])
+        # Префиксный поиск, не по подстроке
+        self.assertEqual(self.client.get(self.url, {'q': 'gerim'}).context['cl'].result_count, 0)
+
+    def test_filter_by_vacancy(self):
+        vacancy = self.vacancies[0]
+        changelist = self.client.get(self.url, {'vacancy__id__exact': vacancy.pk}).context['cl']
+        self.assertEqual({application.vacancy_id for application in changelist.result_list}, {vacancy.pk})
+        self.assertEqual(changelist.result_count, 13)
+
+
+class LeadExportTests(IsolatedCacheTestCase):
+    """Потоковая выгрузка заявок и откликов"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.vacancies = Vacancy.objects.bulk_create([Vacancy(title=f'Вакансия {i}', description='...') for i in range(3)])
+        VacancyApplication.objects.bulk_create([
+            VacancyApplication(
+                vacancy=self.vacancies[i % 3], name=f'Кандидат {i}', phone='+996555000000',
+                email=f'cv{i}@example.com', resume='vacancies/resumes/cv.pdf',
+                status='interview' if i % 2 else 'new',
+            )
+            for i in range(30)
+        ])
+        ConsultationRequest.objects.bulk_create([
+            ConsultationRequest(name=f'Клиент {i}', phone='+996555000000', is_processed=bool(i % 2)) for i in range(10)
+        ])
+        ConsultationRequest.objects.create(name='=HYPERLINK("evil")', phone='+996555000001')
+
+    def download(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def read_csv(self, kind, params=None):
+        content = self.download(reverse('lead-export', args=[kind, 'csv']), params)
+        return list(csv.reader(StringIO(content.decode('utf-8-sig'))))
+
+    def test_csv_with_vacancy_title_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.read_csv('applications')
+        self.assertEqual(len(rows), 31)
+        self.assertEqual(rows[0][2], 'Вакансия')
+        titles = {vacancy.pk: vacancy.title for vacancy in self.vacancies}
+        for row in rows[1:]:
+            self.assertEqual(row[2], titles[int(row[1])])
+        self.assertEqual(len([q for q in queries if 'main_vacancyapplication' in q['sql']]), 1)
+
+    def test_filters(self):
+        vacancy = self.vacancies[0]
+        rows = self.read_csv('applications', {'vacancy': vacancy.pk, 'status': 'new'})
+        self.assertEqual(len(rows) - 1, 5)
+        self.assertTrue(all(row[7] == 'Новый' for row in rows[1:]))
+
+        self.assertEqual(len(self.read_csv('consultations', {'is_processed': 'true'})) - 1, 5)
+        today = timezone.localdate()
+        self.assertEqual(len(self.read_csv('consultations', {'created_from': today.isoformat()})) - 1, 11)
+        self.assertEqual(len(self.read_csv('consultations', {'created_to': '2000-01-01'})) - 1, 0)
+
+    def test_csv_neutralizes_formulas(self):
+        rows = self.read_csv('consultations')
+        self.assertIn('\'=HYPERLINK("evil")', [row[1] for row in rows])
+        # Телефоны выгружаются без апострофа
+        self.assertEqual({row[2] for row in rows[1:]}, {'+996555000000', '+996555000001'})
+        self.assertEqual(LeadExport.csv_value('+996 (555) 12-34-56'), '+996 (555) 12-34-56')
+        self.assertEqual(LeadExport.csv_value('+1+cmd|calc'), "'+1+cmd|calc")
+        self.assertEqual(LeadExport.csv_value('-2+3'), "'-2+3")
+
+    def test_xlsx_is_valid_workbook(self):
+        content = self.download(reverse('lead-export', args=['consultations', 'xlsx']))
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertIn('[Content_Types].xml', archive.namelist())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row>'), 12)
+        self.assertIn('Клиент 3', sheet)
+
+    def test_staff_only_and_unknown_kind(self):
+        self.assertEqual(self.client.get(reverse('lead-export', args=['leads', 'csv'])).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('lead-export', args=['contacts', 'csv'])).status_code, 403)
+
+    def test_admin_action_exports_selection(self):
+        selected = list(ConsultationRequest.objects.values_list('pk', flat=True)[:3])
+        response = self.client.post(reverse('admin:main_consultationrequest_changelist'), {
+            'action': 'export_csv', '_selected_action': selected,
+        })
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertCountEqual([int(row[0]) for row in rows[1:]], selected)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ResumeArchiveTests(IsolatedCacheTestCase):
+    """Потоковый ZIP с резюме откликов"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.vacancy = Vacancy.objects.create(title='Python', description='...')
+        self.applications = []
+        for i in range(3):
+            application = VacancyApplication(
+                vacancy=self.vacancy, name=f'Кандидат {i}', phone='+996555000000', email=f'cv{i}@example.com'
+            )
+            application.resume.save(f'cv{i}.pdf', SimpleUploadedFile(f'cv{i}.pdf', b'%PDF' + bytes([i]) * 200_000), save=False)
+            application.save()
+            self.applications.append(application)
+
+    def read_zip(self, response):
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        # Архив отдается кусками, а не одним буфером
+        self.assertGreater(len(chunks), 3)
+        return zipfile.ZipFile(BytesIO(b''.join(chunks)))
+
+    def test_vacancy_archive_with_manifest(self):
+        response = self.client.get(reverse('vacancy-resumes', args=[self.vacancy.pk]))
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with self.read_zip(response) as archive:
+            self.assertIsNone(archive.testzip())
+            manifest = list(csv.reader(StringIO(archive.read('manifest.csv').decode('utf-8-sig'))))
+            self.assertEqual(len(manifest), 4)
+            for row in manifest[1:]:
+                application = VacancyApplication.objects.get(pk=row[0])
+                with application.resume.open('rb') as resume:
+                    self.assertEqual(archive.read(row[-1]), resume.read())
+
+    def test_admin_action_and_missing_file(self):
+        first, second, _ = self.applications
+        os.remove(second.resume.path)
+        response = self.client.post(reverse('admin:main_vacancyapplication_changelist'), {
+            'action': 'download_resumes', '_selected_action': [first.pk, second.pk],
+        })
+        with self.read_zip(response) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(any(name.endswith('.missing.txt') for name in names))
+
+    def test_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('vacancy-resumes', args=[self.vacancy.pk])).status_code, 403)
+
+
+class LeadInboxTests(IsolatedCacheTestCase):
+    """Единый список заявок: keyset-пагинация по трем таблицам и счетчики"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.vacancy = Vacancy.objects.create(title='Python', description='...')
+        base = timezone.now() - timedelta(days=1)
+        self.expected = []
+        for i in range(5):
+            # Одинаковое время у заявок разных типов - проверка порядка при равных created_at
+            moment = base + timedelta(minutes=i)
+            consultation = ConsultationRequest.objects.create(name=f'Клиент {i}', phone='+996555000000', is_processed=i % 2)
+            contact = ContactRequest.objects.create(email=f'lead{i}@example.com')
+            application = VacancyApplication.objects.create(
+                vacancy=self.vacancy, name=f'Кандидат {i}', phone='+996555000000',
+                email=f'cv{i}@example.com', resume='vacancies/resumes/cv.pdf',
+                status='interview' if i % 2 else 'new',
+            )
+            for model, obj, rank in ((ConsultationRequest, consultation, 0), (ContactRequest, contact, 1),
+                                     (VacancyApplication, application, 2)):
+                model.objects.filter(pk=obj.pk).update(created_at=moment)
+                self.expected.append((moment, rank, obj.pk))
+        self.url = reverse('lead-inbox')
+
+    def collect(self, params):
+        keys, url, pages = [], self.url, 0
+        while url:
+            payload = self.client.get(url, params if url == self.url else None).json()
+            keys += [(item['type'], item['id']) for item in payload['results']]
+            url = payload['next']
+            pages += 1
+            if not payload['results']:
+                break
+        return keys, pages
+
+    def test_pages_merge_all_types_in_order(self):
+        types = list(LeadInbox.TYPES)
+        expected = [(types[rank], pk) for _, rank, pk in sorted(self.expected, reverse=True)]
+        keys, pages = self.collect({'page_size': 4})
+        self.assertEqual(keys, expected)
+        self.assertEqual(pages, 4)
+
+    def test_one_query_per_type_and_one_for_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            payload = self.client.get(self.url).json()
+        lead_queries = [q for q in queries if 'request' in q['sql'] or 'application' in q['sql']]
+        self.assertEqual(len(lead_queries), 4)
+        self.assertEqual(payload['counts'], {
+            'consultation': {'new': 3, 'processed': 2},
+            'contact': {'new': 5},
+            'application': {'new': 3, 'interview': 2},
+        })
+        application = next(item for item in payload['results'] if item['type'] == 'application')
+        self.assertEqual(application['vacancy'], {'id': self.vacancy.pk, 'title': 'Python'})
+
+    def test_filters(self):
+        keys, _ = self.collect({'vacancy': self.vacancy.pk})
+        self.assertEqual({lead_type for lead_type, _ in keys}, {'application'})
+        keys, _ = self.collect({'is_processed': 'true'})
+        self.assertEqual(len(keys), 4)
+        keys, _ = self.collect({'type': 'contact', 'status': 'processed'})
+        self.assertEqual(keys, [])
+        payload = self.client.get(self.url, {'status': 'processed'}).json()
+        # Счетчики не зависят от фильтра по статусу
+        self.assertEqual(payload['counts']['consultation'], {'new': 3, 'processed': 2})
+
+    def test_polling_returns_only_new_rows(self):
+        payload = self.client.get(self.url, {'ordering': 'created_at', 'page_size': 100}).json()
+        self.assertEqual(len(payload['results']), 15)
+        poll = payload['next']
+        self.assertEqual(self.client.get(poll).json()['results'], [])
+
+        new = ContactRequest.objects.create(email='new@example.com')
+        payload = self.client.get(poll).json()
+        self.assertEqual([(item['type'], item['id']) for item in payload['results']], [('contact', new.pk)])
+
+    def test_polling_does_not_skip_late_commits(self):
+        poll = self.client.get(self.url, {'ordering': 'created_at', 'page_size': 100}).json()['next']
+        fresh = ContactRequest.objects.create(email='fresh@example.com')
+        seq = ContactRequest.objects.values_list('commit_seq', flat=True).get(pk=fresh.pk)
+        # Граница стоит на заявке: транзакция с ней (или более старая) еще не завершена
+        with mock.patch.object(CommitSequence, 'horizon', return_value=seq):
+            payload = self.client.get(poll).json()
+        self.assertEqual(payload['results'], [])
+        self.assertEqual(payload['next'], poll)
+
+        # Заявка с created_at раньше всех уже отданных, закоммиченная после опроса
+        late = ConsultationRequest.objects.create(name='Поздний', phone='+996555000000')
+        ConsultationRequest.objects.filter(pk=late.pk).update(created_at=timezone.now() - timedelta(days=30))
+        payload = self.client.get(payload['next']).json()
+        self.assertEqual([(item['type'], item['id']) for item in payload['results']],
+                         [('contact', fresh.pk), ('consultation', late.pk)])
+
+    def test_commit_seq_assigned_on_insert_only(self):
+        poll = self.client.get(self.url, {'ordering': 'created_at', 'page_size': 100}).json()['next']
+        bulk = ContactRequest.objects.bulk_create([ContactRequest(email=f'bulk{i}@example.com') for i in range(2)])
+        lead = ConsultationRequest.objects.create(name='Клиент', phone='+996555000000')
+        seq = ConsultationRequest.objects.values_list('commit_seq', flat=True).get(pk=lead.pk)
+        lead.is_processed = True
+        lead.save()
+        self.assertEqual(ConsultationRequest.objects.values_list('commit_seq', flat=True).get(pk=lead.pk), seq)
+
+        payload = self.client.get(poll).json()
+        self.assertEqual([(item['type'], item['id']) for item in payload['results']],
+                         [('contact', bulk[0].pk), ('contact', bulk[1].pk), ('consultation', lead.pk)])
+
+    def test_invalid_cursor_and_staff_only(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'garbage'}).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class LeadStreamTests(IsolatedCacheTestCase):
+    """SSE-поток новых заявок с продолжением по Last-Event-ID"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.url = reverse('lead-stream')
+        self.first = ConsultationRequest.objects.create(name='Первый', phone='+996555000000')
+        row = ConsultationRequest.objects.values('id', 'commit_seq').get(pk=self.first.pk)
+        self.cursor = LeadFeed.inbox().encode_cursor('consultation', row)
+
+    @staticmethod
+    def events(content):
+        events = []
+        for block in content.split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+            if fields.get('event') == 'lead':
+                events.append((fields['id'], json.loads(fields['data'])))
+        return events
+
+    def read(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_resume_from_last_event_id(self):
+        contact = ContactRequest.objects.create(email='lead@example.com')
+        second = ConsultationRequest.objects.create(name='Второй', phone='+996555000000')
+
+        content = self.read(last_event_id=self.cursor)
+        self.assertTrue(content.startswith('retry: '))
+        events = self.events(content)
+        self.assertCountEqual([(data['type'], data['id']) for _, data in events],
+                              [('contact', contact.pk), ('consultation', second.pk)])
+
+        # Переподключение с последним id не повторяет события
+        self.assertEqual(self.events(self.read(last_event_id=events[-1][0])), [])
+
+    def test_resume_waits_for_unfinished_transactions(self):
+        late = ContactRequest.objects.create(email='late@example.com')
+        ContactRequest.objects.filter(pk=late.pk).update(created_at=timezone.now() - timedelta(days=30))
+        seq = ContactRequest.objects.values_list('commit_seq', flat=True).get(pk=late.pk)
+        # Более старая транзакция еще идет - заявка за границей не отдается
+        with mock.patch.object(CommitSequence, 'horizon', return_value=seq):
+            self.assertEqual(self.events(self.read(last_event_id=self.cursor)), [])
+
+        # Переподключение с тем же Last-Event-ID получает ее, несмотря на ранний created_at
+        events = self.events(self.read(last_event_id=self.cursor))
+        self.assertEqual([(data['type'], data['id']) for _, data in events], [('contact', late.pk)])
+
+    def test_without_last_event_id_starts_from_now(self):
+        self.assertEqual(self.events(self.read()), [])
+
+    def test_new_lead_bumps_feed_version(self):
+        version = LeadFeed.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactRequest.objects.create(email='lead@example.com')
+        self.assertNotEqual(LeadFeed.version(), version)
+
+    @mock.patch.multiple(LeadFeed, MAX_DURATION=0.3, POLL_INTERVAL=0.05)
+    async def test_asgi_stream_pushes_events(self):
+        await self.async_client.aforce_login(await User.objects.aget(username='admin'))
+        response = await self.async_client.get(self.url, headers={'last-event-id': self.cursor})
+        await ContactRequest.objects.acreate(email='live@example.com')
+        chunks = [chunk async for chunk in response.streaming_content]
+        events = self.events(b''.join(chunks).decode('utf-8'))
+        self.assertEqual([data['email'] for _, data in events], ['live@example.com'])
+
+    @mock.patch.multiple(LeadFeed, MAX_DURATION=0.5, POLL_INTERVAL=0.05)
+    async def test_asgi_stream_pushes_lead_committed_after_open(self):
+        await self.async_client.aforce_login(await User.objects.aget(username='admin'))
+        created_at = timezone.now() - timedelta(minutes=5)
+        # Заявка из setUp закоммичена до открытия потока - в нем ее нет
+        response = await self.async_client.get(self.url)
+
+        async def late_commit():
+            # created_at назначен до открытия потока, коммит - после
+            await asyncio.sleep(0.1)
+            lead = await ContactRequest.objects.acreate(email='late@example.com')
+            await ContactRequest.objects.filter(pk=lead.pk).aupdate(created_at=created_at)
+            await sync_to_async(LeadFeed.bump)()
+
+        task = asyncio.create_task(late_commit())
+        chunks = [chunk async for chunk in response.streaming_content]
+        await task
+        events = self.events(b''.join(chunks).decode('utf-8'))
+        self.assertEqual([data['email'] for _, data in events], ['late@example.com'])
+
+    def test_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ApiKeyAuthTests(IsolatedCacheTestCase):
+    """Административный API по ключу: без хеширования пароля, запись ключа из кеша"""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        self.api_key, self.key = ApiKey.generate(self.user, 'CRM')
+        self.url = reverse('service-admin-list')
+        self.addCleanup(ApiKeyAuthentication.invalidate, self.api_key.prefix)
+
+    def get(self, key=None):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Api-Key {key or self.key}')
+
+    def test_key_hash_only_stored(self):
+        self.assertNotIn(self.key.split('.', 1)[1], self.api_key.key_hash)
+        self.assertEqual(self.api_key.prefix, self.key.split('.', 1)[0])
+
+    def test_valid_key_skips_password_hashing_and_caches_lookup(self):
+        with mock.patch.object(User, 'check_password') as check_password:
+            self.assertEqual(self.get().status_code, 200)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.get().status_code, 200)
+        check_password.assert_not_called()
+        self.assertFalse([q for q in queries.captured_queries if 'main_apikey' in q['sql']])
+
+    def test_invalid_secret_rejected(self):
+        response = self.get(f'{self.api_key.prefix}.wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Api-Key')
+        self.assertEqual(self.get('unknown.secret').status_code, 401)
+
+    def test_deactivated_key_rejected_immediately(self):
+        self.assertEqual(self.get().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key.is_active = False
+            self.api_key.save()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_basic_auth_not_accepted_on_admin_router(self):
+        credentials = base64.b64encode(b'admin:pass').decode('ascii')
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertIn(response.status_code, (401, 403))
+
+
+class LeanPipelineTests(IsolatedCacheTestCase):
+    """Публичные GET-эндпоинты идут мимо сессий, CSRF, аутентификации и сообщений"""
+
+    def setUp(self):
+        Service.objects.create(title='Разработка')
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+
+    def test_public_get_skips_session_and_auth(self):
+        self.client.force_login(self.user)
+        with mock.patch('django.contrib.sessions.middleware.SessionMiddleware.process_request') as session, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('service-list'))
+        self.assertEqual(response.status_code, 200)
+        session.assert_not_called()
+        self.assertFalse([q for q in queries.captured_queries if 'django_session' in q['sql']])
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertNotIn('X-Frame-Options', response)
+
+    def test_other_views_keep_full_pipeline(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('service-admin-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Cookie', response['Vary'])
+        self.assertIn('X-Frame-Options', response)
+        self.assertFalse(LeanPipelineMiddleware.is_lean(reverse('lead-inbox')))
+        self.assertTrue(LeanPipelineMiddleware.is_lean(reverse('vacancy-list')))
+
+    @override_settings(LEAN_PUBLIC_PIPELINE=False)
+    def test_disabled_setting_restores_full_pipeline(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('service-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Frame-Options', response)
+        # DRF снова аутентифицирует запрос по сессии
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_benchmark_command(self):
+        command = BenchmarkCommand(stdout=StringIO())
+        call_command(command, '/api/services/', requests=5, rounds=1)
+        results = command.results
+        # С cookie сессии полный стек читает сессию и пользователя, облегченный - нет
+        self.assertEqual(results['/api/services/', 'session', 'full']['queries'],
+                         results['/api/services/', 'session', 'lean']['queries'] + 2)
+        self.assertEqual(results['/api/services/', 'anonymous', 'full']['queries'],
+                         results['/api/services/', 'anonymous', 'lean']['queries'])
+        # Пользователь бенчмарка откатывается
+        self.assertFalse(User.objects.filter(username__startswith='benchmark-').exists())
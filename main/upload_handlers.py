@@ -0,0 +1,60 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+
+
+class ResumeUploadHandler(TemporaryFileUploadHandler):
+    """
+    Потоковая загрузка резюме.
+
+    Файл пишется на диск кусками по chunk_size, поэтому память на запрос
+    не зависит от размера файла. По ходу чтения считается SHA-256,
+    недопустимое расширение отклоняется по заголовку части (до чтения
+    содержимого), а превышение размера - как только пришел лишний байт.
+    Ошибка сохраняется в self.error, парсинг тела прерывается.
+    """
+    chunk_size = 64 * 1024
+    field_name = 'resume'
+
+    def __init__(self, request=None, max_size=None, allowed_extensions=None):
+        super().__init__(request)
+        from .models import RESUME_EXTENSIONS
+        self.max_size = max_size or settings.RESUME_MAX_UPLOAD_SIZE
+        self.allowed_extensions = allowed_extensions or RESUME_EXTENSIONS
+        self.error = None
+        self.error_status = None
+        self.sha256 = None
+        self._hash = None
+        self._received = 0
+
+    def reject(self, message, status):
+        self.error = message
+        self.error_status = status
+        # connection_reset=True: оставшееся тело запроса не дочитывается
+        raise StopUpload(connection_reset=True)
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        if field_name != self.field_name:
+            self.reject(f'Неожиданный файл в поле {field_name}', 400)
+
+        extension = os.path.splitext(file_name or '')[1].lstrip('.').lower()
+        if extension not in self.allowed_extensions:
+            allowed = ', '.join(ext.upper() for ext in self.allowed_extensions)
+            self.reject(f'Недопустимый формат файла. Разрешены: {allowed}', 400)
+
+        self._hash = hashlib.sha256()
+        self._received = 0
+        super().new_file(field_name, file_name, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._received += len(raw_data)
+        if self._received > self.max_size:
+            self.reject(f'Файл слишком большой (максимум {self.max_size // (1024 * 1024)} МБ)', 413)
+        self._hash.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        self.sha256 = self._hash.hexdigest()
+        return super().file_complete(file_size)
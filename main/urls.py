@@ -8,6 +8,9 @@ API URL Configuration for Navis Site
 - /api/docs/ - Swagger UI
 - /api/redoc/ - ReDoc документация
 
+Все списки постраничные (keyset-пагинация): ответ {next, previous, results},
+параметры ?cursor=<из next/previous> и ?page_size=<до 100>.
+
 Публичные эндпоинты:
 GET /api/services/ - Получить все услуги
 GET /api/technologies/ - Получить все технологии
@@ -23,6 +26,8 @@ POST /api/consultation/ - Отправить заявку на консульт
 GET /api/service-details/ - Получить все детальные страницы услуг
 GET /api/service-details/<int:pk>/ - Получить детальную информацию об услуге по ID
 GET /api/service-details/by-service/<int:service_id>/ - Получить детальную информацию по service_id
+GET /api/service-details/<int:pk>/full/ - Получить страницу услуги со всеми блоками по ID
+GET /api/service-details/by-service/<int:service_id>/full/ - Получить страницу услуги со всеми блоками по service_id
 GET /api/service-details/<int:service_detail_id>/features/ - Получить особенности услуги
 GET /api/service-details/<int:service_detail_id>/processes/ - Получить этапы работы
 GET /api/service-details/<int:service_detail_id>/benefits/ - Получить преимущества
@@ -31,6 +36,7 @@ GET /api/service-details/<int:service_detail_id>/cases/ - Получить ке
 
 Вакансии:
 GET /api/vacancies/ - Получить список вакансий (с фильтрацией)
+GET /api/vacancies/facets/ - Счетчики фильтров вакансий
 GET /api/vacancies/<int:pk>/ - Получить детальную информацию о вакансии
 POST /api/vacancies/<int:vacancy_id>/apply/ - Создать отклик на вакансию
 
@@ -39,6 +45,10 @@ POST /api/vacancies/<int:vacancy_id>/apply/ - Создать отклик на 
 /api/testimonials/admin/ - Управление отзывами (CRUD + toggle_active)
 /api/consultations/admin/ - Управление заявками (CRUD + mark_processed/unprocessed)
 /api/service-details/admin/ - Управление детальными страницами (CRUD + toggle_active)
+GET /api/leads/ - Единый список заявок и откликов (фильтры, keyset-пагинация, счетчики)
+GET /api/leads/stream/ - Новые заявки в реальном времени (Server-Sent Events, Last-Event-ID)
+GET /api/exports/<contacts|consultations|applications>.<csv|xlsx> - Потоковая выгрузка заявок/откликов
+GET /api/vacancies/<int:vacancy_id>/resumes.zip - ZIP с резюме откликов и манифестом
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
@@ -67,6 +77,14 @@ urlpatterns = [
          views.ServiceDetailByServiceView.as_view(), 
          name='service-detail-by-service'),
     
+    # Получить страницу услуги со всеми блоками (особенности, этапы, преимущества, FAQ, кейсы)
+    path('api/service-details/<int:pk>/full/', 
+         views.ServiceDetailFullView.as_view(), 
+         name='service-detail-full'),
+    path('api/service-details/by-service/<int:service_id>/full/', 
+         views.ServiceDetailFullView.as_view(), 
+         name='service-detail-full-by-service'),
+    
     # Получить все детальные страницы услуг (с фильтрацией)
     path('api/service-details/', views.ServiceDetailListView.as_view(), name='service-detail-list'),
     
@@ -119,12 +137,19 @@ urlpatterns = [
 
     # ========== ВАКАНСИИ ==========
     path('api/vacancies/', views.VacancyListView.as_view(), name='vacancy-list'),
+    path('api/vacancies/facets/', views.VacancyFacetsView.as_view(), name='vacancy-facets'),
     path('api/vacancies/<int:pk>/', views.VacancyDetailView.as_view(), name='vacancy-detail'),
     path('api/vacancies/<int:vacancy_id>/apply/', 
          views.VacancyApplicationCreateView.as_view(), 
          name='vacancy-apply'),
     
     # ========== АДМИНСКИЕ ЭНДПОИНТЫ ==========
+    path('api/leads/', views.LeadInboxView.as_view(), name='lead-inbox'),
+    path('api/leads/stream/', views.LeadStreamView.as_view(), name='lead-stream'),
+    path('api/exports/<slug:kind>.<slug:extension>', views.LeadExportView.as_view(), name='lead-export'),
+    path('api/vacancies/<int:vacancy_id>/resumes.zip',
+         views.VacancyResumesArchiveView.as_view(),
+         name='vacancy-resumes'),
     path('api/', include(router.urls)),
 ]
 
@@ -0,0 +1,183 @@
+import hashlib
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .cache_service import ContentCacheService
+from .models import Skill, Vacancy, VacancySkill
+from .search import VacancySearch
+
+
+class VacancyFilter:
+    """
+    Фильтры списка вакансий из query-параметров.
+
+    Общие для VacancyListView и фасетов: условия хранятся по имени фасета,
+    чтобы счетчики фасета считались по всем фильтрам, кроме его собственного
+    (drill-down: выбранная категория не обнуляет остальные категории).
+    """
+    CHOICE_FACETS = {
+        'category': Vacancy.CATEGORY_CHOICES,
+        'level': Vacancy.LEVEL_CHOICES,
+        'employment_type': Vacancy.EMPLOYMENT_TYPE_CHOICES,
+    }
+    BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+    FACETS_KEY = 'vacancy-facets:{}:{}'
+    FACETS_TIMEOUT = 24 * 60 * 60
+    ORDERINGS = ('salary', '-salary')
+
+    def __init__(self, params):
+        self.conditions = {}
+        self.cache_params = []
+
+        for name in self.CHOICE_FACETS:
+            value = params.get(name)
+            if value:
+                self.conditions[name] = Q(**{name: value})
+                self.cache_params.append((name, value))
+
+        is_remote = self.BOOLEAN_VALUES.get(params.get('is_remote', '').lower())
+        if is_remote is not None:
+            self.conditions['is_remote'] = Q(is_remote=is_remote)
+            self.cache_params.append(('is_remote', is_remote))
+
+        skills = sorted({Skill.normalize(name) for name in params.getlist('skill') if name.strip()})
+        if skills:
+            mode = 'any' if params.get('skill_mode') == 'any' else 'all'
+            self.conditions['skill'] = self.skill_condition(skills, mode)
+            self.cache_params.append(('skill', mode, tuple(skills)))
+
+        salary_from = self.parse_int(params.get('salary_from'))
+        salary_to = self.parse_int(params.get('salary_to'))
+        if salary_from is not None or salary_to is not None:
+            self.conditions['salary'] = self.salary_overlap(salary_from, salary_to, inclusive=True)
+            self.cache_params.append(('salary', salary_from, salary_to))
+
+        self.query = params.get('q', '').strip()
+        if self.query:
+            self.cache_params.append(('q', ' '.join(VacancySearch.terms(self.query))))
+
+        # Сортировка списка: salary / -salary, иначе по релевантности или Meta.ordering
+        ordering = params.get('ordering')
+        self.ordering = ordering if ordering in self.ORDERINGS else None
+
+    @staticmethod
+    def parse_int(value):
+        try:
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def skill_condition(skills, mode):
+        """
+        Вакансии с навыками (нормализованными): any - хотя бы один, all - все.
+        Подзапрос идет по индексам skill.normalized и (skill, vacancy).
+        """
+        links = VacancySkill.objects.filter(skill__normalized__in=skills).values('vacancy')
+        if mode == 'all' and len(skills) > 1:
+            links = links.annotate(matched=Count('skill')).filter(matched=len(skills))
+        return Q(pk__in=links.values('vacancy'))
+
+    def condition(self, exclude=None):
+        """Все условия, кроме фасета exclude"""
+        return reduce(and_, (q for name, q in self.conditions.items() if name != exclude), Q())
+
+    def apply(self, queryset):
+        """
+        Фильтрует список; при поиске - аннотация search_rank и сортировка по ней,
+        при ordering=salary / -salary - по ключу salary_sort
+        """
+        queryset = queryset.filter(self.condition())
+        if self.query:
+            queryset = VacancySearch.search(queryset, self.query).order_by(
+                '-search_rank', *Vacancy._meta.ordering
+            )
+        if self.ordering:
+            descending = self.ordering.startswith('-')
+            queryset = queryset.with_salary_sort(descending=descending).order_by(
+                '-salary_sort' if descending else 'salary_sort', *Vacancy._meta.ordering
+            )
+        return queryset
+
+    # ========== ФАСЕТЫ ==========
+
+    @staticmethod
+    def salary_overlap(salary_from=None, salary_to=None, inclusive=False):
+        """
+        Вилка вакансии [salary_min, salary_max] пересекается с [salary_from, salary_to)
+        (с inclusive - с [salary_from, salary_to]). Незаданная граница вилки
+        считается открытой, вакансии без зарплаты не подходят.
+        """
+        condition = Q(salary_min__isnull=False) | Q(salary_max__isnull=False)
+        if salary_from is not None:
+            condition &= Q(salary_max__gte=salary_from) | Q(salary_max__isnull=True)
+        if salary_to is not None:
+            lookup = 'salary_min__lte' if inclusive else 'salary_min__lt'
+            condition &= Q(**{lookup: salary_to}) | Q(salary_min__isnull=True)
+        return condition
+
+    @staticmethod
+    def salary_buckets():
+        """Интервалы зарплат по границам VACANCY_SALARY_BUCKETS (последний - открытый)"""
+        bounds = settings.VACANCY_SALARY_BUCKETS
+        return list(zip(bounds, [*bounds[1:], None]))
+
+    def facet_options(self):
+        """[(фасет, [(значение, подпись, условие)])]"""
+        facets = [
+            (name, [(value, str(label), Q(**{name: value})) for value, label in choices])
+            for name, choices in self.CHOICE_FACETS.items()
+        ]
+        facets.append(('is_remote', [
+            (True, 'Удаленно', Q(is_remote=True)),
+            (False, 'В офисе', Q(is_remote=False)),
+        ]))
+        facets.append(('salary', [
+            (
+                {'from': low, 'to': high},
+                f'{low} - {high}$' if high is not None else f'от {low}$',
+                self.salary_overlap(low, high),
+            )
+            for low, high in self.salary_buckets()
+        ]))
+        return facets
+
+    def facet_counts(self, queryset):
+        """Счетчики всех фасетов одним агрегирующим запросом"""
+        if self.query:
+            queryset = VacancySearch.match(queryset, self.query)
+
+        facets = self.facet_options()
+        aggregates = {'total': Count('pk', filter=self.condition())}
+        for name, options in facets:
+            others = self.condition(exclude=name)
+            for index, (_, _, option) in enumerate(options):
+                aggregates[f'{name}_{index}'] = Count('pk', filter=others & option)
+        counts = queryset.aggregate(**aggregates)
+
+        return {
+            'total': counts['total'],
+            'facets': {
+                name: [
+                    {'value': value, 'label': label, 'count': counts[f'{name}_{index}']}
+                    for index, (value, label, _) in enumerate(options)
+                ]
+                for name, options in facets
+            },
+        }
+
+    def cached_facet_counts(self, queryset):
+        """Фасеты из кеша; ключ включает версию Vacancy, поэтому изменение вакансии его сбрасывает"""
+        version = ContentCacheService.get_versions((Vacancy,))[0]['token']
+        params = hashlib.sha1(repr(sorted(self.cache_params, key=str)).encode('utf-8')).hexdigest()
+        key = self.FACETS_KEY.format(version, params)
+
+        data = cache.get(key)
+        if data is None:
+            data = self.facet_counts(queryset)
+            cache.set(key, data, self.FACETS_TIMEOUT)
+        return data
@@ -0,0 +1,45 @@
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .cache_service import ContentCacheService
+from .models import Vacancy
+
+
+class VacancySchedule:
+    """
+    Переходы видимости вакансий по published_at / expires_at.
+
+    Набор видимых вакансий (Vacancy.objects.visible()) меняется только
+    в моменты публикации и истечения. Планировщик (update_vacancy_visibility)
+    просыпается ровно в эти моменты, выключает истекшие вакансии и сбрасывает
+    версию Vacancy - вместе с ней меняются ETag и ключи кешей списков и фасетов,
+    поэтому TTL этих кешей может быть длинным. Сохранение вакансии во время сна
+    тоже будит планировщик: у нее может быть переход раньше запланированного.
+    """
+
+    @staticmethod
+    def next_transition(now=None):
+        """Ближайший момент публикации или истечения (None, если не ожидается)"""
+        now = now or timezone.now()
+        stats = Vacancy.objects.filter(is_active=True).aggregate(
+            publish=Min('published_at', filter=Q(published_at__gt=now)),
+            expire=Min('expires_at', filter=Q(expires_at__gt=now)),
+        )
+        moments = [moment for moment in stats.values() if moment is not None]
+        return min(moments) if moments else None
+
+    @staticmethod
+    def apply_transitions(since=None, now=None):
+        """
+        Выключает истекшие вакансии; если с момента since видимость изменилась,
+        сбрасывает версию Vacancy (update() не отправляет сигналы).
+        Возвращает (число выключенных, были ли публикации).
+        """
+        now = now or timezone.now()
+        expired = Vacancy.objects.filter(is_active=True, expires_at__lte=now).update(is_active=False)
+        published = since is not None and Vacancy.objects.filter(
+            is_active=True, published_at__gt=since, published_at__lte=now
+        ).exists()
+        if expired or published:
+            ContentCacheService.content_changed(Vacancy)
+        return expired, published
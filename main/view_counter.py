@@ -0,0 +1,108 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyViewCounter:
+    """
+    Буфер просмотров вакансий.
+
+    Просмотры копятся в памяти процесса, а фоновый поток процесса раз
+    в VACANCY_VIEWS_FLUSH_INTERVAL секунд (или раньше, когда в буфере
+    VACANCY_VIEWS_MAX_PENDING вакансий) сбрасывает их в базу атомарными
+    UPDATE ... SET views_count = views_count + n (по одному запросу на каждое
+    различное n), поэтому GET детальной страницы ничего не пишет в базу
+    и не ждет записи, а инкременты не теряются при конкуренции.
+
+    При штатной остановке буфер сбрасывается в atexit. Если процесс убит
+    (SIGKILL, OOM), теряются просмотры с последнего сброса: не больше чем
+    за VACANCY_VIEWS_FLUSH_INTERVAL секунд.
+    """
+
+    def __init__(self, flush_interval=None, max_pending=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher_pid = None
+
+    def _settings(self):
+        interval = self.flush_interval
+        if interval is None:
+            interval = settings.VACANCY_VIEWS_FLUSH_INTERVAL
+        max_pending = self.max_pending
+        if max_pending is None:
+            max_pending = settings.VACANCY_VIEWS_MAX_PENDING
+        return interval, max_pending
+
+    def hit(self, vacancy_id):
+        """Учесть просмотр (только память процесса, без запросов к базе)"""
+        _, max_pending = self._settings()
+        with self._lock:
+            self._pending[vacancy_id] += 1
+            full = len(self._pending) >= max_pending
+        self._start_flusher()
+        if full:
+            self._wake.set()
+
+    def _start_flusher(self):
+        # Поток свой в каждом процессе: после fork воркера потока родителя нет
+        if self._flusher_pid == os.getpid() or not settings.VACANCY_VIEWS_BACKGROUND_FLUSH:
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._run, name='vacancy-views-flush', daemon=True).start()
+
+    def _run(self):
+        while True:
+            interval, _ = self._settings()
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+            # Соединение потока не держим открытым между сбросами
+            connection.close()
+
+    def pending(self, vacancy_id):
+        """Просмотры, еще не записанные в базу"""
+        with self._lock:
+            return self._pending.get(vacancy_id, 0)
+
+    def flush(self):
+        """Записать накопленные просмотры в базу"""
+        from .models import Vacancy
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        by_increment = defaultdict(list)
+        for vacancy_id, increment in pending.items():
+            by_increment[increment].append(vacancy_id)
+
+        try:
+            with transaction.atomic():
+                for increment, ids in by_increment.items():
+                    Vacancy.objects.filter(pk__in=ids).update(views_count=F('views_count') + increment)
+        except DatabaseError:
+            # Не теряем просмотры: вернем их в буфер до следующей попытки
+            logger.exception('Failed to flush vacancy views')
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+
+vacancy_views = VacancyViewCounter()
+atexit.register(vacancy_views.flush)
@@ -1,17 +1,28 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, viewsets
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.utils.urls import replace_query_param
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Prefetch
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.views import View
 from .models import (
     Service, Technology, Testimonial, Project,
     ContactRequest, ConsultationRequest, CompanyInfo, SiteContent,
     ServiceDetail, ServiceFeature, ServiceProcess,
     ServiceBenefit, ServiceFAQ, ServiceCase,
-    Vacancy, VacancyApplication
+    Vacancy, VacancyApplication, VacancySkill
 )
 from .serializers import (
     ServiceSerializer, TechnologySerializer, TestimonialSerializer,
@@ -20,6 +31,18 @@ from .serializers import (
     VacancyListSerializer, VacancyDetailSerializer, VacancyApplicationSerializer
 )
 from .telegram_service import TelegramService
+from .cache_service import ContentCacheService
+from .mixins import ConditionalGetMixin, FileDownloadMixin, LeanPipelineMixin, ReplicaReadMixin
+from .view_counter import vacancy_views
+from .upload_handlers import ResumeUploadHandler
+from .vacancy_filters import VacancyFilter
+from .exports import LeadExport, ResumeArchive
+from .leads import LeadFeed, LeadInbox
+from .authentication import ApiKeyAuthentication
+
+# Административный роутер: API-ключ (скрипты) или сессия (браузер), без Basic -
+# проверка пароля PBKDF2 на каждый запрос слишком дорога для автоматизации
+ADMIN_API_AUTHENTICATION = [ApiKeyAuthentication, SessionAuthentication]
 
 # ========== СУЩЕСТВУЮЩИЕ VIEWS ==========
 
@@ -28,15 +51,16 @@ from .telegram_service import TelegramService
     description="Возвращает список всех активных услуг/проектов, отсортированных по порядку и названию",
     tags=["Услуги"]
 )
-class ServiceListView(generics.ListAPIView):
+class ServiceListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение списка услуг/проектов"""
+    conditional_models = (Service,)
     queryset = Service.objects.filter(is_active=True).order_by('order')
     serializer_class = ServiceSerializer
     permission_classes = [AllowAny]
 
 @extend_schema(
     summary="Создать заявку на обратную связь",
-    description="Создает новую заявку на обратную связь и отправляет уведомление в Telegram",
+    description="Создает новую заявку на обратную связь и ставит уведомление в Telegram в очередь отправки",
     tags=["Заявки"],
     request=ContactRequestSerializer,
     responses={201: ContactRequestSerializer}
@@ -50,11 +74,12 @@ class ContactCreateView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            contact_request = serializer.save()
-            
-            # Отправляем уведомление в Telegram
-            telegram_message = TelegramService.format_contact_request(contact_request)
-            TelegramService.send_notification(telegram_message)
+            # Заявка и уведомление сохраняются атомарно, доставку в Telegram
+            # выполняет воркер send_telegram_notifications
+            with transaction.atomic():
+                contact_request = serializer.save()
+                telegram_message = TelegramService.format_contact_request(contact_request)
+                TelegramService.enqueue(telegram_message)
             
             return Response({
                 'success': True,
@@ -74,8 +99,9 @@ class ContactCreateView(generics.CreateAPIView):
     description="Возвращает список всех активных технологий, используемых компанией",
     tags=["Технологии"]
 )
-class TechnologyListView(generics.ListAPIView):
+class TechnologyListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение списка технологий (секция 'Мы используем')"""
+    conditional_models = (Technology,)
     queryset = Technology.objects.filter(is_active=True).order_by('order')
     serializer_class = TechnologySerializer
     permission_classes = [AllowAny]
@@ -86,8 +112,9 @@ class TechnologyListView(generics.ListAPIView):
     description="Возвращает список всех активных отзывов клиентов",
     tags=["Отзывы"]
 )
-class TestimonialListView(generics.ListAPIView):
+class TestimonialListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение списка отзывов клиентов"""
+    conditional_models = (Testimonial,)
     queryset = Testimonial.objects.filter(is_active=True).order_by('order')
     serializer_class = TestimonialSerializer
     permission_classes = [AllowAny]
@@ -98,8 +125,9 @@ class TestimonialListView(generics.ListAPIView):
     description="Возвращает список всех активных проектов для оглавления",
     tags=["Проекты"]
 )
-class ProjectListView(generics.ListAPIView):
+class ProjectListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение списка проектов"""
+    conditional_models = (Project,)
     queryset = Project.objects.filter(is_active=True).order_by('order')
     serializer_class = ProjectSerializer
     permission_classes = [AllowAny]
@@ -107,7 +135,7 @@ class ProjectListView(generics.ListAPIView):
 
 @extend_schema(
     summary="Создать заявку на консультацию",
-    description="Создает новую заявку на бесплатную консультацию и отправляет уведомление в Telegram",
+    description="Создает новую заявку на бесплатную консультацию и ставит уведомление в Telegram в очередь отправки",
     tags=["Заявки"],
     request=ConsultationRequestSerializer,
     responses={201: ConsultationRequestSerializer}
@@ -121,11 +149,10 @@ class ConsultationCreateView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            consultation = serializer.save()
-            
-            # Отправляем уведомление в Telegram
-            telegram_message = TelegramService.format_consultation(consultation)
-            TelegramService.send_notification(telegram_message)
+            with transaction.atomic():
+                consultation = serializer.save()
+                telegram_message = TelegramService.format_consultation(consultation)
+                TelegramService.enqueue(telegram_message)
             
             return Response({
                 'success': True,
@@ -143,8 +170,9 @@ class ConsultationCreateView(generics.CreateAPIView):
     description="Возвращает контактную информацию компании (телефон, адрес, режим работы)",
     tags=["Компания"]
 )
-class CompanyInfoView(generics.RetrieveAPIView):
+class CompanyInfoView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Получение контактной информации компании"""
+    conditional_models = (CompanyInfo,)
     permission_classes = [AllowAny]
     serializer_class = CompanyInfoSerializer
     
@@ -165,8 +193,9 @@ class CompanyInfoView(generics.RetrieveAPIView):
     description="Возвращает контент для главной страницы (заголовки, тексты, изображения)",
     tags=["Контент"]
 )
-class SiteContentView(generics.RetrieveAPIView):
+class SiteContentView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Получение контента главной страницы"""
+    conditional_models = (SiteContent,)
     permission_classes = [AllowAny]
     serializer_class = SiteContentSerializer
     
@@ -184,34 +213,16 @@ class SiteContentView(generics.RetrieveAPIView):
     description="Возвращает все необходимые данные для отображения главной страницы: услуги, технологии, отзывы, проекты, информация о компании и контент страницы",
     tags=["Главная страница"]
 )
-class FullHomePageDataView(generics.GenericAPIView):
+class FullHomePageDataView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.GenericAPIView):
     """Получение всех данных для главной страницы"""
+    conditional_models = ContentCacheService.HOMEPAGE_MODELS
     permission_classes = [AllowAny]
     
     def get(self, request):
-        # Получаем все активные записи
-        services = Service.objects.filter(is_active=True).order_by('order')[:6]
-        technologies = Technology.objects.filter(is_active=True).order_by('order')
-        testimonials = Testimonial.objects.filter(is_active=True).order_by('order')
-        projects = Project.objects.filter(is_active=True).order_by('order')
-        company_info = CompanyInfo.objects.first()
-        site_content = SiteContent.objects.filter(is_active=True).first()
-        
-        # Сериализуем данные
-        data = {
-            'services': ServiceSerializer(services, many=True).data,
-            'technologies': TechnologySerializer(technologies, many=True).data,
-            'testimonials': TestimonialSerializer(testimonials, many=True).data,
-            'projects': ProjectSerializer(projects, many=True).data,
-            'company_info': CompanyInfoSerializer(company_info).data if company_info else None,
-            'site_content': SiteContentSerializer(site_content).data if site_content else None,
-        }
-        
-        return Response({
-            'success': True,
-            'data': data
-        }
-        )
+        # Ответ собирается заранее и пересобирается только при изменении
+        # контента (см. ContentCacheService и main/signals.py)
+        content = ContentCacheService.get_homepage()
+        return HttpResponse(content, content_type='application/json')
 
 
 # ========== НОВЫЕ VIEWS ДЛЯ ДЕТАЛЬНЫХ СТРАНИЦ УСЛУГ ==========
@@ -222,8 +233,9 @@ class FullHomePageDataView(generics.GenericAPIView):
     tags=["Детальные страницы услуг"]
 )
 # GET - детальная информация об услуге по ID ServiceDetail
-class ServiceDetailView(generics.RetrieveAPIView):
+class ServiceDetailView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Получение детальной информации об услуге"""
+    conditional_models = (ServiceDetail, Service)
     queryset = ServiceDetail.objects.filter(is_active=True)
     permission_classes = [AllowAny]
     
@@ -238,8 +250,9 @@ class ServiceDetailView(generics.RetrieveAPIView):
     tags=["Детальные страницы услуг"]
 )
 # GET - детальная информация об услуге по связанному service_id
-class ServiceDetailByServiceView(generics.RetrieveAPIView):
+class ServiceDetailByServiceView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Получение детальной информации об услуге по ID основной услуги"""
+    conditional_models = (ServiceDetail, Service)
     permission_classes = [AllowAny]
     
     def get_object(self):
@@ -257,8 +270,9 @@ class ServiceDetailByServiceView(generics.RetrieveAPIView):
     tags=["Детальные страницы услуг"]
 )
 # GET - список всех детальных страниц услуг
-class ServiceDetailListView(generics.ListAPIView):
+class ServiceDetailListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение списка всех детальных страниц услуг"""
+    conditional_models = (ServiceDetail, Service)
     queryset = ServiceDetail.objects.filter(is_active=True).order_by('-created_at')
     permission_classes = [AllowAny]
     
@@ -267,6 +281,43 @@ class ServiceDetailListView(generics.ListAPIView):
         return ServiceDetailSerializer
 
 
+@extend_schema(
+    summary="Получить страницу услуги целиком",
+    description="Возвращает детальную страницу услуги вместе с активными особенностями, этапами работы, преимуществами, FAQ и кейсами. "
+                "Страница ищется по ID ServiceDetail или по ID связанной услуги Service",
+    tags=["Детальные страницы услуг"]
+)
+# GET - детальная страница со всеми вложенными блоками
+class ServiceDetailFullView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.RetrieveAPIView):
+    """Получение страницы услуги со всеми блоками за фиксированное число запросов"""
+    conditional_models = (
+        ServiceDetail, Service, ServiceFeature, ServiceProcess,
+        ServiceBenefit, ServiceFAQ, ServiceCase,
+    )
+    permission_classes = [AllowAny]
+    
+    def get_queryset(self):
+        # 1 запрос на страницу (вместе с услугой) + по 1 запросу на каждый тип блоков
+        return ServiceDetail.objects.filter(is_active=True).select_related('service').prefetch_related(
+            Prefetch('features', queryset=ServiceFeature.objects.filter(is_active=True).order_by('order')),
+            Prefetch('processes', queryset=ServiceProcess.objects.order_by('step_number')),
+            Prefetch('benefits', queryset=ServiceBenefit.objects.order_by('order')),
+            Prefetch('faqs', queryset=ServiceFAQ.objects.filter(is_active=True).order_by('order')),
+            Prefetch('cases', queryset=ServiceCase.objects.filter(is_active=True).order_by('order')),
+        )
+    
+    def get_object(self):
+        if 'service_id' in self.kwargs:
+            lookup = {'service_id': self.kwargs['service_id']}
+        else:
+            lookup = {'pk': self.kwargs['pk']}
+        return get_object_or_404(self.get_queryset(), **lookup)
+    
+    def get_serializer_class(self):
+        from .serializers import ServiceDetailFullSerializer
+        return ServiceDetailFullSerializer
+
+
 @extend_schema(
     summary="Получить особенности услуги",
     description="Возвращает список особенностей для указанной услуги",
@@ -281,8 +332,9 @@ class ServiceDetailListView(generics.ListAPIView):
     ]
 )
 # GET - особенности конкретной услуги
-class ServiceFeatureListView(generics.ListAPIView):
+class ServiceFeatureListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение особенностей конкретной услуги"""
+    conditional_models = (ServiceFeature,)
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -308,8 +360,9 @@ class ServiceFeatureListView(generics.ListAPIView):
     ]
 )
 # GET - этапы работы конкретной услуги
-class ServiceProcessListView(generics.ListAPIView):
+class ServiceProcessListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение этапов работы конкретной услуги"""
+    conditional_models = (ServiceProcess,)
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -335,8 +388,9 @@ class ServiceProcessListView(generics.ListAPIView):
     ]
 )
 # GET - преимущества конкретной услуги
-class ServiceBenefitListView(generics.ListAPIView):
+class ServiceBenefitListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение преимуществ конкретной услуги"""
+    conditional_models = (ServiceBenefit,)
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -362,8 +416,9 @@ class ServiceBenefitListView(generics.ListAPIView):
     ]
 )
 # GET - FAQ конкретной услуги
-class ServiceFAQListView(generics.ListAPIView):
+class ServiceFAQListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение FAQ конкретной услуги"""
+    conditional_models = (ServiceFAQ,)
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -389,8 +444,9 @@ class ServiceFAQListView(generics.ListAPIView):
     ]
 )
 # GET - кейсы конкретной услуги
-class ServiceCaseListView(generics.ListAPIView):
+class ServiceCaseListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
     """Получение кейсов конкретной услуги"""
+    conditional_models = (ServiceCase,)
     permission_classes = [AllowAny]
     
     def get_queryset(self):
@@ -420,6 +476,7 @@ class ServiceCaseListView(generics.ListAPIView):
 class ServiceViewSet(viewsets.ModelViewSet):
     """ViewSet для полного управления услугами (админка)"""
     queryset = Service.objects.all()
+    authentication_classes = ADMIN_API_AUTHENTICATION
     permission_classes = [IsAdminUser]
     
     def get_serializer_class(self):
@@ -468,6 +525,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
 class TestimonialViewSet(viewsets.ModelViewSet):
     """ViewSet для полного управления отзывами (админка)"""
     queryset = Testimonial.objects.all()
+    authentication_classes = ADMIN_API_AUTHENTICATION
     permission_classes = [IsAdminUser]
     
     def get_serializer_class(self):
@@ -516,6 +574,7 @@ class TestimonialViewSet(viewsets.ModelViewSet):
 class ConsultationRequestViewSet(viewsets.ModelViewSet):
     """ViewSet для управления заявками на консультацию (админка)"""
     queryset = ConsultationRequest.objects.all()
+    authentication_classes = ADMIN_API_AUTHENTICATION
     permission_classes = [IsAdminUser]
     
     def get_serializer_class(self):
@@ -587,6 +646,7 @@ class ConsultationRequestViewSet(viewsets.ModelViewSet):
 class ServiceDetailViewSet(viewsets.ModelViewSet):
     """ViewSet для полного управления детальными страницами услуг (админка)"""
     queryset = ServiceDetail.objects.all()
+    authentication_classes = ADMIN_API_AUTHENTICATION
     permission_classes = [IsAdminUser]
     
     def get_serializer_class(self):
@@ -638,54 +698,136 @@ class ServiceDetailViewSet(viewsets.ModelViewSet):
             type=OpenApiTypes.STR,
             description='Фильтрация по типу занятости (Full-time, Part-time, remote, hybird, internship)',
             required=False
+        ),
+        OpenApiParameter(
+            name='q',
+            type=OpenApiTypes.STR,
+            description='Полнотекстовый поиск по названию, описанию и навыкам (результаты по релевантности)',
+            required=False
+        ),
+        OpenApiParameter(
+            name='is_remote',
+            type=OpenApiTypes.BOOL,
+            description='Только удаленные (true) или только офисные (false) вакансии',
+            required=False
+        ),
+        OpenApiParameter(
+            name='skill',
+            type=OpenApiTypes.STR,
+            many=True,
+            description='Навык (без учета регистра), можно несколько: ?skill=python&skill=django',
+            required=False
+        ),
+        OpenApiParameter(
+            name='skill_mode',
+            type=OpenApiTypes.STR,
+            enum=['all', 'any'],
+            description='all - вакансии со всеми навыками (по умолчанию), any - хотя бы с одним',
+            required=False
+        ),
+        OpenApiParameter(
+            name='salary_from',
+            type=OpenApiTypes.INT,
+            description='Зарплата от, $ (вакансии, вилка которых пересекается с диапазоном)',
+            required=False
+        ),
+        OpenApiParameter(
+            name='salary_to',
+            type=OpenApiTypes.INT,
+            description='Зарплата до, $ (вакансии, вилка которых пересекается с диапазоном)',
+            required=False
+        ),
+        OpenApiParameter(
+            name='ordering',
+            type=OpenApiTypes.STR,
+            enum=['salary', '-salary'],
+            description='Сортировка по зарплате: salary - по нижней границе вилки, -salary - по верхней (по убыванию)',
+            required=False
         )
     ]
 )
-class VacancyListView(generics.ListAPIView):
-    """Список всех активных вакансий"""
-    queryset = Vacancy.objects.filter(is_active=True)
+class VacancyListView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.ListAPIView):
+    """Список всех опубликованных и не истекших вакансий"""
+    conditional_models = (Vacancy,)
+    queryset = Vacancy.objects.with_salary_range()
     serializer_class = VacancyListSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
-        # Фильтрация по категории
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        # Фильтрация по уровню
-        level = self.request.query_params.get('level')
-        if level:
-            queryset = queryset.filter(level=level)
-        
-        # Фильтрация по типу занятости
-        employment = self.request.query_params.get('employment_type')
-        if employment:
-            queryset = queryset.filter(employment_type=employment)
-        
-        return queryset
+        # Фильтры category, level, employment_type, is_remote, skill, salary_from/salary_to,
+        # поиск q и сортировка ordering=salary
+        # visible() - в get_queryset, чтобы момент "сейчас" брался на каждый запрос
+        return VacancyFilter(self.request.query_params).apply(super().get_queryset().visible())
+
+@extend_schema(
+    summary="Получить счетчики фильтров вакансий",
+    description="Количество активных вакансий по категориям, уровням, типам занятости, "
+                "удаленке и зарплатным интервалам. Принимает те же фильтры, что и список вакансий; "
+                "счетчики фасета считаются по всем фильтрам, кроме его собственного.",
+    tags=["Вакансии"],
+    parameters=[
+        OpenApiParameter(name='category', type=OpenApiTypes.STR, required=False),
+        OpenApiParameter(name='level', type=OpenApiTypes.STR, required=False),
+        OpenApiParameter(name='employment_type', type=OpenApiTypes.STR, required=False),
+        OpenApiParameter(name='is_remote', type=OpenApiTypes.BOOL, required=False),
+        OpenApiParameter(name='skill', type=OpenApiTypes.STR, many=True, required=False),
+        OpenApiParameter(name='skill_mode', type=OpenApiTypes.STR, enum=['all', 'any'], required=False),
+        OpenApiParameter(name='salary_from', type=OpenApiTypes.INT, required=False),
+        OpenApiParameter(name='salary_to', type=OpenApiTypes.INT, required=False),
+        OpenApiParameter(name='q', type=OpenApiTypes.STR, required=False),
+    ],
+    responses={200: OpenApiTypes.OBJECT}
+)
+class VacancyFacetsView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.GenericAPIView):
+    """Счетчики фасетов для фильтров страницы вакансий"""
+    conditional_models = (Vacancy,)
+    queryset = Vacancy.objects.all()
+    permission_classes = [AllowAny]
+    pagination_class = None
+    
+    def get_queryset(self):
+        return super().get_queryset().visible()
+    
+    def get(self, request):
+        data = VacancyFilter(request.query_params).cached_facet_counts(self.get_queryset())
+        return Response(data)
+
 
 @extend_schema(
     summary="Получить детальную информацию о вакансии",
-    description="Возвращает полную информацию о вакансии по ID, включая описание и требования. Увеличивает счетчик просмотров.",
+    description="Возвращает полную информацию о вакансии по ID, включая описание и требования. "
+                "Увеличивает счетчик просмотров (счетчик обновляется в базе пакетно, с задержкой).",
     tags=["Вакансии"]
 )
-class VacancyDetailView(generics.RetrieveAPIView):
+class VacancyDetailView(LeanPipelineMixin, ReplicaReadMixin, ConditionalGetMixin, generics.RetrieveAPIView):
     """Детальная страница вакансии"""
-    queryset = Vacancy.objects.filter(is_active=True)
+    conditional_models = (Vacancy,)
+    queryset = Vacancy.objects.with_salary_range().prefetch_related(
+        Prefetch('skill_links', queryset=VacancySkill.objects.select_related('skill'))
+    )
     serializer_class = VacancyDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'pk'
     
+    def get_queryset(self):
+        return super().get_queryset().visible()
+    
     def retrieve(self, request, *args, **kwargs):
-        # Увеличиваем счетчик просмотров
+        # Просмотр учитывается только для найденной видимой вакансии.
+        # Сам GET в базу не пишет - счетчик копится в буфере
         instance = self.get_object()
-        instance.increment_views()
-        
+        if request.method == 'GET':
+            vacancy_views.hit(instance.pk)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
+    
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        # 304 - ETag выдан этой вакансии при текущей версии Vacancy (снятие
+        # с публикации меняет версию), значит она существует и видна
+        if request.method == 'GET' and response.status_code == 304:
+            vacancy_views.hit(kwargs['pk'])
+        return response
 
 @extend_schema(
     summary="Создать отклик на вакансию",
@@ -699,16 +841,47 @@ class VacancyApplicationCreateView(generics.CreateAPIView):
     serializer_class = VacancyApplicationSerializer
     permission_classes = [AllowAny]
     
+    def initialize_request(self, request, *args, **kwargs):
+        # Резюме принимается потоково: на диск, с лимитом размера и хешем
+        self.upload_handler = ResumeUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return super().initialize_request(request, *args, **kwargs)
+    
+    def upload_error(self, message, status_code):
+        return Response({
+            'success': False,
+            'errors': {'resume': [message]}
+        }, status=status_code)
+    
     def create(self, request, *args, **kwargs):
         vacancy_id = kwargs.get('vacancy_id')
-        vacancy = get_object_or_404(Vacancy, id=vacancy_id, is_active=True)
+        vacancy = get_object_or_404(Vacancy.objects.visible(), id=vacancy_id)
         
-        serializer = self.get_serializer(data=request.data)
+        # Заведомо слишком большой запрос отклоняем до чтения тела
+        max_request_size = settings.RESUME_MAX_UPLOAD_SIZE + settings.RESUME_FORM_OVERHEAD
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > max_request_size:
+            return self.upload_error(
+                f'Файл слишком большой (максимум {settings.RESUME_MAX_UPLOAD_SIZE // (1024 * 1024)} МБ)',
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        
+        data = request.data
+        if self.upload_handler.error:
+            return self.upload_error(self.upload_handler.error, self.upload_handler.error_status)
+        
+        serializer = self.get_serializer(data=data)
         if serializer.is_valid():
-            application = serializer.save(vacancy=vacancy)
+            serializer.save(
+                vacancy=vacancy,
+                resume_sha256=self.upload_handler.sha256
+            )
             
             # Отправка уведомления на email (опционально)
-            # send_application_notification(application)
+            # send_application_notification(serializer.instance)
             
             return Response({
                 'success': True,
@@ -719,4 +892,166 @@ class VacancyApplicationCreateView(generics.CreateAPIView):
         return Response({
             'success': False,
             'errors': serializer.errors
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+# ========== ВЫГРУЗКИ (ТОЛЬКО ДЛЯ СОТРУДНИКОВ) ==========
+
+@extend_schema(
+    summary="Выгрузить заявки или отклики",
+    description="Потоковая выгрузка в CSV или XLSX: kind - contacts, consultations или applications, "
+                "расширение - csv или xlsx (например, /api/exports/applications.xlsx). "
+                "Файл формируется по мере чтения из базы, размер выгрузки не ограничен.",
+    tags=["Выгрузки"],
+    parameters=[
+        OpenApiParameter(name='created_from', type=OpenApiTypes.DATE, required=False,
+                         description='Дата создания с (включительно)'),
+        OpenApiParameter(name='created_to', type=OpenApiTypes.DATE, required=False,
+                         description='Дата создания по (включительно)'),
+        OpenApiParameter(name='is_processed', type=OpenApiTypes.BOOL, required=False,
+                         description='Только для contacts и consultations'),
+        OpenApiParameter(name='status', type=OpenApiTypes.STR, required=False,
+                         description='Статус отклика (только applications)'),
+        OpenApiParameter(name='vacancy', type=OpenApiTypes.INT, required=False,
+                         description='ID вакансии (только applications)'),
+    ],
+    responses={200: OpenApiTypes.BINARY}
+)
+class LeadExportView(FileDownloadMixin, generics.GenericAPIView):
+    """Выгрузка заявок и откликов для отдела продаж и HR"""
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+    
+    def get(self, request, kind, extension):
+        if kind not in LeadExport.EXPORTS or extension not in LeadExport.CONTENT_TYPES:
+            raise Http404
+        queryset = LeadExport.EXPORTS[kind]['model'].objects.all()
+        queryset = LeadExport.filter(kind, queryset, request.query_params)
+        return LeadExport.response(kind, queryset, extension)
+
+
+@extend_schema(
+    summary="Скачать резюме по вакансии",
+    description="ZIP-архив с резюме всех откликов на вакансию и манифестом manifest.csv. "
+                "Архив собирается потоково, без временных файлов.",
+    tags=["Выгрузки"],
+    parameters=[
+        OpenApiParameter(name='status', type=OpenApiTypes.STR, required=False,
+                         description='Только отклики с этим статусом'),
+    ],
+    responses={200: OpenApiTypes.BINARY}
+)
+class VacancyResumesArchiveView(FileDownloadMixin, generics.GenericAPIView):
+    """Архив резюме откликов на вакансию для HR"""
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+    
+    def get(self, request, vacancy_id):
+        vacancy = get_object_or_404(Vacancy, id=vacancy_id)
+        queryset = VacancyApplication.objects.filter(vacancy=vacancy)
+        if request.query_params.get('status'):
+            queryset = queryset.filter(status=request.query_params['status'])
+        return ResumeArchive.response(queryset, f'vacancy-{vacancy.pk}-resumes.zip')
+
+
+# ========== ЕДИНЫЙ СПИСОК ЗАЯВОК ==========
+
+@extend_schema(
+    summary="Единый список заявок",
+    description="Консультации, контактные заявки и отклики на вакансии одним списком "
+                "(только для сотрудников). Keyset-пагинация по created_at: ответ {counts, next, results}. "
+                "counts - число заявок по типам и статусам с учетом фильтров, кроме статуса. "
+                "Для синхронизации с CRM используйте ordering=created_at: next возвращается всегда, "
+                "запрос по нему вернет только заявки, закоммиченные после предыдущего опроса "
+                "(порядок - по коммиту, поэтому по created_at он приблизительный).",
+    tags=["Администрирование"],
+    parameters=[
+        OpenApiParameter(name='type', type=OpenApiTypes.STR, many=True, required=False,
+                         enum=list(LeadInbox.TYPES), description='Типы заявок (по умолчанию все)'),
+        OpenApiParameter(name='is_processed', type=OpenApiTypes.BOOL, required=False),
+        OpenApiParameter(name='status', type=OpenApiTypes.STR, required=False,
+                         description='new/processed для заявок, статус отклика для откликов'),
+        OpenApiParameter(name='created_from', type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(name='created_to', type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(name='vacancy', type=OpenApiTypes.INT, required=False,
+                         description='ID вакансии (оставляет только отклики)'),
+        OpenApiParameter(name='ordering', type=OpenApiTypes.STR, required=False,
+                         enum=['-created_at', 'created_at'], description='По умолчанию - сначала новые'),
+        OpenApiParameter(name='cursor', type=OpenApiTypes.STR, required=False),
+        OpenApiParameter(name='page_size', type=OpenApiTypes.INT, required=False,
+                         description=f'Не больше {LeadInbox.MAX_PAGE_SIZE}'),
+    ],
+    responses={200: OpenApiTypes.OBJECT}
+)
+class LeadInboxView(generics.GenericAPIView):
+    """Единый список заявок и откликов для менеджеров и CRM"""
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+    
+    def get(self, request):
+        inbox = LeadInbox(request.query_params)
+        position = inbox.decode_cursor(request.query_params.get('cursor'))
+        items, has_more = inbox.page(position)
+        
+        cursor = None
+        if items:
+            cursor = inbox.encode_cursor(*items[-1])
+        elif inbox.ascending:
+            cursor = request.query_params.get('cursor')
+        next_link = None
+        if cursor and (has_more or inbox.ascending):
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+        
+        return Response({
+            'counts': inbox.counts(),
+            'next': next_link,
+            'results': [LeadInbox.item(lead_type, row) for lead_type, row in items],
+        })
+
+
+class LeadStreamView(View):
+    """
+    Server-Sent Events: новые заявки для открытой админки/дашборда (только сотрудники).
+
+    Под ASGI (config/asgi.py) поток держится до LeadFeed.MAX_DURATION, в простое
+    опрашивает только счетчик в кеше и раз в HEARTBEAT_INTERVAL шлет комментарий.
+    Под WSGI поток отдает накопившиеся события и закрывается - браузерный
+    EventSource переподключится через retry с Last-Event-ID.
+    """
+    
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_staff:
+            return JsonResponse({'detail': 'Доступ только для сотрудников'}, status=403)
+        
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        position = await sync_to_async(LeadFeed.start_position)(last_event_id)
+        if isinstance(request, ASGIRequest):
+            stream = self.stream(position)
+        else:
+            messages, _ = await sync_to_async(LeadFeed.events)(position)
+            stream = [f'retry: {LeadFeed.RETRY_MS}\n\n', *messages]
+        
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    async def stream(self, position):
+        yield f'retry: {LeadFeed.RETRY_MS}\n\n'
+        started = last_sent = time.monotonic()
+        last_sync = version = None
+        while time.monotonic() - started < LeadFeed.MAX_DURATION:
+            current = await sync_to_async(LeadFeed.version)()
+            now = time.monotonic()
+            if last_sync is None or current != version or now - last_sync >= LeadFeed.RESYNC_INTERVAL:
+                version, last_sync = current, now
+                messages, position = await sync_to_async(LeadFeed.events)(position)
+                for message in messages:
+                    yield message
+                if messages:
+                    last_sent = now
+            if now - last_sent >= LeadFeed.HEARTBEAT_INTERVAL:
+                # Комментарий держит соединение открытым через прокси
+                yield ': ping\n\n'
+                last_sent = now
+            await asyncio.sleep(LeadFeed.POLL_INTERVAL)